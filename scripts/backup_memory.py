@@ -6,6 +6,17 @@ from pathlib import Path
 import json
 import shutil
 from datetime import datetime
+from typing import Optional
+
+# 添加src到路径
+script_dir = Path(__file__).parent
+src_dir = script_dir.parent / 'src'
+project_root = script_dir.parent
+
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 
 def backup_all_memories(
@@ -87,8 +98,58 @@ def backup_all_memories(
     print(f"备份大小: {total_size / (1024 * 1024):.2f} MB")
 
 
-if __name__ == '__main__':
-    storage_path = sys.argv[1] if len(sys.argv) > 1 else 'memory_storage'
-    backup_path = sys.argv[2] if len(sys.argv) > 2 else 'memory_backups'
+def backup_memories_archive(
+    memory_storage_path: str = "memory_storage",
+    backup_base_path: str = "memory_backups",
+    since: Optional[datetime] = None,
+    backend: str = "json"
+):
+    """
+    流式备份为单个压缩归档（NDJSON + 清单 + 校验和）
+
+    Args:
+        memory_storage_path: 记忆存储路径
+        backup_base_path: 备份基础路径
+        since: 只备份该时间之后创建或变更的记忆（增量备份）
+        backend: 记忆存储后端
+    """
+    from dna_context_engineering.memory.store import MemoryStore
+    from dna_context_engineering.memory.archive import export_store
 
-    backup_all_memories(storage_path, backup_path)
+    print("=" * 60)
+    print("DNASPEC 记忆系统归档备份" + ("（增量）" if since else ""))
+    print("=" * 60)
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    kind = "incremental" if since else "full"
+    archive_path = Path(backup_base_path) / f"archive_{kind}_{timestamp}.ndjson.gz"
+
+    store = MemoryStore(Path(memory_storage_path), backend=backend)
+    try:
+        manifest = export_store(store, archive_path, since=since)
+    finally:
+        store.close()
+
+    print(f"✅ 已导出 {manifest['record_count']} 条记忆（{len(manifest['agents'])} 个智能体）")
+    print(f"   归档: {archive_path.absolute()}")
+    print(f"   大小: {archive_path.stat().st_size / (1024 * 1024):.2f} MB")
+    print(f"   SHA-256: {manifest['sha256']}")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    use_archive = '--archive' in args
+    since = None
+    if '--since' in args:
+        since = datetime.fromisoformat(args[args.index('--since') + 1])
+        use_archive = True
+        del args[args.index('--since'):args.index('--since') + 2]
+    args = [a for a in args if a != '--archive']
+
+    storage_path = args[0] if len(args) > 0 else 'memory_storage'
+    backup_path = args[1] if len(args) > 1 else 'memory_backups'
+
+    if use_archive:
+        backup_memories_archive(storage_path, backup_path, since=since)
+    else:
+        backup_all_memories(storage_path, backup_path)
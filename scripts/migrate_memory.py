@@ -0,0 +1,60 @@
+"""
+记忆存储迁移脚本 - 将JSON目录布局迁移到SQLite单文件存储
+"""
+import sys
+from pathlib import Path
+
+# 添加src到路径
+script_dir = Path(__file__).parent
+src_dir = script_dir.parent / 'src'
+project_root = script_dir.parent
+
+if str(src_dir) not in sys.path:
+    sys.path.insert(0, str(src_dir))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from dna_context_engineering.memory.backends import migrate_backend
+
+
+def migrate_memories(
+    memory_storage_path: str = "memory_storage",
+    source: str = "json",
+    target: str = "sqlite"
+):
+    """
+    迁移记忆存储
+
+    Args:
+        memory_storage_path: 记忆存储路径
+        source: 源后端
+        target: 目标后端
+    """
+    print("=" * 60)
+    print("DNASPEC 记忆存储迁移")
+    print("=" * 60)
+
+    storage_path = Path(memory_storage_path)
+    if not storage_path.exists():
+        print(f"⚠️  记忆存储目录不存在: {storage_path}")
+        return
+
+    print(f"\n{source} -> {target}: {storage_path.absolute()}")
+
+    migrated = migrate_backend(storage_path, source=source, target=target)
+
+    for agent_id, count in migrated.items():
+        print(f"  ✅ {agent_id}: {count} 条记忆")
+
+    print("\n" + "=" * 60)
+    print(f"✅ 迁移完成！共 {sum(migrated.values())} 条记忆")
+    print("=" * 60)
+    print("源数据未删除；确认无误后可在 MemoryConfig 中设置 backend='sqlite'")
+
+
+if __name__ == '__main__':
+    storage_path = sys.argv[1] if len(sys.argv) > 1 else 'memory_storage'
+    source = sys.argv[2] if len(sys.argv) > 2 else 'json'
+    target = sys.argv[3] if len(sys.argv) > 3 else 'sqlite'
+
+    migrate_memories(storage_path, source, target)
@@ -27,6 +27,9 @@ class ArchitectSkill(DNASpecSkillBase):
     - 提供架构模式识别、质量评估、架构生成功能
     """
     
+    # 输出只由输入决定，可被记忆化
+    memoizable = True
+    
     def __init__(self):
         super().__init__(
             name="architect",
@@ -24,6 +24,9 @@ class CognitiveTemplaterSkill(DNASpecSkillBase):
     - 支持5种认知模板：思维链、验证、少样本、角色扮演、理解框架
     """
     
+    # 输出只由输入决定，可被记忆化
+    memoizable = True
+    
     def __init__(self):
         super().__init__(
             name="cognitive-templater",
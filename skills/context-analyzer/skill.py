@@ -25,6 +25,9 @@ class ContextAnalyzerSkill(DNASpecSkillBase):
     - 支持5维质量分析：清晰度、相关性、完整性、一致性、效率性
     """
     
+    # 输出只由输入决定，可被记忆化
+    memoizable = True
+    
     def __init__(self):
         super().__init__(
             name="context-analyzer",
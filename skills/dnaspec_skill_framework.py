@@ -5,8 +5,11 @@ DNASPEC Skill Framework - 符合AgentSkills.io标准
 import json
 import uuid
 import time
+import hashlib
 import logging
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
@@ -25,9 +28,91 @@ class SkillExecutionError(Exception):
     pass
 
 
+class SkillResultMemo:
+    """技能结果记忆化缓存 - 进程内LRU，值以JSON文本保存，命中时返回独立副本"""
+    
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[str]:
+        """读取缓存的结果JSON"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def put(self, key: str, value: str) -> None:
+        """写入结果JSON"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """缓存统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+# 记忆化默认关闭；enable_memoization() 后对声明 memoizable = True 的技能生效
+_memo_cache: Optional[Any] = None
+
+
+def enable_memoization(cache: Optional[Any] = None, max_entries: int = 512) -> Any:
+    """
+    启用技能结果记忆化
+    
+    Args:
+        cache: 缓存对象（需提供 get(key)/put(key, value)，如 TieredResultCache），
+               默认使用进程内 SkillResultMemo
+        max_entries: 默认缓存的最大条目数
+        
+    Returns:
+        生效的缓存对象
+    """
+    global _memo_cache
+    _memo_cache = cache if cache is not None else SkillResultMemo(max_entries)
+    return _memo_cache
+
+
+def disable_memoization() -> None:
+    """关闭技能结果记忆化"""
+    global _memo_cache
+    _memo_cache = None
+
+
+def get_memo_cache() -> Optional[Any]:
+    """当前的记忆化缓存（未启用时为None）"""
+    return _memo_cache
+
+
 class DNASpecSkillBase(ABC):
     """DNASPEC技能基类 - 符合AgentSkills.io标准"""
     
+    # 结果只由输入决定的技能设为True后才会被记忆化；
+    # 生成ID、时间戳或依赖外部状态的技能保持默认的False
+    memoizable: bool = False
+    
     def __init__(self, name: str, description: str, version: str = "1.0.0"):
         """
         初始化技能
@@ -134,8 +219,19 @@ class DNASpecSkillBase(ABC):
                     400
                 )
             
-            # 执行技能
+            # 执行技能（命中记忆化缓存时跳过）
+            memo_key = self._memo_key(input_data)
+            cached = _memo_cache.get(memo_key) if memo_key else None
+            if cached is not None:
+                self._log_execution_success()
+                return self._create_success_response(json.loads(cached), cache_hit=True)
+            
             result = self.execute_skill(input_data)
+            if memo_key:
+                try:
+                    _memo_cache.put(memo_key, json.dumps(result, ensure_ascii=False, sort_keys=True))
+                except (TypeError, ValueError):
+                    pass
             
             # 记录成功
             self._log_execution_success()
@@ -176,7 +272,23 @@ class DNASpecSkillBase(ABC):
         inputs = event.get('inputs', [])
         return inputs[0] if inputs else {}
     
-    def _create_success_response(self, result: Dict[str, Any]) -> Dict[str, Any]:
+    def _memo_key(self, input_data: Dict[str, Any]) -> Optional[str]:
+        """
+        记忆化缓存键：技能名 + 版本 + 输入的规范化哈希
+        
+        Returns:
+            缓存键，未启用记忆化、技能不可记忆化或输入无法序列化时返回None
+        """
+        if _memo_cache is None or not self.memoizable:
+            return None
+        try:
+            canonical = json.dumps(input_data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        except (TypeError, ValueError):
+            return None
+        digest = hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+        return f"{self.name}:{self.version}:{digest}"
+    
+    def _create_success_response(self, result: Dict[str, Any], cache_hit: bool = False) -> Dict[str, Any]:
         """创建成功响应"""
         execution_time = time.time() - self.start_time if self.start_time else 0
         
@@ -188,7 +300,8 @@ class DNASpecSkillBase(ABC):
                 'execution_id': self.execution_id,
                 'timestamp': datetime.utcnow().isoformat(),
                 'execution_time': round(execution_time, 3),
-                'version': self.version
+                'version': self.version,
+                'cache_hit': cache_hit
             }
         }
         
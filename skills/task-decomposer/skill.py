@@ -25,6 +25,9 @@ class TaskDecomposerSkill(DNASpecSkillBase):
     - 支持4种分解方法：层次、顺序、并行、混合
     """
     
+    # 输出只由输入决定，可被记忆化
+    memoizable = True
+    
     def __init__(self):
         super().__init__(
             name="task-decomposer",
@@ -2,7 +2,7 @@ import asyncio
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List
 from dataclasses import dataclass
-from .hooks.hook_system import hook_manager, HookContext, HookType
+from ..hooks.hook_system import hook_manager, HookContext, HookType
 
 @dataclass
 class AgentContext:
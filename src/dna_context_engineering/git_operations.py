@@ -2,13 +2,17 @@
 Git Operations Skill - Git操作技能
 用于项目初始化时设置Git规则和项目宪法，避免AI生成文件污染工作区
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import os
 import json
 import subprocess
 from pathlib import Path
 from datetime import datetime
 import re
+import time
+import fnmatch
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 
 
 def execute(args: Dict[str, Any]) -> str:
@@ -27,7 +31,7 @@ def execute(args: Dict[str, Any]) -> str:
     elif operation == "smart-commit":
         return smart_commit(project_path, args.get("message", ""))
     elif operation == "clean-workspace":
-        return clean_workspace(project_path)
+        return clean_workspace(project_path, args.get("dry_run", False), args.get("workers", 0))
     elif operation == "status-report":
         return get_workspace_status(project_path)
     elif operation == "create-workflow":
@@ -342,29 +346,87 @@ def validate_commit_message(project_path: str, message: str) -> str:
         return result
 
 
+# 单次 git add 调用的路径上限（仅在不支持 --pathspec-from-file 时按参数分批）
+STAGE_ARGV_BATCH = 500
+
+
+def parse_porcelain_z(output: str) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    解析 `git status --porcelain -z` 输出
+
+    -z 模式下路径不转义、以NUL分隔；重命名/复制条目后面紧跟一个原路径字段。
+
+    Returns:
+        (状态, 路径, 原路径) 列表，非重命名条目的原路径为None
+    """
+    entries = []
+    fields = output.split('\0')
+    i = 0
+    while i < len(fields):
+        field = fields[i]
+        i += 1
+        if len(field) < 4:
+            continue
+        status, path = field[:2], field[3:]
+        orig_path = None
+        if status[0] in 'RC' or status[1] in 'RC':
+            orig_path = fields[i] if i < len(fields) else None
+            i += 1
+        entries.append((status, path, orig_path))
+    return entries
+
+
+def stage_paths(project_root: Path, paths: List[str]) -> subprocess.CompletedProcess:
+    """
+    批量暂存路径（一次 git add，路径经stdin以NUL分隔传入）
+
+    路径按字面量匹配，不做通配符展开；git 版本过旧不支持
+    --pathspec-from-file 时退回按参数分批调用。
+    """
+    env = dict(os.environ, GIT_LITERAL_PATHSPECS='1')
+    payload = '\0'.join(paths) + '\0'
+    result = subprocess.run(
+        ["git", "add", "--pathspec-from-file=-", "--pathspec-file-nul"],
+        cwd=project_root, input=payload.encode('utf-8'), capture_output=True, env=env
+    )
+    stderr = result.stderr.decode('utf-8', errors='replace')
+    if result.returncode == 0 or 'pathspec-from-file' not in stderr:
+        return subprocess.CompletedProcess(result.args, result.returncode, '', stderr)
+
+    for start in range(0, len(paths), STAGE_ARGV_BATCH):
+        batch = paths[start:start + STAGE_ARGV_BATCH]
+        result = subprocess.run(["git", "add", "--"] + batch,
+                                cwd=project_root, capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            return result
+    return result
+
+
 def smart_commit(project_path: str, commit_message: str = "") -> str:
     """
     智能提交，自动应用DNASPEC规则
     """
     project_root = Path(project_path).resolve()
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+
+    def mark(phase: str, since: float) -> float:
+        now = time.perf_counter()
+        timings[phase] = (now - since) * 1000
+        return now
 
     try:
-        # 检查Git状态
-        result = subprocess.run(["git", "status", "--porcelain"],
+        # 检查Git状态（-z：路径不转义，空格/重命名安全）
+        result = subprocess.run(["git", "status", "--porcelain", "-z"],
                               cwd=project_root, capture_output=True, text=True)
+        entries = parse_porcelain_z(result.stdout)
+        phase_start = mark("status", started)
 
-        if not result.stdout.strip():
+        if not entries:
             return "📭 没有需要提交的更改"
 
         # 分析更改类型
-        changed_files = result.stdout.strip().split('\n')
-        changes = []
-
-        for line in changed_files:
-            if line.strip():
-                status = line[:2]
-                file_path = line[3:]
-                changes.append((status, file_path))
+        changes = [(status, file_path) for status, file_path, _ in entries]
 
         # 生成智能提交消息
         if not commit_message:
@@ -374,26 +436,32 @@ def smart_commit(project_path: str, commit_message: str = "") -> str:
         validation = validate_commit_message(project_path, commit_message)
         if "❌" in validation:
             return validation
+        phase_start = mark("validate", phase_start)
 
-        # 添加文件到暂存区
-        for status, file_path in changes:
-            if status.strip():  # 有更改的文件
-                subprocess.run(["git", "add", file_path], cwd=project_root, capture_output=True)
+        # 添加文件到暂存区（重命名条目的原路径删除已在索引中，只暂存新路径）
+        staged = stage_paths(project_root, [file_path for _, file_path in changes])
+        phase_start = mark("stage", phase_start)
+        if staged.returncode != 0:
+            return f"❌ 暂存失败: {staged.stderr}"
 
         # 提交
         result = subprocess.run(["git", "commit", "-m", commit_message],
                               cwd=project_root, capture_output=True, text=True)
+        mark("commit", phase_start)
+        timings["total"] = (time.perf_counter() - started) * 1000
+        timing_report = ", ".join(f"{phase} {ms:.1f}ms" for phase, ms in timings.items())
 
         if result.returncode == 0:
             return f"""🎯 智能提交成功！
 
 📝 提交消息: {commit_message}
-📁 文件数量: {len([c for c in changes if c[0].strip()])}
+📁 文件数量: {len(changes)}
 🔍 DNASPEC规则: 已自动应用
 ✅ 项目宪法: 已遵守
+⏱️ 阶段耗时: {timing_report}
 
 提交的文件:
-{chr(10).join(f'  {status} {path}' for status, path in changes if status.strip())}
+{chr(10).join(f'  {status} {path}' for status, path in changes)}
 """
         else:
             return f"❌ 提交失败: {result.stderr}"
@@ -451,59 +519,223 @@ def generate_smart_commit_message(changes: List) -> str:
     return f"{commit_type}(workspace): {description}"
 
 
-def clean_workspace(project_path: str) -> str:
-    """
-    清理工作区，移除AI生成的临时文件
+# 要清理的临时文件模式（匹配项目根目录下的条目）
+TEMP_PATTERNS = [
+    "*ai_generated*",
+    "*experiment_*",
+    "*debug_*",
+    "*test_temp*",
+    "*_temp.*",
+    ".temp.*",
+    "cache_*.py"
+]
+
+# 任意层级都清理的缓存目录
+CACHE_DIR_NAMES = {"__pycache__"}
+
+# 从不进入的依赖/版本控制目录
+PRUNED_DIR_NAMES = {
+    ".git", ".hg", ".svn", "node_modules", ".venv", "venv",
+    ".tox", ".nox", "site-packages", "bower_components"
+}
+
+
+class _GitignoreRules:
+    """单个 .gitignore 文件的规则（支持 !取反、/锚定、目录专用的尾部 /）"""
+
+    def __init__(self, base: str, lines: List[str]):
+        self.base = base  # .gitignore 所在目录（相对项目根，'' 表示根目录）
+        self.rules: List[Tuple[Any, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            anchored = '/' in line
+            line = line.lstrip('/')
+            if not line:
+                continue
+            regex = self._translate(line)
+            if not anchored:
+                regex = r'(?:.*/)?' + regex
+            self.rules.append((re.compile(regex + r'\Z', re.S), negate, dir_only))
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        """gitignore 通配符转正则（* 不跨目录，** 跨任意层级）"""
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                parts.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                parts.append('[^/]')
+                i += 1
+            elif pattern[i] == '[' and ']' in pattern[i + 2:]:
+                close = pattern.index(']', i + 2)
+                body = pattern[i + 1:close]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                parts.append('[' + body.replace('\\', '\\\\') + ']')
+                i = close + 1
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        return ''.join(parts)
+
+    @classmethod
+    def load(cls, directory: str, base: str) -> Optional['_GitignoreRules']:
+        try:
+            with open(os.path.join(directory, '.gitignore'), 'r', encoding='utf-8', errors='replace') as f:
+                rules = cls(base, f.readlines())
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """返回 True/False 表示忽略/取消忽略，None 表示无规则匹配"""
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return None
+            rel_path = rel_path[len(self.base) + 1:]
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+def _is_ignored(rule_chain: List[_GitignoreRules], rel_path: str, is_dir: bool) -> bool:
+    ignored = False
+    for rules in rule_chain:
+        matched = rules.match(rel_path, is_dir)
+        if matched is not None:
+            ignored = matched
+    return ignored
+
+
+def scan_workspace(
+    project_root: Path,
+    temp_patterns: Optional[List[str]] = None,
+    honor_gitignore: bool = True
+) -> Tuple[List[Path], List[Path]]:
     """
-    project_root = Path(project_path).resolve()
+    单次遍历扫描可清理的条目
 
-    # 要清理的文件模式
-    temp_patterns = [
-        "*ai_generated*",
-        "*experiment_*",
-        "*debug_*",
-        "*test_temp*",
-        "*_temp.*",
-        ".temp.*",
-        "cache_*.py"
-    ]
+    根目录下匹配临时模式的文件/目录，以及任意层级的 __pycache__ 目录都会被收集；
+    依赖目录和被 .gitignore 忽略的目录不会进入。
 
-    cleaned_files = []
-    cleaned_dirs = []
+    Returns:
+        (文件列表, 目录列表)
+    """
+    project_root = Path(project_root)
+    patterns = TEMP_PATTERNS if temp_patterns is None else temp_patterns
+    temp_regex = re.compile('|'.join(fnmatch.translate(p) for p in patterns)) if patterns else None
 
-    for pattern in temp_patterns:
-        # 清理文件
-        for file_path in project_root.glob(pattern):
-            if file_path.is_file():
-                try:
-                    file_path.unlink()
-                    cleaned_files.append(str(file_path.relative_to(project_root)))
-                except:
-                    pass
-
-        # 清理目录
-        for dir_path in project_root.glob(pattern):
-            if dir_path.is_dir():
-                try:
-                    import shutil
-                    shutil.rmtree(dir_path)
-                    cleaned_dirs.append(str(dir_path.relative_to(project_root)))
-                except:
-                    pass
-
-    # 清理Python缓存
-    for cache_dir in project_root.rglob("__pycache__"):
+    files: List[Path] = []
+    dirs: List[Path] = []
+    root_rules = _GitignoreRules.load(str(project_root), '') if honor_gitignore else None
+    stack = [(str(project_root), '', [root_rules] if root_rules else [])]
+
+    while stack:
+        directory, rel_dir, rule_chain = stack.pop()
         try:
-            import shutil
-            shutil.rmtree(cache_dir)
-            cleaned_dirs.append(str(cache_dir.relative_to(project_root)))
-        except:
-            pass
+            with os.scandir(directory) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        if honor_gitignore and rel_dir and any(e.name == '.gitignore' for e in entries):
+            nested = _GitignoreRules.load(directory, rel_dir)
+            if nested:
+                rule_chain = rule_chain + [nested]
+
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            is_dir = entry.is_dir(follow_symlinks=False)
+
+            if not rel_dir and temp_regex and temp_regex.match(entry.name):
+                (dirs if is_dir else files).append(Path(entry.path))
+                continue
+            if not is_dir:
+                continue
+            if entry.name in CACHE_DIR_NAMES:
+                dirs.append(Path(entry.path))
+                continue
+            if entry.name in PRUNED_DIR_NAMES:
+                continue
+            if rule_chain and _is_ignored(rule_chain, rel_path, True):
+                continue
+            stack.append((entry.path, rel_path, rule_chain))
+
+    return files, dirs
+
+
+def _remove_path(path: Path) -> bool:
+    try:
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+        return True
+    except OSError:
+        return False
+
+
+def clean_workspace(project_path: str, dry_run: bool = False, workers: int = 0) -> str:
+    """
+    清理工作区，移除AI生成的临时文件
 
+    Args:
+        project_path: 项目路径
+        dry_run: 只列出将被清理的条目
+        workers: 删除线程数（大于1时并行删除）
+    """
+    project_root = Path(project_path).resolve()
+    files, dirs = scan_workspace(project_root)
+
+    if dry_run:
+        cleaned_files, cleaned_dirs = files, dirs
+    else:
+        targets = files + dirs
+        if workers and workers > 1 and len(targets) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                removed = list(pool.map(_remove_path, targets))
+        else:
+            removed = [_remove_path(target) for target in targets]
+        cleaned_files = [f for f, ok in zip(files, removed) if ok]
+        cleaned_dirs = [d for d, ok in zip(dirs, removed[len(files):]) if ok]
+
+    cleaned_files = [str(f.relative_to(project_root)) for f in cleaned_files]
+    cleaned_dirs = [str(d.relative_to(project_root)) for d in cleaned_dirs]
     total_cleaned = len(cleaned_files) + len(cleaned_dirs)
 
     if total_cleaned == 0:
         return "✅ 工作区已经清洁，无需清理"
+    elif dry_run:
+        return f"""🔍 工作区清理预览（未删除任何内容）
+
+📊 将清理:
+• 文件: {len(cleaned_files)} 个
+• 目录: {len(cleaned_dirs)} 个
+• 总计: {total_cleaned} 个
+
+{chr(10).join(f'  📄 {file}' for file in cleaned_files)}
+{chr(10).join(f'  📁 {dir}' for dir in cleaned_dirs)}
+"""
     else:
         result = f"""🧹 工作区清理完成！
 
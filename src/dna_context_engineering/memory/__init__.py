@@ -10,7 +10,24 @@ from .model import (
     MemoryModel
 )
 from .store import MemoryStore
-from .manager import MemoryManager, MemoryMixin
+from .backends import (
+    MemoryBackend,
+    JsonFileBackend,
+    SQLiteBackend,
+    create_backend,
+    migrate_backend
+)
+from .manager import MemoryManager, MemoryMixin, RECALL_KEYWORD, RECALL_SEMANTIC
+from .archive import (
+    MemoryArchiveWriter,
+    ArchiveIntegrityError,
+    export_memories,
+    export_store,
+    import_memories,
+    iter_archive,
+    verify_archive
+)
+from .semantic_index import SemanticMemoryIndex, HashedNgramVectorizer, semantic_available
 from .agent_memory_integration import (
     AgentWithMemory,
     AgentMemoryIntegrator,
@@ -39,8 +56,25 @@ __all__ = [
     'MemoryStats',
     'MemoryModel',
     'MemoryStore',
+    'MemoryBackend',
+    'JsonFileBackend',
+    'SQLiteBackend',
+    'create_backend',
+    'migrate_backend',
     'MemoryManager',
     'MemoryMixin',
+    'RECALL_KEYWORD',
+    'RECALL_SEMANTIC',
+    'SemanticMemoryIndex',
+    'HashedNgramVectorizer',
+    'semantic_available',
+    'MemoryArchiveWriter',
+    'ArchiveIntegrityError',
+    'export_memories',
+    'export_store',
+    'import_memories',
+    'iter_archive',
+    'verify_archive',
 
     # 智能体记忆集成
     'AgentWithMemory',
@@ -0,0 +1,148 @@
+"""
+访问统计日志 - 合并写回（write-behind）的 accessed_at / access_count 更新
+
+检索命中只记录到内存缓冲区，同一记忆的多次访问合并为一条；
+缓冲区按时间间隔或条目阈值批量写回后端，进程退出时自动刷新。
+"""
+import atexit
+import threading
+import time
+import weakref
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from .backends import MemoryBackend
+from .model import MemoryItem
+
+_live_journals: "weakref.WeakSet[AccessStatsJournal]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_journals():
+    for journal in list(_live_journals):
+        try:
+            journal.flush()
+        except Exception:
+            # 退出阶段不抛出异常
+            pass
+
+
+class AccessStatsJournal:
+    """
+    访问统计写回缓冲区
+
+    记录的是访问后的绝对值（最近访问时间、访问次数），写回时取较大值，
+    因此重复刷新或与 save_memory 交错都不会重复计数。
+    """
+
+    def __init__(
+        self,
+        backend: MemoryBackend,
+        flush_interval: float = 30.0,
+        flush_threshold: int = 100,
+        on_flush: Optional[Callable[[str, Dict[str, Tuple[datetime, int]], Any], None]] = None
+    ):
+        """
+        Args:
+            backend: 写回的存储后端
+            flush_interval: 距上次刷新超过该秒数时，下一次记录触发刷新
+            flush_threshold: 待写回记忆数达到该值时立即刷新
+            on_flush: 每个智能体写回后的回调（用于同步缓存），参数为智能体、写回的统计
+                和写回前读取的缓存签名
+        """
+        self.backend = backend
+        self.on_flush = on_flush
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self._pending: Dict[Tuple[str, str], Tuple[datetime, int]] = {}
+        self._lock = threading.RLock()
+        self._last_flush = time.monotonic()
+        self.flush_count = 0
+
+        _live_journals.add(self)
+
+    @property
+    def pending_count(self) -> int:
+        """待写回的记忆数"""
+        return len(self._pending)
+
+    def record(self, memory: MemoryItem):
+        """记录一次访问（使用 memory 上已更新的访问统计）"""
+        self.record_many([memory])
+
+    def record_many(self, memories: Iterable[MemoryItem]):
+        """批量记录访问，整批记录完成后再判断是否需要刷新"""
+        with self._lock:
+            for memory in memories:
+                key = (memory.agent_id, memory.memory_id)
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = (memory.accessed_at, memory.access_count)
+                else:
+                    self._pending[key] = (
+                        max(current[0], memory.accessed_at),
+                        max(current[1], memory.access_count)
+                    )
+            should_flush = (
+                len(self._pending) >= self.flush_threshold
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+
+        if should_flush:
+            self.flush()
+
+    def apply(self, memory: MemoryItem) -> bool:
+        """把尚未写回的访问统计叠加到加载出的记忆上"""
+        pending = self._pending.get((memory.agent_id, memory.memory_id))
+        if pending is None:
+            return False
+        memory.accessed_at = max(memory.accessed_at, pending[0])
+        memory.access_count = max(memory.access_count, pending[1])
+        return True
+
+    def discard(self, agent_id: str, memory_id: str):
+        """丢弃已删除记忆的待写回统计"""
+        with self._lock:
+            self._pending.pop((agent_id, memory_id), None)
+
+    def flush(self, agent_id: Optional[str] = None) -> int:
+        """
+        写回缓冲的访问统计
+
+        Args:
+            agent_id: 只写回该智能体（为None时写回全部）
+
+        Returns:
+            写回的记忆数
+        """
+        with self._lock:
+            if agent_id is None:
+                batch, self._pending = self._pending, {}
+                self._last_flush = time.monotonic()
+            else:
+                batch = {k: v for k, v in self._pending.items() if k[0] == agent_id}
+                for key in batch:
+                    del self._pending[key]
+
+            if not batch:
+                return 0
+
+            by_agent: Dict[str, Dict[str, Tuple[datetime, int]]] = {}
+            for (agent, memory_id), stats in batch.items():
+                by_agent.setdefault(agent, {})[memory_id] = stats
+
+            try:
+                for agent, updates in by_agent.items():
+                    before = self.backend.cache_signature(agent) if self.on_flush is not None else None
+                    self.backend.update_access(agent, updates)
+                    if self.on_flush is not None:
+                        self.on_flush(agent, updates, before)
+            except Exception:
+                # 写回失败时保留统计，等待下次刷新
+                for key, stats in batch.items():
+                    self._pending.setdefault(key, stats)
+                raise
+
+            self.flush_count += 1
+            return len(batch)
@@ -0,0 +1,226 @@
+"""
+记忆归档 - 流式导出/导入
+
+归档由两部分组成：
+- 数据文件：每行一条记忆（NDJSON），可选 gzip 压缩（*.ndjson.gz）
+- 清单文件：<数据文件>.manifest.json，记录格式版本、记录数、各智能体数量、
+  未压缩内容的 SHA-256，以及增量备份的起始时间
+
+导出和导入都逐条处理，不会把全部记忆加载到内存。
+"""
+import gzip
+import hashlib
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .model import MemoryItem
+
+ARCHIVE_FORMAT = "dnaspec-memory-archive"
+ARCHIVE_VERSION = 1
+
+
+class ArchiveIntegrityError(Exception):
+    """归档校验失败"""
+
+
+def manifest_path_for(archive_path: Path) -> Path:
+    """归档对应的清单文件路径"""
+    archive_path = Path(archive_path)
+    return archive_path.with_name(archive_path.name + '.manifest.json')
+
+
+def _open_archive(path: Path, mode: str):
+    if path.suffix == '.gz':
+        return gzip.open(path, mode + 'b')
+    return open(path, mode + 'b')
+
+
+class MemoryArchiveWriter:
+    """流式写入记忆归档（上下文管理器，关闭时写入清单）"""
+
+    def __init__(self, archive_path: Path, since: Optional[datetime] = None):
+        """
+        Args:
+            archive_path: 数据文件路径（以 .gz 结尾时启用压缩）
+            since: 增量备份的起始时间（记录到清单）
+        """
+        self.archive_path = Path(archive_path)
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        self.since = since
+        self.record_count = 0
+        self.agent_counts: Dict[str, int] = {}
+        self._sha256 = hashlib.sha256()
+        self._file = _open_archive(self.archive_path, 'w')
+        self._closed = False
+
+    def write(self, memory: MemoryItem):
+        """写入一条记忆"""
+        line = (json.dumps(memory.to_dict(), ensure_ascii=False) + '\n').encode('utf-8')
+        self._file.write(line)
+        self._sha256.update(line)
+        self.record_count += 1
+        self.agent_counts[memory.agent_id] = self.agent_counts.get(memory.agent_id, 0) + 1
+
+    def write_many(self, memories: Iterable[MemoryItem]) -> int:
+        """写入多条记忆"""
+        count = 0
+        for memory in memories:
+            self.write(memory)
+            count += 1
+        return count
+
+    def close(self) -> Dict[str, Any]:
+        """关闭数据文件并写入清单"""
+        if self._closed:
+            return self.manifest
+        self._file.close()
+        self._closed = True
+
+        self.manifest = {
+            'format': ARCHIVE_FORMAT,
+            'version': ARCHIVE_VERSION,
+            'created_at': datetime.now().isoformat(),
+            'archive_file': self.archive_path.name,
+            'compressed': self.archive_path.suffix == '.gz',
+            'incremental': self.since is not None,
+            'since': self.since.isoformat() if self.since else None,
+            'record_count': self.record_count,
+            'agents': self.agent_counts,
+            'sha256': self._sha256.hexdigest()
+        }
+        with open(manifest_path_for(self.archive_path), 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, ensure_ascii=False)
+        return self.manifest
+
+    def __enter__(self) -> 'MemoryArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self._closed = True
+
+
+def read_manifest(archive_path: Path) -> Dict[str, Any]:
+    """读取归档清单"""
+    manifest_file = manifest_path_for(archive_path)
+    if not manifest_file.exists():
+        raise ArchiveIntegrityError(f"缺少归档清单: {manifest_file}")
+
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != ARCHIVE_FORMAT:
+        raise ArchiveIntegrityError(f"不是记忆归档: {archive_path}")
+    if manifest.get('version', 0) > ARCHIVE_VERSION:
+        raise ArchiveIntegrityError(f"不支持的归档版本: {manifest.get('version')}")
+    return manifest
+
+
+def verify_archive(archive_path: Path) -> Dict[str, Any]:
+    """
+    流式校验归档的记录数与 SHA-256
+
+    Returns:
+        清单内容
+
+    Raises:
+        ArchiveIntegrityError: 校验失败
+    """
+    archive_path = Path(archive_path)
+    manifest = read_manifest(archive_path)
+
+    sha256 = hashlib.sha256()
+    count = 0
+    with _open_archive(archive_path, 'r') as f:
+        for line in f:
+            sha256.update(line)
+            count += 1
+
+    if count != manifest['record_count']:
+        raise ArchiveIntegrityError(f"记录数不一致: 清单 {manifest['record_count']}, 实际 {count}")
+    if sha256.hexdigest() != manifest['sha256']:
+        raise ArchiveIntegrityError("归档校验和不一致")
+    return manifest
+
+
+def iter_archive(archive_path: Path, verify: bool = True) -> Iterator[MemoryItem]:
+    """
+    逐条读取归档中的记忆
+
+    Args:
+        archive_path: 数据文件路径
+        verify: 读取前先校验完整性
+    """
+    archive_path = Path(archive_path)
+    if verify:
+        verify_archive(archive_path)
+
+    with _open_archive(archive_path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield MemoryItem.from_dict(json.loads(line))
+
+
+def export_memories(
+    sources: Iterable[Tuple[Any, str]],
+    archive_path: Path,
+    since: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """
+    把若干 (MemoryStore, agent_id) 的记忆流式导出为归档
+
+    Args:
+        sources: (存储, 智能体ID) 序列
+        archive_path: 数据文件路径（.gz 结尾时压缩）
+        since: 只导出该时间之后创建或变更的记忆（增量备份）
+
+    Returns:
+        清单内容
+    """
+    with MemoryArchiveWriter(archive_path, since=since) as writer:
+        for store, agent_id in sources:
+            writer.write_many(store.iter_memories(agent_id, since))
+    return writer.manifest
+
+
+def export_store(
+    store: Any,
+    archive_path: Path,
+    since: Optional[datetime] = None,
+    agent_ids: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """导出整个存储（或指定智能体）的记忆"""
+    if agent_ids is None:
+        agent_ids = store.list_agents()
+    return export_memories(((store, agent_id) for agent_id in agent_ids), archive_path, since)
+
+
+def import_memories(
+    store: Any,
+    archive_path: Path,
+    verify: bool = True,
+    batch_size: int = 500
+) -> Dict[str, int]:
+    """
+    从归档流式导入记忆（按批写入存储，同ID记忆被覆盖）
+
+    Returns:
+        每个智能体导入的记忆数
+    """
+    imported: Dict[str, int] = {}
+    batch: List[MemoryItem] = []
+
+    for memory in iter_archive(archive_path, verify=verify):
+        batch.append(memory)
+        imported[memory.agent_id] = imported.get(memory.agent_id, 0) + 1
+        if len(batch) >= batch_size:
+            store.save_memories(batch)
+            batch = []
+
+    store.save_memories(batch)
+    return imported
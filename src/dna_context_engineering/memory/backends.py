@@ -0,0 +1,499 @@
+"""
+记忆存储后端 - 可插拔的持久化实现
+
+- JsonFileBackend: 每条记忆一个JSON文件（原有目录布局）
+- SQLiteBackend: 单文件索引存储，按 agent/类型/重要性/时间建立索引
+"""
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Type
+from datetime import datetime
+
+from .model import MemoryItem, MemoryType, MemoryStats
+
+
+def compute_stats(memories: List[MemoryItem]) -> MemoryStats:
+    """根据已加载的记忆计算统计"""
+    stats = MemoryStats(
+        total_memories=len(memories),
+        short_term_count=sum(1 for m in memories if m.memory_type == MemoryType.SHORT_TERM),
+        long_term_count=sum(1 for m in memories if m.memory_type == MemoryType.LONG_TERM),
+        total_size=sum(len(m.content) for m in memories)
+    )
+
+    if memories:
+        stats.oldest_memory = min(m.created_at for m in memories)
+        stats.newest_memory = max(m.created_at for m in memories)
+
+    return stats
+
+
+class MemoryBackend(ABC):
+    """记忆存储后端接口"""
+
+    name = "abstract"
+
+    def __init__(self, storage_path: Path):
+        self.storage_path = Path(storage_path)
+        self.storage_path.mkdir(parents=True, exist_ok=True)
+
+    @abstractmethod
+    def save(self, memory: MemoryItem):
+        """保存（插入或覆盖）一条记忆"""
+
+    def save_many(self, memories: Iterable[MemoryItem]) -> int:
+        """批量保存记忆"""
+        count = 0
+        for memory in memories:
+            self.save(memory)
+            count += 1
+        return count
+
+    @abstractmethod
+    def load(self, memory_id: str, agent_id: str) -> Optional[MemoryItem]:
+        """加载单条记忆"""
+
+    @abstractmethod
+    def load_agent(
+        self,
+        agent_id: str,
+        memory_type: Optional[MemoryType] = None
+    ) -> List[MemoryItem]:
+        """加载智能体的记忆（按访问时间倒序）"""
+
+    @abstractmethod
+    def delete(self, memory_id: str, agent_id: str) -> bool:
+        """删除记忆"""
+
+    @abstractmethod
+    def list_agents(self) -> List[str]:
+        """列出有记忆的智能体"""
+
+    def list_ids(self, agent_id: str) -> Set[str]:
+        """智能体全部记忆的ID（默认实现：遍历记忆）"""
+        return {memory.memory_id for memory in self.iter_agent(agent_id)}
+
+    def iter_agent(self, agent_id: str, since: Optional[datetime] = None) -> Iterator[MemoryItem]:
+        """
+        逐条遍历智能体的记忆（不保证顺序）
+
+        Args:
+            agent_id: 智能体ID
+            since: 只返回该时间之后创建或访问过的记忆
+        """
+        for memory in self.load_agent(agent_id):
+            if since is None or max(memory.created_at, memory.accessed_at) >= since:
+                yield memory
+
+    def update_access(self, agent_id: str, updates: Dict[str, Tuple[datetime, int]]) -> int:
+        """
+        批量写回访问统计（取已存储值与新值中的较大者）
+
+        Args:
+            agent_id: 智能体ID
+            updates: memory_id -> (accessed_at, access_count)
+
+        Returns:
+            实际更新的记忆数
+        """
+        updated = 0
+        for memory_id, (accessed_at, access_count) in updates.items():
+            memory = self.load(memory_id, agent_id)
+            if memory is None:
+                continue
+            memory.accessed_at = max(memory.accessed_at, accessed_at)
+            memory.access_count = max(memory.access_count, access_count)
+            self.save(memory)
+            updated += 1
+        return updated
+
+    def cache_signature(self, agent_id: str) -> Optional[Hashable]:
+        """
+        智能体数据的变更签名，签名不变则缓存的记忆仍然有效
+
+        返回 None 表示该后端不支持缓存。
+        """
+        return None
+
+    # 后端是否能在不加载记忆的情况下计算统计
+    native_stats = False
+
+    def stats(self, agent_id: str) -> MemoryStats:
+        """获取记忆统计（默认实现：全量加载后计算）"""
+        return compute_stats(self.load_agent(agent_id))
+
+    def close(self):
+        """释放后端资源"""
+
+
+class JsonFileBackend(MemoryBackend):
+    """JSON文件后端：agents/<agent_id>/<memory_id>.json"""
+
+    name = "json"
+
+    def __init__(self, storage_path: Path):
+        super().__init__(storage_path)
+        self.agents_dir = self.storage_path / 'agents'
+        self.agents_dir.mkdir(exist_ok=True)
+
+    def _memory_file(self, memory_id: str, agent_id: str) -> Path:
+        return self.agents_dir / agent_id / f"{memory_id}.json"
+
+    def save(self, memory: MemoryItem):
+        agent_dir = self.agents_dir / memory.agent_id
+        agent_dir.mkdir(exist_ok=True)
+
+        with open(self._memory_file(memory.memory_id, memory.agent_id), 'w', encoding='utf-8') as f:
+            json.dump(memory.to_dict(), f, indent=2, ensure_ascii=False)
+
+    def load(self, memory_id: str, agent_id: str) -> Optional[MemoryItem]:
+        memory_file = self._memory_file(memory_id, agent_id)
+
+        if not memory_file.exists():
+            return None
+
+        with open(memory_file, 'r', encoding='utf-8') as f:
+            return MemoryItem.from_dict(json.load(f))
+
+    def load_agent(
+        self,
+        agent_id: str,
+        memory_type: Optional[MemoryType] = None
+    ) -> List[MemoryItem]:
+        agent_dir = self.agents_dir / agent_id
+
+        if not agent_dir.exists():
+            return []
+
+        memories = []
+        for memory_file in agent_dir.glob('*.json'):
+            try:
+                with open(memory_file, 'r', encoding='utf-8') as f:
+                    memory = MemoryItem.from_dict(json.load(f))
+            except Exception:
+                # 跳过损坏的记忆文件
+                continue
+
+            if memory_type is None or memory.memory_type == memory_type:
+                memories.append(memory)
+
+        # 按访问时间排序（最新在前）
+        memories.sort(key=lambda m: m.accessed_at, reverse=True)
+
+        return memories
+
+    def delete(self, memory_id: str, agent_id: str) -> bool:
+        memory_file = self._memory_file(memory_id, agent_id)
+
+        if memory_file.exists():
+            memory_file.unlink()
+            return True
+        return False
+
+    def list_agents(self) -> List[str]:
+        return sorted(p.name for p in self.agents_dir.iterdir() if p.is_dir())
+
+    def list_ids(self, agent_id: str) -> Set[str]:
+        try:
+            with os.scandir(self.agents_dir / agent_id) as entries:
+                return {entry.name[:-5] for entry in entries if entry.name.endswith('.json')}
+        except FileNotFoundError:
+            return set()
+
+    def iter_agent(self, agent_id: str, since: Optional[datetime] = None) -> Iterator[MemoryItem]:
+        agent_dir = self.agents_dir / agent_id
+        if not agent_dir.exists():
+            return
+
+        # 增量遍历用文件 mtime 过滤，未变化的文件无需打开
+        since_ts = since.timestamp() if since is not None else None
+        with os.scandir(agent_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.json') or not entry.is_file():
+                    continue
+                if since_ts is not None and entry.stat().st_mtime < since_ts:
+                    continue
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        yield MemoryItem.from_dict(json.load(f))
+                except Exception:
+                    # 跳过损坏的记忆文件
+                    continue
+
+    def cache_signature(self, agent_id: str) -> Optional[Hashable]:
+        # 原地改写记忆文件不会改变目录 mtime，签名取每个记忆文件的 mtime 和大小
+        try:
+            with os.scandir(self.agents_dir / agent_id) as entries:
+                return frozenset(
+                    (entry.name, stat.st_mtime_ns, stat.st_size)
+                    for entry in entries if entry.name.endswith('.json')
+                    for stat in (entry.stat(),)
+                )
+        except FileNotFoundError:
+            return 'absent'
+
+
+class SQLiteBackend(MemoryBackend):
+    """SQLite单文件后端：memories.db"""
+
+    name = "sqlite"
+    DB_FILENAME = 'memories.db'
+    native_stats = True
+    ITER_BATCH = 500
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS memories (
+            memory_id    TEXT PRIMARY KEY,
+            agent_id     TEXT NOT NULL,
+            memory_type  TEXT NOT NULL,
+            importance   TEXT NOT NULL,
+            content      TEXT NOT NULL,
+            created_at   TEXT NOT NULL,
+            accessed_at  TEXT NOT NULL,
+            access_count INTEGER NOT NULL DEFAULT 0,
+            tags         TEXT NOT NULL DEFAULT '[]',
+            metadata     TEXT NOT NULL DEFAULT '{}'
+        );
+        CREATE INDEX IF NOT EXISTS idx_memories_agent_type
+            ON memories(agent_id, memory_type);
+        CREATE INDEX IF NOT EXISTS idx_memories_agent_importance
+            ON memories(agent_id, importance);
+        CREATE INDEX IF NOT EXISTS idx_memories_agent_accessed
+            ON memories(agent_id, accessed_at);
+        CREATE INDEX IF NOT EXISTS idx_memories_agent_created
+            ON memories(agent_id, created_at);
+    """
+
+    _COLUMNS = (
+        "memory_id, agent_id, memory_type, importance, content, "
+        "created_at, accessed_at, access_count, tags, metadata"
+    )
+
+    def __init__(self, storage_path: Path):
+        super().__init__(storage_path)
+        self.db_path = self.storage_path / self.DB_FILENAME
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self._SCHEMA)
+        self._conn.commit()
+
+    @staticmethod
+    def _timestamp(value: datetime) -> str:
+        # 固定精度，保证字符串顺序与时间顺序一致
+        return value.isoformat(timespec='microseconds')
+
+    def _to_row(self, memory: MemoryItem) -> tuple:
+        return (
+            memory.memory_id,
+            memory.agent_id,
+            memory.memory_type.value,
+            memory.importance.value,
+            memory.content,
+            self._timestamp(memory.created_at),
+            self._timestamp(memory.accessed_at),
+            memory.access_count,
+            json.dumps(memory.tags, ensure_ascii=False),
+            json.dumps(memory.metadata, ensure_ascii=False)
+        )
+
+    @staticmethod
+    def _from_row(row: tuple) -> MemoryItem:
+        return MemoryItem.from_dict({
+            'memory_id': row[0],
+            'agent_id': row[1],
+            'memory_type': row[2],
+            'importance': row[3],
+            'content': row[4],
+            'created_at': row[5],
+            'accessed_at': row[6],
+            'access_count': row[7],
+            'tags': json.loads(row[8]),
+            'metadata': json.loads(row[9])
+        })
+
+    def save(self, memory: MemoryItem):
+        self.save_many([memory])
+
+    def save_many(self, memories: Iterable[MemoryItem]) -> int:
+        rows = [self._to_row(m) for m in memories]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO memories ({self._COLUMNS}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def load(self, memory_id: str, agent_id: str) -> Optional[MemoryItem]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {self._COLUMNS} FROM memories WHERE memory_id = ? AND agent_id = ?",
+                (memory_id, agent_id)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def load_agent(
+        self,
+        agent_id: str,
+        memory_type: Optional[MemoryType] = None
+    ) -> List[MemoryItem]:
+        query = f"SELECT {self._COLUMNS} FROM memories WHERE agent_id = ?"
+        params: list = [agent_id]
+        if memory_type is not None:
+            query += " AND memory_type = ?"
+            params.append(memory_type.value)
+        query += " ORDER BY accessed_at DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        memories = []
+        for row in rows:
+            try:
+                memories.append(self._from_row(row))
+            except Exception:
+                # 跳过损坏的记录
+                continue
+        return memories
+
+    def delete(self, memory_id: str, agent_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM memories WHERE memory_id = ? AND agent_id = ?",
+                (memory_id, agent_id)
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def update_access(self, agent_id: str, updates: Dict[str, Tuple[datetime, int]]) -> int:
+        rows = [
+            (self._timestamp(accessed_at), access_count, memory_id, agent_id)
+            for memory_id, (accessed_at, access_count) in updates.items()
+        ]
+        with self._lock:
+            cursor = self._conn.executemany(
+                "UPDATE memories SET accessed_at = MAX(accessed_at, ?), "
+                "access_count = MAX(access_count, ?) "
+                "WHERE memory_id = ? AND agent_id = ?",
+                rows
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def list_agents(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT agent_id FROM memories ORDER BY agent_id"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def list_ids(self, agent_id: str) -> Set[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT memory_id FROM memories WHERE agent_id = ?", (agent_id,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def iter_agent(self, agent_id: str, since: Optional[datetime] = None) -> Iterator[MemoryItem]:
+        query = f"SELECT {self._COLUMNS} FROM memories WHERE agent_id = ?"
+        params: list = [agent_id]
+        if since is not None:
+            query += " AND (created_at >= ? OR accessed_at >= ?)"
+            params += [self._timestamp(since)] * 2
+
+        # 独立游标分批读取，避免一次性加载全部行
+        with self._lock:
+            cursor = self._conn.execute(query, params)
+            batch = cursor.fetchmany(self.ITER_BATCH)
+        while batch:
+            for row in batch:
+                try:
+                    yield self._from_row(row)
+                except Exception:
+                    continue
+            with self._lock:
+                batch = cursor.fetchmany(self.ITER_BATCH)
+
+    def cache_signature(self, agent_id: str) -> Optional[Hashable]:
+        # data_version 只在其他连接提交后变化，本连接的写入由存储自行同步缓存
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def stats(self, agent_id: str) -> MemoryStats:
+        with self._lock:
+            row = self._conn.execute(
+                """
+                SELECT COUNT(*),
+                       COALESCE(SUM(memory_type = ?), 0),
+                       COALESCE(SUM(memory_type = ?), 0),
+                       COALESCE(SUM(LENGTH(content)), 0),
+                       MIN(created_at),
+                       MAX(created_at)
+                FROM memories WHERE agent_id = ?
+                """,
+                (MemoryType.SHORT_TERM.value, MemoryType.LONG_TERM.value, agent_id)
+            ).fetchone()
+
+        return MemoryStats(
+            total_memories=row[0],
+            short_term_count=row[1],
+            long_term_count=row[2],
+            total_size=row[3],
+            oldest_memory=datetime.fromisoformat(row[4]) if row[4] else None,
+            newest_memory=datetime.fromisoformat(row[5]) if row[5] else None
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+BACKENDS: Dict[str, Type[MemoryBackend]] = {
+    JsonFileBackend.name: JsonFileBackend,
+    SQLiteBackend.name: SQLiteBackend,
+}
+
+
+def create_backend(name: str, storage_path: Path) -> MemoryBackend:
+    """按名称创建存储后端"""
+    if name not in BACKENDS:
+        raise ValueError(f"未知的记忆存储后端: {name}（可选: {', '.join(BACKENDS)}）")
+    return BACKENDS[name](storage_path)
+
+
+def migrate_backend(
+    storage_path: Path,
+    source: str = JsonFileBackend.name,
+    target: str = SQLiteBackend.name
+) -> Dict[str, int]:
+    """
+    一次性迁移记忆数据（默认从JSON目录布局迁移到SQLite）
+
+    源数据保持不变；重复执行是幂等的。
+
+    Returns:
+        每个智能体迁移的记忆数量
+    """
+    if source == target:
+        raise ValueError("源后端和目标后端不能相同")
+
+    source_backend = create_backend(source, storage_path)
+    target_backend = create_backend(target, storage_path)
+
+    migrated: Dict[str, int] = {}
+    try:
+        for agent_id in source_backend.list_agents():
+            memories = source_backend.load_agent(agent_id)
+            migrated[agent_id] = target_backend.save_many(memories)
+    finally:
+        source_backend.close()
+        target_backend.close()
+
+    return migrated
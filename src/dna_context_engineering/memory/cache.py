@@ -0,0 +1,147 @@
+"""
+记忆对象缓存 - 按智能体缓存已解析的 MemoryItem
+
+缓存项带有后端提供的签名（记忆文件 mtime / 数据库 data_version），签名变化即视为
+外部修改而失效；存储自身的写入在写入前签名与缓存一致时直接更新缓存，不必重新解析。
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .model import MemoryItem
+
+
+class MemoryItemCache:
+    """有界的智能体级 LRU 缓存"""
+
+    def __init__(self, max_agents: int = 32):
+        """
+        Args:
+            max_agents: 最多缓存的智能体数（0 表示禁用缓存）
+        """
+        self.max_agents = max_agents
+        self._entries: "OrderedDict[str, Tuple[Hashable, Dict[str, MemoryItem]]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_agents > 0
+
+    def get(self, agent_id: str, signature: Hashable) -> Optional[List[MemoryItem]]:
+        """
+        获取智能体的缓存记忆（返回副本，调用方可自由修改）
+
+        签名不一致时视为失效并返回 None。
+        """
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            if entry is None or signature is None or entry[0] != signature:
+                if entry is not None:
+                    del self._entries[agent_id]
+                    self.invalidations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(agent_id)
+            self.hits += 1
+            return [copy.copy(m) for m in entry[1].values()]
+
+    def peek(self, agent_id: str, memory_id: str, signature: Hashable) -> Optional[MemoryItem]:
+        """在不影响命中统计的情况下查找单条记忆"""
+        with self._lock:
+            entry = self._entries.get(agent_id)
+            if entry is None or signature is None or entry[0] != signature:
+                return None
+            memory = entry[1].get(memory_id)
+            return copy.copy(memory) if memory is not None else None
+
+    def put(self, agent_id: str, signature: Hashable, memories: List[MemoryItem]):
+        """缓存智能体的全部记忆"""
+        if not self.enabled or signature is None:
+            return
+        with self._lock:
+            self._entries[agent_id] = (signature, {m.memory_id: copy.copy(m) for m in memories})
+            self._entries.move_to_end(agent_id)
+            while len(self._entries) > self.max_agents:
+                self._entries.popitem(last=False)
+
+    def _writable_entry(self, agent_id: str, before: Hashable, after: Hashable):
+        """
+        取出可直接修补的缓存项
+
+        写入前读到的签名与缓存签名不一致，说明在缓存快照之后有其他存储写入过，
+        修补会把外部修改吞掉，此时丢弃缓存项而不是更新它。
+        """
+        entry = self._entries.get(agent_id)
+        if entry is None:
+            return None
+        if before is None or after is None or entry[0] != before:
+            del self._entries[agent_id]
+            self.invalidations += 1
+            return None
+        return entry
+
+    def upsert(self, memory: MemoryItem, before: Hashable, after: Hashable):
+        """
+        存储自身写入后更新缓存
+
+        Args:
+            memory: 写入的记忆
+            before: 写入前读取的签名
+            after: 写入后读取的签名
+        """
+        with self._lock:
+            entry = self._writable_entry(memory.agent_id, before, after)
+            if entry is None:
+                return
+            entry[1][memory.memory_id] = copy.copy(memory)
+            self._entries[memory.agent_id] = (after, entry[1])
+
+    def remove(self, agent_id: str, memory_id: str, before: Hashable, after: Hashable):
+        """存储自身删除后更新缓存"""
+        with self._lock:
+            entry = self._writable_entry(agent_id, before, after)
+            if entry is None:
+                return
+            entry[1].pop(memory_id, None)
+            self._entries[agent_id] = (after, entry[1])
+
+    def update_access(self, agent_id: str, updates: Dict[str, Tuple[Any, int]],
+                      before: Hashable, after: Hashable):
+        """访问统计写回后同步缓存"""
+        with self._lock:
+            entry = self._writable_entry(agent_id, before, after)
+            if entry is None:
+                return
+            for memory_id, (accessed_at, access_count) in updates.items():
+                memory = entry[1].get(memory_id)
+                if memory is not None:
+                    memory.accessed_at = max(memory.accessed_at, accessed_at)
+                    memory.access_count = max(memory.access_count, access_count)
+            self._entries[agent_id] = (after, entry[1])
+
+    def invalidate(self, agent_id: Optional[str] = None):
+        """使缓存失效（agent_id 为 None 时清空）"""
+        with self._lock:
+            if agent_id is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            elif self._entries.pop(agent_id, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """命中统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'invalidations': self.invalidations,
+                'cached_agents': len(self._entries),
+                'cached_memories': sum(len(entry[1]) for entry in self._entries.values())
+            }
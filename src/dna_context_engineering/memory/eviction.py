@@ -0,0 +1,172 @@
+"""
+记忆淘汰索引 - 按衰减分数维护的最小堆
+
+每个智能体、每种记忆类型一个堆，插入/更新/淘汰均为 O(log N)（摊还）。
+
+衰减分数随时间下降（新近度 1 - 天数/30，30天后截断为0），入堆时的分数会过时，
+因此堆不直接存分数，而是存与时间无关的排序键：把新近度换成不截断的线性形式
+1 - 年龄/30 后，随时间变化的部分对所有记忆相同，可以平移掉。该键是“当前分数 +
+公共时间项”的下界，淘汰时从堆顶取出下界不超过已知最小值的候选，按当前时间重新
+打分后选出真正的最低分；已截断的候选按当前分数重新入堆（此后其键只增不减）。
+"""
+import copy
+import heapq
+import itertools
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .model import MemoryItem, MemoryModel
+
+# 与 MemoryModel.calculate_decay_score 的新近度项一致：权重 0.2，30天衰减到0
+RECENCY_WEIGHT = 0.2
+RECENCY_DAYS = 30
+RECENCY_WINDOW = RECENCY_DAYS * 86400.0
+
+
+def _sort_key(memory: MemoryItem) -> float:
+    """与时间无关的排序键（当前分数加公共时间项后的下界）"""
+    recency = max(0.0, 1.0 - (datetime.now() - memory.created_at).days / RECENCY_DAYS)
+    static = MemoryModel.calculate_decay_score(memory) - RECENCY_WEIGHT * recency
+    return static + RECENCY_WEIGHT * (1.0 + memory.created_at.timestamp() / RECENCY_WINDOW)
+
+
+def _current_key(memory: MemoryItem, now: datetime) -> float:
+    """按当前时间计算的分数，加上与排序键相同的公共时间项"""
+    return MemoryModel.calculate_decay_score(memory) + RECENCY_WEIGHT * now.timestamp() / RECENCY_WINDOW
+
+
+class _AgentHeaps:
+    """单个智能体的淘汰堆"""
+
+    def __init__(self):
+        self.heaps: Dict[str, List[Tuple[float, int, str]]] = {}
+        # memory_id -> (记忆快照, 有效的入堆序号)
+        self.members: Dict[str, Tuple[MemoryItem, int]] = {}
+        self.counts: Dict[str, int] = {}
+
+
+class DecayEvictionIndex:
+    """衰减分数淘汰索引"""
+
+    def __init__(self):
+        self._agents: Dict[str, _AgentHeaps] = {}
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+        self.evicted = 0
+
+    def is_tracked(self, agent_id: str) -> bool:
+        """智能体是否已建立索引"""
+        return agent_id in self._agents
+
+    def build(self, agent_id: str, memories: List[MemoryItem]):
+        """用智能体的现有记忆建立索引（每个智能体只需一次）"""
+        with self._lock:
+            agent = _AgentHeaps()
+            for memory in memories:
+                self._push(agent, memory)
+            for heap in agent.heaps.values():
+                heapq.heapify(heap)
+            self._agents[agent_id] = agent
+
+    def _push(self, agent: _AgentHeaps, memory: MemoryItem, heapify: bool = False):
+        seq = next(self._seq)
+        type_key = memory.memory_type.value
+        previous = agent.members.get(memory.memory_id)
+        if previous is not None:
+            agent.counts[previous[0].memory_type.value] -= 1
+
+        agent.members[memory.memory_id] = (memory, seq)
+        agent.counts[type_key] = agent.counts.get(type_key, 0) + 1
+        entry = (_sort_key(memory), seq, memory.memory_id)
+        heap = agent.heaps.setdefault(type_key, [])
+        if not heapify:
+            heap.append(entry)
+            return
+
+        heapq.heappush(heap, entry)
+        if len(heap) > 2 * agent.counts[type_key] + 64:
+            self._compact(agent, type_key)
+
+    @staticmethod
+    def _compact(agent: _AgentHeaps, type_key: str):
+        """清除过期条目，避免频繁更新导致堆无限增长"""
+        heap = [
+            entry for entry in agent.heaps[type_key]
+            if agent.members.get(entry[2], (None, None))[1] == entry[1]
+        ]
+        heapq.heapify(heap)
+        agent.heaps[type_key] = heap
+
+    def upsert(self, memory: MemoryItem):
+        """新增或更新记忆（未建立索引的智能体忽略）"""
+        with self._lock:
+            agent = self._agents.get(memory.agent_id)
+            if agent is not None:
+                self._push(agent, copy.copy(memory), heapify=True)
+
+    def remove(self, agent_id: str, memory_id: str):
+        """移除记忆（堆中条目惰性失效）"""
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if agent is None:
+                return
+            member = agent.members.pop(memory_id, None)
+            if member is not None:
+                agent.counts[member[0].memory_type.value] -= 1
+
+    def forget(self, agent_id: str):
+        """丢弃智能体的索引"""
+        with self._lock:
+            self._agents.pop(agent_id, None)
+
+    def count(self, agent_id: str, memory_type_value: str) -> int:
+        """某类记忆的数量"""
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            return agent.counts.get(memory_type_value, 0) if agent else 0
+
+    def pop_lowest(self, agent_id: str, memory_type_value: str) -> Optional[str]:
+        """
+        取出并移除分数最低的记忆
+
+        Returns:
+            记忆ID（没有可淘汰的记忆时返回None）
+        """
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if agent is None:
+                return None
+            heap = agent.heaps.get(memory_type_value, [])
+            now = datetime.now()
+
+            # 堆中的键是下界：堆顶的键不小于已知最低的当前分数时，其余记忆不可能更低
+            candidates: List[Tuple[float, Tuple[float, int, str]]] = []
+            best = None
+            while heap and (best is None or heap[0][0] < best[0]):
+                entry = heapq.heappop(heap)
+                member = agent.members.get(entry[2])
+                if member is None or member[1] != entry[1]:
+                    continue  # 已删除或已更新的过期条目
+                current = _current_key(member[0], now)
+                candidates.append((current, entry))
+                if best is None or current < best[0]:
+                    best = (current, entry)
+
+            if best is None:
+                return None
+
+            for current, entry in candidates:
+                if entry is best[1]:
+                    continue
+                memory = agent.members[entry[2]][0]
+                if (now - memory.created_at).days >= RECENCY_DAYS:
+                    # 新近度已截断，分数不再随时间下降，当前值此后一直是下界
+                    entry = (current, entry[1], entry[2])
+                heapq.heappush(heap, entry)
+
+            memory_id = best[1][2]
+            del agent.members[memory_id]
+            agent.counts[memory_type_value] -= 1
+            self.evicted += 1
+            return memory_id
@@ -13,6 +13,11 @@ from .model import (
     MemoryModel
 )
 from .store import MemoryStore
+from .text_index import tokenize
+
+# 检索模式
+RECALL_KEYWORD = "keyword"
+RECALL_SEMANTIC = "semantic"
 
 
 class MemoryManager:
@@ -39,7 +44,14 @@ class MemoryManager:
 
         # 初始化存储
         storage_path = self.config.storage_path
-        self.store = MemoryStore(storage_path)
+        self.store = MemoryStore(
+            storage_path,
+            backend=self.config.backend,
+            access_flush_interval=self.config.access_flush_interval,
+            access_flush_threshold=self.config.access_flush_threshold,
+            cache_max_agents=self.config.cache_max_agents,
+            semantic_dim=self.config.semantic_dim if self.config.semantic_recall else None
+        )
 
         # 内存缓存（短期记忆）
         self._short_term_cache: Dict[str, List[MemoryItem]] = {}
@@ -49,6 +61,11 @@ class MemoryManager:
         """检查记忆功能是否启用"""
         return self.config.enabled and self.store is not None
 
+    @property
+    def semantic_enabled(self) -> bool:
+        """检查语义检索是否可用"""
+        return self.is_enabled and self.store.semantic_index is not None
+
     def add_memory(
         self,
         agent_id: str,
@@ -98,6 +115,10 @@ class MemoryManager:
         # 保存到存储
         self.store.save_memory(memory)
 
+        # 插入时即按上限淘汰（O(log N)），避免积累到清理时再全量排序
+        if self.config.auto_cleanup:
+            self._enforce_limit(agent_id, memory_type)
+
         # 添加到缓存
         if memory_type == MemoryType.SHORT_TERM:
             if agent_id not in self._short_term_cache:
@@ -111,7 +132,8 @@ class MemoryManager:
         agent_id: str,
         query: str,
         memory_type: Optional[MemoryType] = None,
-        limit: int = 10
+        limit: int = 10,
+        mode: Optional[str] = None
     ) -> List[MemoryItem]:
         """
         检索记忆
@@ -121,31 +143,38 @@ class MemoryManager:
             query: 查询字符串
             memory_type: 记忆类型过滤
             limit: 返回数量限制
+            mode: 检索模式（keyword: BM25关键词；semantic: 语义相似度）；
+                为None时启用语义检索则用 semantic，否则用 keyword
 
         Returns:
-            相关记忆列表（如果未启用则返回空列表）
+            按相关度排序的记忆列表（如果未启用则返回空列表）
         """
         if not self.is_enabled:
             return []
 
-        # 从存储加载所有记忆
-        memories = self.store.load_agent_memories(agent_id, memory_type)
-
-        # 简单的关键词匹配
-        query_lower = query.lower()
-        relevant_memories = []
-
-        for memory in memories:
-            # 检查内容是否包含查询词
-            if query_lower in memory.content.lower():
-                # 更新访问信息
-                memory.accessed_at = datetime.now()
-                memory.access_count += 1
-
-                relevant_memories.append(memory)
+        if mode is None:
+            mode = RECALL_SEMANTIC if self.semantic_enabled else RECALL_KEYWORD
+        if mode not in (RECALL_KEYWORD, RECALL_SEMANTIC):
+            raise ValueError(f"未知的检索模式: {mode}")
 
-                if len(relevant_memories) >= limit:
-                    break
+        # 有可索引词时走索引（语义或BM25排序），否则退回子串匹配
+        if tokenize(query) and mode == RECALL_SEMANTIC:
+            relevant_memories = self.store.semantic_search_memories(agent_id, query, memory_type, limit)
+        elif tokenize(query):
+            relevant_memories = self.store.search_memories(agent_id, query, memory_type, limit)
+        else:
+            query_lower = query.lower()
+            relevant_memories = [
+                memory for memory in self.store.load_agent_memories(agent_id, memory_type)
+                if query_lower in memory.content.lower()
+            ][:limit]
+
+        # 更新访问信息
+        now = datetime.now()
+        for memory in relevant_memories:
+            memory.accessed_at = now
+            memory.access_count += 1
+        self.store.record_access(relevant_memories)
 
         return relevant_memories
 
@@ -193,18 +222,33 @@ class MemoryManager:
             return
 
         if agent_id:
-            # 清理单个智能体的记忆
-            max_short = self.config.max_short_term
-            max_long = self.config.max_long_term
-
-            # 清理短期记忆
+            # 清理单个智能体的记忆（按类型上限淘汰低分记忆）
             if self.config.auto_cleanup:
-                self.store.cleanup_low_value(agent_id, max_short)
+                self._enforce_limit(agent_id, MemoryType.SHORT_TERM)
+                self._enforce_limit(agent_id, MemoryType.LONG_TERM)
         else:
             # 清理所有智能体的记忆
             # （暂不实现，避免误删）
             pass
 
+    def _enforce_limit(self, agent_id: str, memory_type: MemoryType) -> int:
+        """按配置上限淘汰某类记忆，返回删除数量"""
+        limit = {
+            MemoryType.SHORT_TERM: self.config.max_short_term,
+            MemoryType.LONG_TERM: self.config.max_long_term
+        }.get(memory_type)
+
+        if limit is None:
+            return 0
+
+        return self.store.evict_over_limit(agent_id, memory_type, limit)
+
+    def flush(self) -> int:
+        """写回缓冲的访问统计（关闭前或需要落盘时调用）"""
+        if not self.is_enabled:
+            return 0
+        return self.store.flush_access_stats()
+
     def get_stats(self, agent_id: str) -> Optional[Dict]:
         """获取记忆统计"""
         if not self.is_enabled:
@@ -218,7 +262,10 @@ class MemoryManager:
             'long_term_count': stats.long_term_count,
             'total_size': stats.total_size,
             'oldest_memory': stats.oldest_memory.isoformat() if stats.oldest_memory else None,
-            'newest_memory': stats.newest_memory.isoformat() if stats.newest_memory else None
+            'newest_memory': stats.newest_memory.isoformat() if stats.newest_memory else None,
+            'pending_access_updates': self.store.access_journal.pending_count,
+            'cache': self.store.cache.stats(),
+            'evicted_memories': self.store.eviction_index.evicted
         }
 
     def clear_all(self, agent_id: str) -> int:
@@ -287,13 +334,14 @@ class MemoryMixin:
             importance=importance
         )
 
-    def recall(self, query: str, limit: int = 10) -> List[str]:
+    def recall(self, query: str, limit: int = 10, mode: Optional[str] = None) -> List[str]:
         """
         回忆信息
 
         Args:
             query: 查询字符串
             limit: 返回数量限制
+            mode: 检索模式（keyword / semantic，默认按配置）
 
         Returns:
             相关记忆内容列表
@@ -304,7 +352,8 @@ class MemoryMixin:
         memories = self.memory_manager.recall_memories(
             agent_id=self.agent_id,
             query=query,
-            limit=limit
+            limit=limit,
+            mode=mode
         )
 
         return [m.content for m in memories]
@@ -90,6 +90,12 @@ class MemoryConfig:
     auto_cleanup: bool = True  # 自动清理低价值记忆
     persistence_enabled: bool = True  # 是否持久化
     storage_path: Optional[Path] = None  # 存储路径
+    backend: str = "json"  # 存储后端（json: 每条记忆一个文件；sqlite: 单文件索引存储）
+    access_flush_interval: float = 30.0  # 访问统计写回间隔（秒）
+    access_flush_threshold: int = 100  # 待写回记忆数达到该值时立即写回
+    cache_max_agents: int = 32  # 缓存已解析记忆的智能体数上限（0 表示禁用）
+    semantic_recall: bool = False  # 启用语义检索（本地哈希向量，需要 numpy）
+    semantic_dim: int = 256  # 语义向量维度
 
 
 class MemoryModel:
@@ -0,0 +1,305 @@
+"""
+记忆语义索引 - 本地哈希 n-gram 向量 + 批量余弦 top-k
+
+无需网络模型：词元（中文二元组/拉丁词）与字符三元组经稳定哈希映射到固定维度，
+带符号累加后 L2 归一化。每个智能体的向量按行追加到连续的 float32 文件
+（vectors/<agent_id>.f32），检索时通过 numpy.memmap 分块做矩阵乘法。
+
+依赖 numpy（可选）；未安装时启用语义检索会抛出 ImportError。
+"""
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - 取决于环境
+    np = None
+
+from .text_index import tokenize
+
+
+def semantic_available() -> bool:
+    """当前环境是否支持语义检索"""
+    return np is not None
+
+
+class HashedNgramVectorizer:
+    """哈希 n-gram 向量化（特征哈希）"""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str) -> Iterable[Tuple[str, float]]:
+        for token in tokenize(text):
+            yield 'w:' + token, 1.0
+            # 字符三元组让词形变化（fix/fixed/fixing）也能相互匹配
+            if len(token) > 3 and token.isascii():
+                padded = f"<{token}>"
+                for i in range(len(padded) - 2):
+                    yield 'c:' + padded[i:i + 3], 0.5
+
+    def transform(self, text: str) -> "np.ndarray":
+        """把文本转换为 L2 归一化的向量"""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode('utf-8'))
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            vector[h % self.dim] += sign * weight
+
+        norm = float(np.linalg.norm(vector))
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def transform_many(self, texts: Iterable[str]) -> "np.ndarray":
+        rows = [self.transform(text) for text in texts]
+        if not rows:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack(rows)
+
+
+class _AgentVectors:
+    """单个智能体的向量行映射"""
+
+    def __init__(self):
+        self.ids: List[Optional[str]] = []       # 行号 -> memory_id（None 表示已删除）
+        self.types: List[Optional[str]] = []
+        self.row_of: Dict[str, int] = {}
+        self.deleted = 0
+        self.matrix = None                       # 只读 memmap（按需打开）
+        self.matrix_rows = 0
+        self.masks: Dict[Optional[str], "np.ndarray"] = {}  # 类型过滤 -> 有效行掩码
+
+    def mask(self, memory_type: Optional[str]) -> "np.ndarray":
+        cached = self.masks.get(memory_type)
+        if cached is None or len(cached) != len(self.ids):
+            if memory_type is None:
+                cached = np.array([m is not None for m in self.ids], dtype=bool)
+            else:
+                cached = np.array([t == memory_type for t in self.types], dtype=bool)
+            self.masks[memory_type] = cached
+        return cached
+
+
+class SemanticMemoryIndex:
+    """按智能体持久化的语义向量索引"""
+
+    # 分块大小：限制单次矩阵乘法的内存占用
+    CHUNK_ROWS = 65536
+
+    def __init__(self, index_path: Path, dim: int = 256):
+        if np is None:
+            raise ImportError("语义检索需要 numpy，请先安装: pip install numpy")
+
+        self.index_path = Path(index_path)
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        self.vectorizer = HashedNgramVectorizer(dim)
+        self.dim = dim
+        self._agents: Dict[str, _AgentVectors] = {}
+        self._lock = threading.RLock()
+
+    def _vector_file(self, agent_id: str) -> Path:
+        return self.index_path / f"{agent_id}.f32"
+
+    def _ids_file(self, agent_id: str) -> Path:
+        return self.index_path / f"{agent_id}.ids.jsonl"
+
+    def has_index(self, agent_id: str) -> bool:
+        """智能体索引是否已建立（内存或磁盘）"""
+        return agent_id in self._agents or self._ids_file(agent_id).exists()
+
+    def _get(self, agent_id: str) -> _AgentVectors:
+        agent = self._agents.get(agent_id)
+        if agent is None:
+            agent = self._load(agent_id)
+            self._agents[agent_id] = agent
+        return agent
+
+    def _load(self, agent_id: str) -> _AgentVectors:
+        agent = _AgentVectors()
+        ids_file = self._ids_file(agent_id)
+        vector_file = self._vector_file(agent_id)
+        if not ids_file.exists() or not vector_file.exists():
+            return agent
+
+        # 写入中断时以两者中较短的为准；不完整的末行截掉，避免与后续追加粘连
+        stored_rows = vector_file.stat().st_size // (self.dim * 4)
+        with open(ids_file, 'rb+') as f:
+            raw = f.read()
+            if raw and not raw.endswith(b'\n'):
+                f.truncate(raw.rfind(b'\n') + 1)
+                raw = raw[:raw.rfind(b'\n') + 1]
+
+        for line in raw.decode('utf-8').splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if 'del' in entry:
+                self._mark_deleted(agent, entry['del'])
+                continue
+            if len(agent.ids) >= stored_rows:
+                break
+            self._mark_deleted(agent, entry['id'])
+            agent.row_of[entry['id']] = len(agent.ids)
+            agent.ids.append(entry['id'])
+            agent.types.append(entry['type'])
+        return agent
+
+    @staticmethod
+    def _mark_deleted(agent: _AgentVectors, memory_id: str) -> bool:
+        row = agent.row_of.pop(memory_id, None)
+        if row is None:
+            return False
+        agent.ids[row] = None
+        agent.types[row] = None
+        agent.deleted += 1
+        agent.masks.clear()
+        return True
+
+    def _matrix(self, agent_id: str, agent: _AgentVectors):
+        rows = len(agent.ids)
+        if rows == 0:
+            return None
+        if agent.matrix is None or agent.matrix_rows != rows:
+            agent.matrix = np.memmap(
+                self._vector_file(agent_id), dtype=np.float32, mode='r', shape=(rows, self.dim)
+            )
+            agent.matrix_rows = rows
+        return agent.matrix
+
+    def add_documents(self, agent_id: str, documents: Iterable[Tuple[str, str, str]]):
+        """
+        批量索引文档（已存在的记忆会被替换）
+
+        Args:
+            agent_id: 智能体ID
+            documents: (memory_id, memory_type, content) 序列
+        """
+        documents = list(documents)
+        if not documents:
+            return
+
+        vectors = self.vectorizer.transform_many(content for _, _, content in documents)
+        with self._lock:
+            agent = self._get(agent_id)
+            # 截断中断写入留下的残余行，保证新行与ID对齐
+            with open(self._vector_file(agent_id), 'ab') as f:
+                f.truncate(len(agent.ids) * self.dim * 4)
+                f.write(vectors.tobytes())
+            with open(self._ids_file(agent_id), 'a', encoding='utf-8') as f:
+                for memory_id, memory_type, _ in documents:
+                    self._mark_deleted(agent, memory_id)
+                    agent.row_of[memory_id] = len(agent.ids)
+                    agent.ids.append(memory_id)
+                    agent.types.append(memory_type)
+                    f.write(json.dumps({'id': memory_id, 'type': memory_type}, ensure_ascii=False) + '\n')
+            self._maybe_compact(agent_id, agent)
+
+    def add_document(self, agent_id: str, memory_id: str, memory_type: str, content: str):
+        """索引单条记忆"""
+        self.add_documents(agent_id, [(memory_id, memory_type, content)])
+
+    def remove_document(self, agent_id: str, memory_id: str):
+        """移除记忆（写入删除标记，空间在压缩时回收）"""
+        with self._lock:
+            agent = self._get(agent_id)
+            if self._mark_deleted(agent, memory_id):
+                with open(self._ids_file(agent_id), 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'del': memory_id}, ensure_ascii=False) + '\n')
+                self._maybe_compact(agent_id, agent)
+
+    def _maybe_compact(self, agent_id: str, agent: _AgentVectors):
+        if agent.deleted <= max(64, len(agent.row_of)):
+            return
+
+        live_rows = [row for row, memory_id in enumerate(agent.ids) if memory_id is not None]
+        matrix = self._matrix(agent_id, agent)
+        vector_tmp = self._vector_file(agent_id).with_suffix('.f32.tmp')
+        ids_tmp = self._ids_file(agent_id).with_suffix('.jsonl.tmp')
+
+        with open(vector_tmp, 'wb') as f:
+            for start in range(0, len(live_rows), self.CHUNK_ROWS):
+                f.write(np.ascontiguousarray(matrix[live_rows[start:start + self.CHUNK_ROWS]]).tobytes())
+        with open(ids_tmp, 'w', encoding='utf-8') as f:
+            for row in live_rows:
+                f.write(json.dumps({'id': agent.ids[row], 'type': agent.types[row]}, ensure_ascii=False) + '\n')
+
+        # 替换文件前释放 memmap（Windows 上仍被映射的文件无法替换）
+        agent.matrix = None
+        del matrix
+        os.replace(vector_tmp, self._vector_file(agent_id))
+        os.replace(ids_tmp, self._ids_file(agent_id))
+
+        compacted = _AgentVectors()
+        for row in live_rows:
+            compacted.row_of[agent.ids[row]] = len(compacted.ids)
+            compacted.ids.append(agent.ids[row])
+            compacted.types.append(agent.types[row])
+        self._agents[agent_id] = compacted
+
+    def clear(self, agent_id: str):
+        """删除智能体的整个索引"""
+        with self._lock:
+            self._agents.pop(agent_id, None)
+            for path in (self._vector_file(agent_id), self._ids_file(agent_id)):
+                if path.exists():
+                    path.unlink()
+
+    def document_count(self, agent_id: str) -> int:
+        """已索引的文档数"""
+        with self._lock:
+            return len(self._get(agent_id).row_of)
+
+    def indexed_ids(self, agent_id: str) -> Set[str]:
+        """已索引的记忆ID"""
+        with self._lock:
+            return set(self._get(agent_id).row_of)
+
+    def search(
+        self,
+        agent_id: str,
+        query: str,
+        memory_type: Optional[str] = None,
+        limit: int = 10,
+        min_score: float = 0.05
+    ) -> List[Tuple[str, float]]:
+        """
+        余弦相似度 top-k 检索
+
+        Returns:
+            按相似度降序的 (memory_id, score) 列表
+        """
+        query_vector = self.vectorizer.transform(query)
+        if not query_vector.any() or limit <= 0:
+            return []
+
+        with self._lock:
+            agent = self._get(agent_id)
+            matrix = self._matrix(agent_id, agent)
+            if matrix is None:
+                return []
+
+            ids = agent.ids
+            valid = agent.mask(memory_type)
+            candidates: List[Tuple[float, int]] = []
+            for start in range(0, len(ids), self.CHUNK_ROWS):
+                scores = np.asarray(matrix[start:start + self.CHUNK_ROWS] @ query_vector)
+                scores = np.where(valid[start:start + len(scores)], scores, -np.inf)
+                k = min(limit, len(scores))
+                top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+                candidates.extend((float(scores[i]), start + int(i)) for i in top)
+
+            results = []
+            for score, row in sorted(candidates, reverse=True):
+                if score < min_score:
+                    break
+                results.append((ids[row], score))
+                if len(results) >= limit:
+                    break
+
+        return results
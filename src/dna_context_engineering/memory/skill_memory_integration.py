@@ -13,7 +13,8 @@ from .model import (
     MemoryType,
     MemoryImportance
 )
-from .manager import MemoryManager, MemoryMixin
+from .manager import MemoryManager, MemoryMixin, RECALL_SEMANTIC
+from .archive import export_memories
 
 
 class SkillWithMemory(ABC):
@@ -127,12 +128,17 @@ class SkillWithMemory(ABC):
     def recall_relevant_history(
         self,
         query: str,
-        limit: int = 5
+        limit: int = 5,
+        mode: Optional[str] = None
     ) -> List[str]:
-        """回顾相关历史"""
+        """回顾相关历史（mode: keyword / semantic，默认按记忆配置）"""
         if not self.has_memory:
             return []
-        return self.memory.recall(query, limit=limit)
+        return self.memory.recall(query, limit=limit, mode=mode)
+
+    def _similar_recall_mode(self) -> Optional[str]:
+        """相似案例检索优先使用语义模式（可用时），以匹配换一种说法的历史"""
+        return RECALL_SEMANTIC if self.memory_manager.semantic_enabled else None
 
     def get_skill_info(self) -> Dict[str, Any]:
         """获取技能信息"""
@@ -244,7 +250,7 @@ class TaskDecomposerWithMemory(SkillWithMemory):
         limit: int = 3
     ) -> List[str]:
         """回顾相似的任务分解"""
-        return self.recall_relevant_history(task_query, limit)
+        return self.recall_relevant_history(task_query, limit, mode=self._similar_recall_mode())
 
 
 class ArchitectWithMemory(SkillWithMemory):
@@ -344,7 +350,7 @@ class ArchitectWithMemory(SkillWithMemory):
         limit: int = 3
     ) -> List[str]:
         """回顾相似的架构设计"""
-        return self.recall_relevant_history(requirement_query, limit)
+        return self.recall_relevant_history(requirement_query, limit, mode=self._similar_recall_mode())
 
 
 class ModulizerWithMemory(SkillWithMemory):
@@ -559,6 +565,28 @@ class SkillsMemoryManager:
 
         return all_memories
 
+    def export_memory_archive(
+        self,
+        archive_path: Path,
+        since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        把所有技能的完整记忆流式导出为一个归档
+
+        Args:
+            archive_path: 归档数据文件路径（.gz 结尾时压缩）
+            since: 只导出该时间之后创建或变更的记忆（增量备份）
+
+        Returns:
+            归档清单
+        """
+        sources = [
+            (skill.memory_manager.store, skill.skill_id)
+            for skill in self.skills.values()
+            if skill.has_memory
+        ]
+        return export_memories(sources, archive_path, since=since)
+
 
 # 便捷函数
 
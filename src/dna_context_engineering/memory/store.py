@@ -1,104 +1,336 @@
 """
 记忆存储 - 持久化后端
 """
-import json
-from pathlib import Path
-from typing import Dict, List, Optional
 from datetime import datetime
+from pathlib import Path
+from typing import Dict, Hashable, Iterator, List, Optional
 
 from .model import MemoryItem, MemoryType, MemoryStats, MemoryConfig
+from .backends import JsonFileBackend, compute_stats, create_backend
+from .text_index import MemoryTextIndex
+from .access_journal import AccessStatsJournal
+from .cache import MemoryItemCache
+from .eviction import DecayEvictionIndex
+from .semantic_index import SemanticMemoryIndex
 
 
 class MemoryStore:
-    """记忆存储"""
+    """记忆存储
+
+    存储细节委托给可插拔后端（默认沿用JSON目录布局）。
+    """
+
+    # 核对索引时缺失的记忆不超过该数量则逐条加载，否则整体加载智能体的记忆
+    INDEX_SYNC_BATCH = 64
 
-    def __init__(self, storage_path: Optional[Path] = None):
+    def __init__(
+        self,
+        storage_path: Optional[Path] = None,
+        backend: str = JsonFileBackend.name,
+        access_flush_interval: float = 30.0,
+        access_flush_threshold: int = 100,
+        cache_max_agents: int = 32,
+        semantic_dim: Optional[int] = None
+    ):
         if storage_path is None:
             storage_path = Path(__file__).parent.parent.parent.parent.parent / 'memory_storage'
 
         self.storage_path = Path(storage_path)
         self.storage_path.mkdir(parents=True, exist_ok=True)
 
-        # 按agent分组存储
+        self.backend = create_backend(backend, self.storage_path)
+
+        # 按agent分组存储（JSON后端的目录布局）
         self.agents_dir = self.storage_path / 'agents'
-        self.agents_dir.mkdir(exist_ok=True)
+
+        # 全文倒排索引（与后端无关，独立持久化）
+        self.text_index = MemoryTextIndex(self.storage_path / 'index')
+        # 索引与存储核对一致时的后端签名：(索引类型, 智能体) -> 签名
+        self._index_signatures: Dict[tuple, Hashable] = {}
+
+        # 可选的语义向量索引（需要 numpy）
+        self.semantic_index: Optional[SemanticMemoryIndex] = None
+        if semantic_dim:
+            self.semantic_index = SemanticMemoryIndex(self.storage_path / 'vectors', dim=semantic_dim)
+
+        # 已解析记忆的LRU缓存（按后端签名失效）
+        self.cache = MemoryItemCache(max_agents=cache_max_agents)
+
+        # 按衰减分数的淘汰索引（首次清理时按智能体建立）
+        self.eviction_index = DecayEvictionIndex()
+
+        # 访问统计合并写回
+        self.access_journal = AccessStatsJournal(
+            self.backend,
+            flush_interval=access_flush_interval,
+            flush_threshold=access_flush_threshold,
+            on_flush=self._on_access_flush
+        )
+
+    @property
+    def backend_name(self) -> str:
+        """当前后端名称"""
+        return self.backend.name
 
     def save_memory(self, memory: MemoryItem):
         """保存记忆"""
-        agent_dir = self.agents_dir / memory.agent_id
-        agent_dir.mkdir(exist_ok=True)
+        before = self.backend.cache_signature(memory.agent_id)
+        self._sync_indexes(memory.agent_id, before)
+        self.backend.save(memory)
+        after = self.backend.cache_signature(memory.agent_id)
+        self.cache.upsert(memory, before, after)
+        self.eviction_index.upsert(memory)
+        self.text_index.add_document(
+            memory.agent_id, memory.memory_id, memory.memory_type.value, memory.content
+        )
+        if self.semantic_index is not None:
+            self.semantic_index.add_document(
+                memory.agent_id, memory.memory_id, memory.memory_type.value, memory.content
+            )
+        self._mark_indexes_synced(memory.agent_id, after)
 
-        memory_file = agent_dir / f"{memory.memory_id}.json"
+    def save_memories(self, memories: List[MemoryItem]) -> int:
+        """批量保存记忆（导入等场景），索引按智能体批量更新"""
+        if not memories:
+            return 0
 
-        with open(memory_file, 'w', encoding='utf-8') as f:
-            json.dump(memory.to_dict(), f, indent=2, ensure_ascii=False)
+        by_agent: Dict[str, List[MemoryItem]] = {}
+        for memory in memories:
+            by_agent.setdefault(memory.agent_id, []).append(memory)
+        before = {agent_id: self.backend.cache_signature(agent_id) for agent_id in by_agent}
+        for agent_id, signature in before.items():
+            self._sync_indexes(agent_id, signature)
 
-    def load_memory(self, memory_id: str, agent_id: str) -> Optional[MemoryItem]:
-        """加载记忆"""
-        memory_file = self.agents_dir / agent_id / f"{memory_id}.json"
+        self.backend.save_many(memories)
+
+        for agent_id, agent_memories in by_agent.items():
+            after = self.backend.cache_signature(agent_id)
+            documents = [(m.memory_id, m.memory_type.value, m.content) for m in agent_memories]
+            for memory in agent_memories:
+                self.cache.upsert(memory, before[agent_id], after)
+                # 同一批次内后续条目的写入前签名即本批写入后的签名
+                before[agent_id] = after
+                self.eviction_index.upsert(memory)
+            self.text_index.add_documents(agent_id, documents)
+            if self.semantic_index is not None:
+                self.semantic_index.add_documents(agent_id, documents)
+            self._mark_indexes_synced(agent_id, after)
 
-        if not memory_file.exists():
-            return None
+        return len(memories)
 
-        with open(memory_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return MemoryItem.from_dict(data)
+    def iter_memories(self, agent_id: str, since: Optional[datetime] = None) -> Iterator[MemoryItem]:
+        """逐条遍历智能体的记忆（流式导出用，叠加未写回的访问统计）"""
+        for memory in self.backend.iter_agent(agent_id, since):
+            self.access_journal.apply(memory)
+            yield memory
+
+    def load_memory(self, memory_id: str, agent_id: str) -> Optional[MemoryItem]:
+        """加载记忆"""
+        memory = None
+        if self.cache.enabled:
+            memory = self.cache.peek(agent_id, memory_id, self.backend.cache_signature(agent_id))
+        if memory is None:
+            memory = self.backend.load(memory_id, agent_id)
+        if memory is not None:
+            self.access_journal.apply(memory)
+        return memory
 
     def load_agent_memories(
         self,
         agent_id: str,
         memory_type: Optional[MemoryType] = None
     ) -> List[MemoryItem]:
-        """加载智能体的所有记忆"""
-        agent_dir = self.agents_dir / agent_id
-
-        if not agent_dir.exists():
-            return []
-
-        memories = []
-        for memory_file in agent_dir.glob('*.json'):
-            try:
-                with open(memory_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    memory = MemoryItem.from_dict(data)
-
-                    # 过滤类型
-                    if memory_type is None or memory.memory_type == memory_type:
-                        memories.append(memory)
-            except Exception as e:
-                # 跳过损坏的记忆文件
-                continue
+        """加载智能体的所有记忆（按访问时间排序，最新在前）"""
+        if not self.cache.enabled:
+            memories = self.backend.load_agent(agent_id, memory_type)
+        else:
+            signature = self.backend.cache_signature(agent_id)
+            memories = self.cache.get(agent_id, signature)
+            if memories is None:
+                memories = self.backend.load_agent(agent_id)
+                self.cache.put(agent_id, signature, memories)
+            if memory_type is not None:
+                memories = [m for m in memories if m.memory_type == memory_type]
 
-        # 按访问时间排序（最新在前）
-        memories.sort(key=lambda m: m.accessed_at, reverse=True)
+        # 叠加尚未写回的访问统计
+        if self.access_journal.pending_count:
+            for memory in memories:
+                self.access_journal.apply(memory)
 
+        memories.sort(key=lambda m: m.accessed_at, reverse=True)
         return memories
 
     def delete_memory(self, memory_id: str, agent_id: str) -> bool:
         """删除记忆"""
-        memory_file = self.agents_dir / agent_id / f"{memory_id}.json"
+        before = self.backend.cache_signature(agent_id)
+        self._sync_indexes(agent_id, before)
+        deleted = self.backend.delete(memory_id, agent_id)
+        after = self.backend.cache_signature(agent_id)
+        self.cache.remove(agent_id, memory_id, before, after)
+        self.eviction_index.remove(agent_id, memory_id)
+        self.text_index.remove_document(agent_id, memory_id)
+        if self.semantic_index is not None:
+            self.semantic_index.remove_document(agent_id, memory_id)
+        self._mark_indexes_synced(agent_id, after)
+        self.access_journal.discard(agent_id, memory_id)
+        return deleted
 
-        if memory_file.exists():
-            memory_file.unlink()
-            return True
-        return False
+    def record_access(self, memories: List[MemoryItem]):
+        """记录检索命中的访问统计（合并后批量写回）"""
+        self.access_journal.record_many(memories)
+        for memory in memories:
+            self.eviction_index.upsert(memory)
 
-    def get_stats(self, agent_id: str) -> MemoryStats:
-        """获取记忆统计"""
-        memories = self.load_agent_memories(agent_id)
+    def evict_over_limit(self, agent_id: str, memory_type: MemoryType, limit: int) -> int:
+        """
+        按衰减分数淘汰超出上限的记忆
+
+        淘汰索引建立后，每淘汰一条为 O(log N)，无需全量加载和排序。
 
-        stats = MemoryStats(
-            total_memories=len(memories),
-            short_term_count=sum(1 for m in memories if m.memory_type == MemoryType.SHORT_TERM),
-            long_term_count=sum(1 for m in memories if m.memory_type == MemoryType.LONG_TERM),
-            total_size=sum(len(m.content) for m in memories)
+        Returns:
+            删除的记忆数
+        """
+        if not self.eviction_index.is_tracked(agent_id):
+            self.eviction_index.build(agent_id, self.load_agent_memories(agent_id))
+
+        deleted_count = 0
+        while self.eviction_index.count(agent_id, memory_type.value) > limit:
+            memory_id = self.eviction_index.pop_lowest(agent_id, memory_type.value)
+            if memory_id is None:
+                break
+            if self.delete_memory(memory_id, agent_id):
+                deleted_count += 1
+
+        return deleted_count
+
+    def _on_access_flush(self, agent_id: str, updates: Dict, before):
+        self.cache.update_access(agent_id, updates, before, self.backend.cache_signature(agent_id))
+
+    def flush_access_stats(self, agent_id: Optional[str] = None) -> int:
+        """立即写回缓冲的访问统计"""
+        return self.access_journal.flush(agent_id)
+
+    def rebuild_text_index(self, agent_id: str) -> int:
+        """从存储重建智能体的全文索引"""
+        return self._rebuild_index(self.text_index, agent_id)
+
+    def rebuild_semantic_index(self, agent_id: str) -> int:
+        """从存储重建智能体的语义索引"""
+        if self.semantic_index is None:
+            return 0
+        return self._rebuild_index(self.semantic_index, agent_id)
+
+    def _rebuild_index(self, index, agent_id: str) -> int:
+        signature = self.backend.cache_signature(agent_id)
+        memories = self.backend.load_agent(agent_id)
+        index.clear(agent_id)
+        index.add_documents(
+            agent_id,
+            [(m.memory_id, m.memory_type.value, m.content) for m in memories]
         )
+        self._index_signatures[(type(index).__name__, agent_id)] = signature
+        return len(memories)
+
+    def _synced_indexes(self) -> list:
+        """保存时按存储核对覆盖范围的索引"""
+        if self.semantic_index is None:
+            return [self.text_index]
+        return [self.text_index, self.semantic_index]
 
-        if memories:
-            stats.oldest_memory = min(m.created_at for m in memories)
-            stats.newest_memory = max(m.created_at for m in memories)
+    def _sync_index(self, index, agent_id: str, signature: Optional[Hashable]) -> int:
+        """
+        保证索引覆盖存储中的全部记忆
+
+        后端签名与上次核对时相同则跳过；否则比较索引与存储的记忆ID，补建缺失的
+        （建立索引之前已有的记忆、其他进程写入的记忆），移除存储中已不存在的。
+
+        Returns:
+            补建的记忆数
+        """
+        key = (type(index).__name__, agent_id)
+        if signature is not None and self._index_signatures.get(key) == signature:
+            return 0
+
+        stored = self.backend.list_ids(agent_id)
+        indexed = index.indexed_ids(agent_id)
+        missing = stored - indexed
+        if missing:
+            if len(missing) > self.INDEX_SYNC_BATCH:
+                memories = [m for m in self.backend.load_agent(agent_id) if m.memory_id in missing]
+            else:
+                memories = [m for m in (self.backend.load(i, agent_id) for i in missing) if m is not None]
+            index.add_documents(
+                agent_id,
+                [(m.memory_id, m.memory_type.value, m.content) for m in memories]
+            )
+        for memory_id in indexed - stored:
+            index.remove_document(agent_id, memory_id)
+        self._index_signatures[key] = signature
+        return len(missing)
+
+    def _sync_indexes(self, agent_id: str, signature: Optional[Hashable]):
+        for index in self._synced_indexes():
+            self._sync_index(index, agent_id, signature)
+
+    def _mark_indexes_synced(self, agent_id: str, signature: Optional[Hashable]):
+        """本存储的写入已同步到索引，记录写入后的签名"""
+        for index in self._synced_indexes():
+            self._index_signatures[(type(index).__name__, agent_id)] = signature
+
+    def search_memories(
+        self,
+        agent_id: str,
+        query: str,
+        memory_type: Optional[MemoryType] = None,
+        limit: int = 10
+    ) -> List[MemoryItem]:
+        """
+        全文检索记忆（BM25排序）
+
+        只加载命中的记忆；存储有变化时先核对索引覆盖范围（旧数据、其他进程的写入）。
+        """
+        return self._search(self.text_index, agent_id, query, memory_type, limit)
+
+    def semantic_search_memories(
+        self,
+        agent_id: str,
+        query: str,
+        memory_type: Optional[MemoryType] = None,
+        limit: int = 10
+    ) -> List[MemoryItem]:
+        """语义检索记忆（余弦相似度排序），未启用语义索引时抛出 RuntimeError"""
+        if self.semantic_index is None:
+            raise RuntimeError("语义检索未启用（MemoryConfig.semantic_recall=False）")
+        return self._search(self.semantic_index, agent_id, query, memory_type, limit)
+
+    def _search(self, index, agent_id, query, memory_type, limit) -> List[MemoryItem]:
+        self._sync_index(index, agent_id, self.backend.cache_signature(agent_id))
+
+        type_value = memory_type.value if memory_type else None
+        results = []
+        for memory_id, _ in index.search(agent_id, query, type_value, limit):
+            memory = self.load_memory(memory_id, agent_id)
+            if memory is None:
+                # 存储中已不存在，顺便修复索引
+                index.remove_document(agent_id, memory_id)
+                continue
+            results.append(memory)
+        return results
+
+    def list_agents(self) -> List[str]:
+        """列出有记忆的智能体"""
+        return self.backend.list_agents()
+
+    def get_stats(self, agent_id: str) -> MemoryStats:
+        """获取记忆统计"""
+        if self.backend.native_stats:
+            return self.backend.stats(agent_id)
+        return compute_stats(self.load_agent_memories(agent_id))
 
-        return stats
+    def close(self):
+        """关闭存储（先写回访问统计）"""
+        self.access_journal.flush()
+        self.backend.close()
 
     def cleanup_low_value(self, agent_id: str, keep_count: int = 100):
         """清理低价值记忆"""
@@ -0,0 +1,242 @@
+"""
+记忆全文索引 - 增量维护的倒排索引 + BM25排序
+
+分词规则：沿用 `[\\w\\u4e00-\\u9fff]+` 切分，拉丁文/数字按词，中文按二元组（bigram）。
+索引按智能体持久化为追加日志（index/<agent_id>.jsonl），启动时回放，超过阈值时压缩。
+"""
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_WORD_RE = re.compile(r'[\w\u4e00-\u9fff]+')
+_SEGMENT_RE = re.compile(r'[\u4e00-\u9fff]+|[^\u4e00-\u9fff]+')
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+
+def tokenize(text: str) -> List[str]:
+    """混合分词：中文二元组 + 拉丁词"""
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        for segment in _SEGMENT_RE.findall(word):
+            if _CJK_RE.match(segment):
+                if len(segment) == 1:
+                    tokens.append(segment)
+                else:
+                    tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+            else:
+                segment = segment.strip('_')
+                if segment:
+                    tokens.append(segment)
+    return tokens
+
+
+class _AgentIndex:
+    """单个智能体的倒排索引"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.doc_type: Dict[str, str] = {}
+        self.doc_terms: Dict[str, Dict[str, int]] = {}
+        self.total_len = 0
+        self.log_entries = 0
+
+    def add(self, memory_id: str, memory_type: str, term_freqs: Dict[str, int]):
+        self.remove(memory_id)
+        for term, tf in term_freqs.items():
+            self.postings.setdefault(term, {})[memory_id] = tf
+        length = sum(term_freqs.values())
+        self.doc_len[memory_id] = length
+        self.doc_type[memory_id] = memory_type
+        self.doc_terms[memory_id] = term_freqs
+        self.total_len += length
+
+    def remove(self, memory_id: str) -> bool:
+        term_freqs = self.doc_terms.pop(memory_id, None)
+        if term_freqs is None:
+            return False
+        for term in term_freqs:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(memory_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_len -= self.doc_len.pop(memory_id, 0)
+        self.doc_type.pop(memory_id, None)
+        return True
+
+    def __len__(self) -> int:
+        return len(self.doc_len)
+
+
+class MemoryTextIndex:
+    """
+    记忆倒排索引
+
+    检索只访问查询词对应的倒排链，复杂度与命中文档数相关，与历史总量无关。
+    """
+
+    K1 = 1.2
+    B = 0.75
+    # 日志条目超过 存活文档数 * COMPACT_RATIO + COMPACT_MIN 时压缩
+    COMPACT_RATIO = 2
+    COMPACT_MIN = 100
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self.index_path.mkdir(parents=True, exist_ok=True)
+        self._agents: Dict[str, _AgentIndex] = {}
+        self._lock = threading.RLock()
+
+    def _log_file(self, agent_id: str) -> Path:
+        return self.index_path / f"{agent_id}.jsonl"
+
+    def has_index(self, agent_id: str) -> bool:
+        """智能体索引是否已建立（内存或磁盘）"""
+        return agent_id in self._agents or self._log_file(agent_id).exists()
+
+    def _get(self, agent_id: str) -> _AgentIndex:
+        index = self._agents.get(agent_id)
+        if index is None:
+            index = self._replay(agent_id)
+            self._agents[agent_id] = index
+        return index
+
+    def _replay(self, agent_id: str) -> _AgentIndex:
+        index = _AgentIndex()
+        log_file = self._log_file(agent_id)
+        if not log_file.exists():
+            return index
+
+        with open(log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 跳过写入中断的尾行
+                    continue
+                if entry.get('op') == 'add':
+                    index.add(entry['id'], entry['type'], entry['tf'])
+                elif entry.get('op') == 'del':
+                    index.remove(entry['id'])
+                index.log_entries += 1
+        return index
+
+    def _append(self, agent_id: str, entries: List[Dict]):
+        with open(self._log_file(agent_id), 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def _maybe_compact(self, agent_id: str, index: _AgentIndex):
+        if index.log_entries <= len(index) * self.COMPACT_RATIO + self.COMPACT_MIN:
+            return
+
+        log_file = self._log_file(agent_id)
+        tmp_file = log_file.with_suffix('.jsonl.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for memory_id, term_freqs in index.doc_terms.items():
+                f.write(json.dumps({
+                    'op': 'add',
+                    'id': memory_id,
+                    'type': index.doc_type[memory_id],
+                    'tf': term_freqs
+                }, ensure_ascii=False) + '\n')
+        os.replace(tmp_file, log_file)
+        index.log_entries = len(index)
+
+    def add_documents(self, agent_id: str, documents: Iterable[Tuple[str, str, str]]):
+        """
+        批量索引文档
+
+        Args:
+            agent_id: 智能体ID
+            documents: (memory_id, memory_type, content) 序列
+        """
+        with self._lock:
+            index = self._get(agent_id)
+            entries = []
+            for memory_id, memory_type, content in documents:
+                term_freqs = dict(Counter(tokenize(content)))
+                index.add(memory_id, memory_type, term_freqs)
+                entries.append({'op': 'add', 'id': memory_id, 'type': memory_type, 'tf': term_freqs})
+            if entries:
+                self._append(agent_id, entries)
+                index.log_entries += len(entries)
+                self._maybe_compact(agent_id, index)
+
+    def add_document(self, agent_id: str, memory_id: str, memory_type: str, content: str):
+        """索引单条记忆（已存在则覆盖）"""
+        self.add_documents(agent_id, [(memory_id, memory_type, content)])
+
+    def remove_document(self, agent_id: str, memory_id: str):
+        """从索引中移除记忆"""
+        with self._lock:
+            index = self._get(agent_id)
+            if index.remove(memory_id):
+                self._append(agent_id, [{'op': 'del', 'id': memory_id}])
+                index.log_entries += 1
+                self._maybe_compact(agent_id, index)
+
+    def clear(self, agent_id: str):
+        """删除智能体的整个索引"""
+        with self._lock:
+            self._agents.pop(agent_id, None)
+            log_file = self._log_file(agent_id)
+            if log_file.exists():
+                log_file.unlink()
+
+    def document_count(self, agent_id: str) -> int:
+        """已索引的文档数"""
+        with self._lock:
+            return len(self._get(agent_id))
+
+    def search(
+        self,
+        agent_id: str,
+        query: str,
+        memory_type: Optional[str] = None,
+        limit: int = 10
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25检索
+
+        Returns:
+            按相关度降序的 (memory_id, score) 列表
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            index = self._get(agent_id)
+            doc_count = len(index)
+            if doc_count == 0:
+                return []
+            avg_len = index.total_len / doc_count or 1.0
+
+            scores: Dict[str, float] = {}
+            for term in terms:
+                posting = index.postings.get(term)
+                if not posting:
+                    continue
+                df = len(posting)
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                for memory_id, tf in posting.items():
+                    if memory_type is not None and index.doc_type.get(memory_id) != memory_type:
+                        continue
+                    norm = self.K1 * (1 - self.B + self.B * index.doc_len[memory_id] / avg_len)
+                    scores[memory_id] = scores.get(memory_id, 0.0) + idf * tf * (self.K1 + 1) / (tf + norm)
+
+        # 同分时新记忆优先（memory_id 含时间戳）
+        ranked = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        return ranked[:limit]
+
+    def indexed_ids(self, agent_id: str) -> Set[str]:
+        """已索引的记忆ID"""
+        with self._lock:
+            return set(self._get(agent_id).doc_len)
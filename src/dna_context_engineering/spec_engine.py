@@ -3,49 +3,200 @@ DNASPEC Specification Engine - 核心规范引擎
 结合spec.kit的理念，实现规范驱动的上下文工程技能系统
 """
 from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
 import yaml
 import json
+import hashlib
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from jinja2 import Template
 from pathlib import Path
 import importlib
 import os
 
 
+# 持久化规范索引目录（按规范目录的路径哈希区分）
+SPEC_INDEX_DIR = Path.home() / '.dnaspec' / 'spec_index'
+SPEC_INDEX_VERSION = 1
+
+# 需要重新解析的规范数达到该值时使用多进程解析
+PARALLEL_LOAD_THRESHOLD = 16
+
+
+def spec_content_hash(spec: Dict[str, Any]) -> str:
+    """规范内容指纹（规范化JSON的sha256）"""
+    canonical = json.dumps(spec, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class CompiledSpec:
+    """编译后的规范：模板对象、结果处理器代码对象及耗时统计"""
+    spec_hash: str
+    name: str
+    template: Any
+    processor: Any = None                  # compile() 得到的代码对象
+    processor_error: Optional[str] = None  # 处理器脚本编译失败时的错误信息
+    compile_ms: Dict[str, float] = field(default_factory=dict)
+    render_count: int = 0
+    render_ms_total: float = 0.0
+    processor_ms_total: float = 0.0
+
+    def record(self, render_ms: float, processor_ms: float):
+        self.render_count += 1
+        self.render_ms_total += render_ms
+        self.processor_ms_total += processor_ms
+
+    def timing_stats(self) -> Dict[str, Any]:
+        count = self.render_count
+        return {
+            'spec_hash': self.spec_hash,
+            'compile_ms': dict(self.compile_ms),
+            'render_count': count,
+            'avg_render_ms': self.render_ms_total / count if count else 0.0,
+            'avg_processor_ms': self.processor_ms_total / count if count else 0.0
+        }
+
+
+class CompiledSpecCache:
+    """
+    编译结果共享缓存
+    以规范内容指纹为键，内容相同的规范只编译一次
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, CompiledSpec] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compile(self, spec: Dict[str, Any]) -> CompiledSpec:
+        spec_hash = spec_content_hash(spec)
+        with self._lock:
+            compiled = self._entries.get(spec_hash)
+            if compiled is not None:
+                self.hits += 1
+                return compiled
+            self.misses += 1
+
+        compiled = self._compile(spec, spec_hash)
+        with self._lock:
+            # 并发编译同一规范时保留先写入的结果
+            return self._entries.setdefault(spec_hash, compiled)
+
+    @staticmethod
+    def _compile(spec: Dict[str, Any], spec_hash: str) -> CompiledSpec:
+        implementation = spec['implementation']
+
+        start = time.perf_counter()
+        template = Template(implementation['instruction_template'])
+        template_ms = (time.perf_counter() - start) * 1000
+
+        processor, processor_error = None, None
+        script = implementation.get('result_processor', '')
+        start = time.perf_counter()
+        if script:
+            try:
+                processor = compile(script, f"<spec:{spec['name']}:result_processor>", 'exec')
+            except SyntaxError as e:
+                processor_error = str(e)
+        processor_ms = (time.perf_counter() - start) * 1000
+
+        return CompiledSpec(
+            spec_hash=spec_hash,
+            name=spec['name'],
+            template=template,
+            processor=processor,
+            processor_error=processor_error,
+            compile_ms={'template': template_ms, 'processor': processor_ms}
+        )
+
+    def get(self, spec_hash: str) -> Optional[CompiledSpec]:
+        return self._entries.get(spec_hash)
+
+    def invalidate(self, spec_hash: str) -> bool:
+        """移除指定指纹的编译结果"""
+        with self._lock:
+            return self._entries.pop(spec_hash, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# 进程内共享的编译缓存
+compiled_spec_cache = CompiledSpecCache()
+
+
 class DNASPECSpecEngine:
     """
     DNASPEC规范引擎
     基于spec.kit理念实现的规范驱动技能系统
     """
     
-    def __init__(self):
+    def __init__(self, index_dir: Optional[Path] = None, use_index: bool = True,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            index_dir: 规范索引目录，默认 SPEC_INDEX_DIR
+            use_index: 是否使用持久化规范索引
+            max_workers: 并行解析规范的进程数
+        """
         self.spec_parser = SpecParser()
         self.skill_compiler = SkillCompiler()
         self.skill_registry = SkillRegistry()
         self.hook_system = None
+        self.index_dir = Path(index_dir) if index_dir else None
+        self.use_index = use_index
+        self.max_workers = max_workers
+        self.load_stats = {'unchanged': 0, 'indexed': 0, 'parsed': 0, 'removed': 0, 'failed': 0}
+        # 规范文件路径 -> (文件内容哈希, 技能名, 规范指纹)
+        self._loaded_spec_files: Dict[str, tuple] = {}
+        self._load_lock = threading.RLock()
     
-    def register_skill_from_spec(self, spec_path: str) -> bool:
+    def register_skill_from_spec(self, spec_path: str, replace: bool = False) -> bool:
         """
         从规范文件注册技能
+        
+        Args:
+            spec_path: 规范文件路径
+            replace: 同名技能已存在时是否替换
         """
         try:
+            with open(spec_path, 'rb') as f:
+                raw = f.read()
+            
             # 解析规范
-            spec = self.spec_parser.parse(spec_path)
+            spec = self.spec_parser.parse_content(raw.decode('utf-8'), str(spec_path))
             
             # 验证规范
             if not self.spec_parser.validate(spec):
                 raise ValueError(f"Invalid specification: {spec_path}")
             
-            # 编译技能
-            skill_instance = self.skill_compiler.compile(spec)
-            
-            # 注册技能
-            success = self.skill_registry.register(skill_instance)
-            
-            return success
+            return self._register_spec(spec, spec_path, hashlib.sha256(raw).hexdigest(), replace)
         except Exception as e:
             print(f"Failed to register skill from {spec_path}: {str(e)}")
             return False
     
+    def _register_spec(self, spec: Dict[str, Any], spec_path, file_hash: str, replace: bool = False) -> bool:
+        """编译并注册已验证的规范"""
+        # 编译技能（模板与结果处理器按规范指纹只编译一次）
+        skill_instance = self.skill_compiler.compile(spec)
+        
+        # 注册技能
+        success = self.skill_registry.register(skill_instance, replace=replace)
+        if success:
+            self._loaded_spec_files[str(Path(spec_path).resolve())] = (
+                file_hash, spec['name'], skill_instance.spec_hash
+            )
+        return success
+    
     def execute_skill(self, skill_name: str, context: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         执行技能
@@ -79,26 +230,249 @@ class DNASPECSpecEngine:
         """
         return self.skill_registry.list_skills()
     
+    def get_timing_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        各技能的编译耗时与渲染耗时统计
+        """
+        stats = {}
+        for name, skill in self.skill_registry.skills.items():
+            compiled = getattr(skill, 'compiled_spec', None)
+            if compiled is not None:
+                stats[name] = compiled.timing_stats()
+        return stats
+    
     def load_all_specs_from_directory(self, specs_dir: str) -> int:
         """
         从目录加载所有规范文件
+        
+        增量加载：已注册且文件内容未变化的规范直接跳过；持久化索引中有相同文件哈希的
+        规范跳过解析和验证；其余文件数量较多时在进程池中并行解析验证。内容变化或已删除
+        的规范会使旧的编译结果失效并注销对应技能。
         """
-        specs_dir = Path(specs_dir)
-        spec_files = list(specs_dir.glob("*.spec.*"))  # 匹配所有.spec.*文件
+        with self._load_lock:
+            return self._load_directory(Path(specs_dir))
+    
+    def _load_directory(self, specs_dir: Path) -> int:
+        spec_files = sorted(specs_dir.glob("*.spec.*"))  # 匹配所有.spec.*文件
+        stats = {'unchanged': 0, 'indexed': 0, 'parsed': 0, 'removed': 0, 'failed': 0}
         
-        loaded_count = 0
+        file_hashes: Dict[str, str] = {}
         for spec_file in spec_files:
             try:
-                if self.register_skill_from_spec(str(spec_file)):
+                file_hashes[str(spec_file.resolve())] = _file_hash(spec_file)
+            except OSError as e:
+                print(f"Error loading spec {spec_file.name}: {str(e)}")
+        
+        # 注销目录中已删除或内容已变化的规范
+        resolved_dir = specs_dir.resolve()
+        for key, (file_hash, name, spec_hash) in list(self._loaded_spec_files.items()):
+            if Path(key).parent != resolved_dir or file_hashes.get(key) == file_hash:
+                continue
+            compiled_spec_cache.invalidate(spec_hash)
+            self.skill_registry.unregister(name)
+            del self._loaded_spec_files[key]
+            if key not in file_hashes:
+                stats['removed'] += 1
+        
+        index_path = self._index_path(specs_dir)
+        index_entries = self._load_index(index_path)
+        specs: Dict[str, Dict[str, Any]] = {}
+        stale: List[str] = []
+        loaded_count = 0
+        for key, file_hash in file_hashes.items():
+            previous = self._loaded_spec_files.get(key)
+            if previous is not None and self.skill_registry.get_skill(previous[1]):
+                stats['unchanged'] += 1
+                loaded_count += 1
+            elif file_hash in index_entries:
+                specs[key] = index_entries[file_hash]['spec']
+                stats['indexed'] += 1
+            else:
+                stale.append(key)
+        
+        for key, outcome in self._parse_many(stale).items():
+            if outcome.get('error'):
+                print(f"Failed to register skill from {key}: {outcome['error']}")
+                stats['failed'] += 1
+                continue
+            # 新解析的结果与索引读出的结果保持同样的JSON形态
+            specs[key] = json.loads(json.dumps(outcome['spec'], ensure_ascii=False, default=str))
+            file_hashes[key] = outcome['file_hash']
+            stats['parsed'] += 1
+        
+        for key in sorted(specs):
+            name = Path(key).name
+            try:
+                if self._register_spec(specs[key], key, file_hashes[key]):
                     loaded_count += 1
-                    print(f"Loaded spec: {spec_file.name}")
+                    print(f"Loaded spec: {name}")
                 else:
-                    print(f"Failed to load spec: {spec_file.name}")
+                    stats['failed'] += 1
+                    print(f"Failed to load spec: {name}")
             except Exception as e:
-                print(f"Error loading spec {spec_file.name}: {str(e)}")
+                stats['failed'] += 1
+                print(f"Error loading spec {name}: {str(e)}")
+        
+        if index_path is not None and (stale or set(index_entries) != set(file_hashes.values())):
+            self._save_index(index_path, specs_dir, {
+                file_hashes[key]: {'path': key, 'spec': spec} for key, spec in specs.items()
+            }, index_entries, file_hashes)
         
+        self.load_stats = stats
         print(f"Loaded {loaded_count} skills from {len(spec_files)} spec files")
         return loaded_count
+    
+    def _parse_many(self, spec_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """解析并验证多个规范文件；数量较多时使用进程池"""
+        if len(spec_paths) < PARALLEL_LOAD_THRESHOLD:
+            return {path: _parse_spec_worker(path) for path in spec_paths}
+        
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_parse_spec_worker, spec_paths, chunksize=8))
+        except (OSError, RuntimeError, ImportError):
+            # 无法创建子进程的环境退回线程池
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_parse_spec_worker, spec_paths))
+        return dict(zip(spec_paths, results))
+    
+    def _index_path(self, specs_dir: Path) -> Optional[Path]:
+        if not self.use_index:
+            return None
+        dir_hash = hashlib.sha1(str(specs_dir.resolve()).encode('utf-8')).hexdigest()[:16]
+        return (self.index_dir or SPEC_INDEX_DIR) / f"{dir_hash}.json"
+    
+    @staticmethod
+    def _load_index(index_path: Optional[Path]) -> Dict[str, Dict[str, Any]]:
+        if index_path is None:
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if data.get('version') != SPEC_INDEX_VERSION:
+            return {}
+        return data.get('entries', {})
+    
+    @staticmethod
+    def _save_index(index_path: Path, specs_dir: Path, new_entries: Dict[str, Dict[str, Any]],
+                    index_entries: Dict[str, Dict[str, Any]], file_hashes: Dict[str, str]):
+        # 只保留目录中仍存在的文件（已注册而本次跳过的规范沿用旧条目）
+        entries = {
+            file_hash: index_entries[file_hash]
+            for file_hash in file_hashes.values() if file_hash in index_entries
+        }
+        entries.update(new_entries)
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = index_path.with_name(index_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': SPEC_INDEX_VERSION,
+                    'specs_dir': str(specs_dir),
+                    'entries': entries
+                }, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, index_path)
+        except OSError:
+            pass
+    
+    def watch_directory(self, specs_dir: str, interval: float = 1.0,
+                        on_change=None) -> 'SpecWatcher':
+        """
+        监视规范目录，文件变化时增量重新加载（只重新编译变化的规范）
+        
+        Args:
+            specs_dir: 规范目录
+            interval: 轮询间隔（秒）
+            on_change: 重新加载后的回调，参数为本次的 load_stats
+            
+        Returns:
+            已启动的监视器，调用 stop() 结束
+        """
+        watcher = SpecWatcher(self, specs_dir, interval, on_change)
+        watcher.start()
+        return watcher
+
+
+class SpecWatcher:
+    """
+    规范目录监视器
+    轮询目录中规范文件的修改时间与大小，发生变化时调用引擎增量加载
+    """
+    
+    def __init__(self, engine: DNASPECSpecEngine, specs_dir: str, interval: float = 1.0,
+                 on_change=None):
+        self.engine = engine
+        self.specs_dir = Path(specs_dir)
+        self.interval = interval
+        self.on_change = on_change
+        self._signature = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def _current_signature(self) -> frozenset:
+        signature = set()
+        for spec_file in self.specs_dir.glob("*.spec.*"):
+            try:
+                stat = spec_file.stat()
+            except OSError:
+                continue
+            signature.add((spec_file.name, stat.st_mtime_ns, stat.st_size))
+        return frozenset(signature)
+    
+    def poll(self) -> bool:
+        """
+        检查一次目录，有变化时重新加载
+        
+        Returns:
+            是否发生了重新加载
+        """
+        signature = self._current_signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        self.engine.load_all_specs_from_directory(str(self.specs_dir))
+        if self.on_change:
+            self.on_change(dict(self.engine.load_stats))
+        return True
+    
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error watching specs directory {self.specs_dir}: {str(e)}")
+            self._stop_event.wait(self.interval)
+    
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='spec-watcher', daemon=True)
+            self._thread.start()
+    
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def _file_hash(path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _parse_spec_worker(spec_path: str) -> Dict[str, Any]:
+    """进程池入口：读取、解析并验证单个规范文件"""
+    try:
+        with open(spec_path, 'rb') as f:
+            raw = f.read()
+        parser = SpecParser()
+        spec = parser.parse_content(raw.decode('utf-8'), spec_path)
+        parser.validate(spec)
+        return {'spec': spec, 'file_hash': hashlib.sha256(raw).hexdigest()}
+    except Exception as e:
+        return {'error': str(e)}
 
 
 class SpecParser:
@@ -114,7 +488,12 @@ class SpecParser:
         """
         with open(spec_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        
+        return self.parse_content(content, spec_path)
+    
+    def parse_content(self, content: str, spec_path: str) -> Dict[str, Any]:
+        """
+        按文件扩展名解析规范内容
+        """
         if spec_path.endswith('.yaml') or spec_path.endswith('.yml'):
             return yaml.safe_load(content)
         elif spec_path.endswith('.json'):
@@ -220,48 +599,49 @@ class SkillCompiler:
         """
         动态生成技能类
         """
-        from src.dnaspec_spec_kit_integration.core.skill import DNASpecSkill
-        import os
-        import sys
+        from src.dna_spec_kit_integration.core.skill import DNASpecSkill
         
         class_name = f"{spec['name'].replace('-', '_').title()}Skill"
+        # 模板与结果处理器在注册时编译一次，之后每次请求直接复用
+        compiled = compiled_spec_cache.get_or_compile(spec)
         
         # 从规范创建执行方法
         def __init__(self):
             DNASpecSkill.__init__(self, spec['name'], spec['description'])
+            self.compiled_spec = compiled
+            self.spec_hash = compiled.spec_hash
         
         def process_request(self, request: str, params: Dict[str, Any]) -> Dict[str, Any]:
             """
             处理请求 - 使用AI模型执行任务
             """
-            # 使用Jinja2模板处理指令
-            template_content = spec['implementation']['instruction_template']
-            template = Template(template_content)
+            start_time = time.perf_counter()
             
             # 准备渲染上下文
             render_context = params.copy() if params else {}
             render_context['context'] = request  # 请求内容
             
-            # 渲染AI指令
+            # 使用预编译的Jinja2模板渲染AI指令
             try:
-                ai_instruction = template.render(render_context)
+                ai_instruction = self.compiled_spec.template.render(render_context)
             except Exception as e:
                 return {
                     'success': False,
                     'error': f'Template rendering error: {str(e)}',
                     'raw_request': request
                 }
+            render_ms = (time.perf_counter() - start_time) * 1000
             
             # 调用AI模型 - 在实际实现中，这里会调用AI API
             ai_response = self._call_ai_model(ai_instruction, spec.get('ai_model', 'default'))
             
             # 如果有结果处理器，应用它
-            processor_script = spec['implementation'].get('result_processor', '')
-            if processor_script:
+            processor_start = time.perf_counter()
+            if spec['implementation'].get('result_processor', ''):
                 try:
                     # 在安全环境中执行处理器脚本
                     result = self._execute_processor_script(
-                        processor_script, 
+                        self.compiled_spec.processor,
                         ai_response, 
                         render_context
                     )
@@ -277,12 +657,19 @@ class SkillCompiler:
                     'raw_response': ai_response,
                     'processed_context': request
                 }
+            processor_ms = (time.perf_counter() - processor_start) * 1000
+            self.compiled_spec.record(render_ms, processor_ms)
             
             return {
                 'success': True,
                 'result': result,
                 'skill_name': spec['name'],
-                'execution_time': 0.0,  # 实际系统中会记录执行时间
+                'execution_time': time.perf_counter() - start_time,
+                'timings': {
+                    'compile_ms': sum(self.compiled_spec.compile_ms.values()),
+                    'render_ms': render_ms,
+                    'processor_ms': processor_ms
+                },
                 'input_context': request[:100]  # 记录输入上下文的简短摘要
             }
         
@@ -298,10 +685,16 @@ class SkillCompiler:
             # 模拟AI响应
             return f"[AI RESPONSE] Processed: {instruction[:100]}..."
         
-        def _execute_processor_script(self, script: str, response: str, context: Dict[str, Any]) -> Any:
+        def _execute_processor_script(self, script: Any, response: str, context: Dict[str, Any]) -> Any:
             """
-            执行结果处理脚本
+            执行结果处理脚本（预编译的代码对象）
             """
+            if script is None:
+                return {
+                    'error': f'Processor script failed: {self.compiled_spec.processor_error}',
+                    'raw_response': response
+                }
+            
             # 创建安全的执行环境
             local_vars = {
                 'response': response,
@@ -339,16 +732,22 @@ class SkillRegistry:
     def __init__(self):
         self.skills: Dict[str, 'DNASpecSkill'] = {}
     
-    def register(self, skill: 'DNASpecSkill') -> bool:
+    def register(self, skill: 'DNASpecSkill', replace: bool = False) -> bool:
         """
         注册技能
         """
-        if skill.name in self.skills:
+        if skill.name in self.skills and not replace:
             return False  # 技能已存在
         
         self.skills[skill.name] = skill
         return True
     
+    def unregister(self, skill_name: str) -> bool:
+        """
+        注销技能
+        """
+        return self.skills.pop(skill_name, None) is not None
+    
     def get_skill(self, skill_name: str) -> Optional['DNASpecSkill']:
         """
         获取技能实例
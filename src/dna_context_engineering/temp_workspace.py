@@ -2,225 +2,530 @@
 temp_workspace.py
 临时工作区管理技能 - 符合Claude Skills规范
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set
 import os
 import tempfile
 import shutil
+import threading
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 import json
 
-# 临时工作区状态（内存中的状态管理）
-_current_workspace = None
-_active_session = None
-_temp_files = []
-_confirmed_files = []
-_session_start_time = None
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# 会话清单目录（每个会话一个 <session_id>.json，current 记录最近的活跃会话）
+SESSIONS_DIR = Path(tempfile.gettempdir()) / "dnaspec_temp_sessions"
+
+# 清单日志至少积累这么多条（且不少于登记文件数）才压缩回快照，
+# 使每次变更的均摊写入量与文件总数无关
+MANIFEST_COMPACT_THRESHOLD = 256
+
+# 自动管理的临时文件数阈值
+AUTO_MANAGE_THRESHOLD = 10
+
+CONFIRMED_DIR = "confirmed"
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]):
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _move(source: str, target: str):
+    """同文件系统内直接重命名，跨文件系统时退回复制+删除"""
+    try:
+        os.replace(source, target)
+    except OSError:
+        shutil.move(source, target)
+
+
+class TempWorkspaceSession:
+    """
+    临时工作区会话
+
+    文件登记用集合保存相对路径。清单由快照 <session_id>.json 和追加日志
+    <session_id>.journal 组成：每次变更只向日志追加一行，日志足够长时才
+    原子重写快照并清空日志。变更在文件锁内进行，并先读入其他进程追加的
+    日志（快照被替换时整体重新加载），因此会话可以跨进程（多次CLI调用）
+    恢复和并发修改。
+    """
+
+    def __init__(self, session_id: str, workspace: str, started_at: str,
+                 sessions_dir: Path, temp_files: Optional[Set[str]] = None,
+                 confirmed_files: Optional[Set[str]] = None):
+        self.session_id = session_id
+        self.workspace = workspace
+        self.started_at = started_at
+        self.sessions_dir = Path(sessions_dir)
+        self.temp_files: Set[str] = set(temp_files or ())
+        self.confirmed_files: Set[str] = set(confirmed_files or ())
+        self._lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+        # 已加载快照的 (inode, mtime, size)，以及已应用的日志字节数/条数
+        self._snapshot_stamp: Optional[tuple] = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    @property
+    def confirmed_area(self) -> str:
+        return os.path.join(self.workspace, CONFIRMED_DIR)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.sessions_dir / f"{self.session_id}.json"
+
+    @property
+    def journal_path(self) -> Path:
+        return self.sessions_dir / f"{self.session_id}.journal"
+
+    @property
+    def lock_path(self) -> Path:
+        return self.sessions_dir / f"{self.session_id}.lock"
+
+    @classmethod
+    def create(cls, sessions_dir: Optional[Path] = None) -> 'TempWorkspaceSession':
+        """创建新的临时工作区会话"""
+        sessions_dir = Path(sessions_dir or SESSIONS_DIR)
+        sessions_dir.mkdir(parents=True, exist_ok=True)
+        now = datetime.now()
+        session = cls(
+            session_id=f"session_{now.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}",
+            workspace=tempfile.mkdtemp(prefix="dnaspec_ai_temp_workspace_"),
+            started_at=now.isoformat(),
+            sessions_dir=sessions_dir
+        )
+        os.makedirs(session.confirmed_area, exist_ok=True)
+        session.save()
+        return session
+
+    @classmethod
+    def load(cls, session_id: str, sessions_dir: Optional[Path] = None) -> Optional['TempWorkspaceSession']:
+        """从清单恢复会话（清单或工作区不存在时返回None）"""
+        sessions_dir = Path(sessions_dir or SESSIONS_DIR)
+        try:
+            with open(sessions_dir / f"{session_id}.json", 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not os.path.isdir(data.get('workspace', '')):
+            return None
+        session = cls(
+            session_id=data['session_id'],
+            workspace=data['workspace'],
+            started_at=data.get('started_at', ''),
+            sessions_dir=sessions_dir
+        )
+        session.refresh()
+        return session
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程的排他锁（同一线程内可重入）"""
+        with self._lock:
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+            if self._lock_file is None:
+                self._lock_file = open(self.lock_path, 'a+b')
+            fd = self._lock_file.fileno()
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            self._lock_depth = 1
+            try:
+                yield
+            finally:
+                self._lock_depth = 0
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    self._lock_file.seek(0)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def _reload_snapshot(self):
+        """快照被替换（其他进程压缩过）时整体重新加载"""
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if stamp == self._snapshot_stamp:
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        self.temp_files = set(data.get('temp_files', []))
+        self.confirmed_files = set(data.get('confirmed_files', []))
+        self._snapshot_stamp = stamp
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def _replay_journal(self):
+        """应用日志中尚未读过的完整行"""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                f.seek(self._journal_offset)
+                pending = f.read()
+        except FileNotFoundError:
+            return
+        end = pending.rfind(b'\n') + 1
+        for line in pending[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+            except (ValueError, KeyError, TypeError):
+                continue
+            self._journal_entries += 1
+        self._journal_offset += end
+
+    def _apply(self, entry: Dict[str, Any]):
+        op = entry['op']
+        if op == 'add':
+            self.temp_files.add(entry['path'])
+        elif op == 'confirm':
+            for rel_path in entry['paths']:
+                self.temp_files.discard(rel_path)
+                self.confirmed_files.add(rel_path)
+        elif op == 'clean':
+            self.temp_files.clear()
+
+    def refresh(self):
+        """读入其他进程对清单的修改"""
+        with self._file_lock():
+            self._reload_snapshot()
+            self._replay_journal()
+
+    def _append(self, entry: Dict[str, Any]):
+        """追加一条日志，日志过长时压缩为快照（需持有文件锁）"""
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with open(self.journal_path, 'ab') as f:
+            f.write(line)
+        self._journal_offset += len(line)
+        self._journal_entries += 1
+        if self._journal_entries >= max(MANIFEST_COMPACT_THRESHOLD,
+                                        len(self.temp_files) + len(self.confirmed_files)):
+            self._compact()
+
+    def _compact(self):
+        _write_json_atomic(self.manifest_path, {
+            'session_id': self.session_id,
+            'workspace': self.workspace,
+            'started_at': self.started_at,
+            'updated_at': datetime.now().isoformat(),
+            'temp_files': sorted(self.temp_files),
+            'confirmed_files': sorted(self.confirmed_files)
+        })
+        # 快照已包含全部日志内容，清空日志
+        open(self.journal_path, 'wb').close()
+        stat = os.stat(self.manifest_path)
+        self._snapshot_stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def save(self):
+        """把当前状态原子写入快照并清空日志"""
+        with self._file_lock():
+            self._compact()
+
+    def _relative(self, file_path: str) -> str:
+        full_path = os.path.join(self.workspace, file_path)
+        return os.path.relpath(os.path.normpath(full_path), self.workspace)
+
+    def temp_path(self, rel_path: str) -> str:
+        return os.path.join(self.workspace, rel_path)
+
+    def confirmed_path(self, rel_path: str) -> str:
+        return os.path.join(self.confirmed_area, rel_path)
+
+    def add_file(self, file_path: str, content: str, target_dir: str = "") -> str:
+        """写入临时文件并登记，返回完整路径"""
+        rel_path = self._relative(os.path.join(target_dir, file_path) if target_dir else file_path)
+        full_path = self.temp_path(rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        with self._file_lock():
+            self.refresh()
+            self.temp_files.add(rel_path)
+            self._append({'op': 'add', 'path': rel_path})
+        return full_path
+
+    def confirm_files(self, rel_paths: List[str]) -> List[str]:
+        """
+        批量确认文件（移动到确认区域，只追加一条日志）
+
+        Returns:
+            已确认文件的完整路径
+        """
+        confirmed = []
+        moved = []
+        with self._file_lock():
+            self.refresh()
+            created_dirs: Set[str] = set()
+            for rel_path in rel_paths:
+                source = self.temp_path(rel_path)
+                if not os.path.exists(source):
+                    continue
+                target = self.confirmed_path(rel_path)
+                target_dir = os.path.dirname(target)
+                if target_dir not in created_dirs:
+                    os.makedirs(target_dir, exist_ok=True)
+                    created_dirs.add(target_dir)
+                _move(source, target)
+                self.temp_files.discard(rel_path)
+                self.confirmed_files.add(rel_path)
+                confirmed.append(target)
+                moved.append(rel_path)
+            if moved:
+                self._append({'op': 'confirm', 'paths': moved})
+        return confirmed
+
+    def confirm_file(self, file_path: str) -> Optional[str]:
+        """确认单个文件，文件不存在时返回None"""
+        confirmed = self.confirm_files([self._relative(file_path)])
+        return confirmed[0] if confirmed else None
+
+    def confirm_all(self) -> int:
+        """确认所有临时文件"""
+        with self._file_lock():
+            self.refresh()
+            return len(self.confirm_files(sorted(self.temp_files)))
+
+    def clean(self) -> int:
+        """
+        删除所有未确认的临时文件
+
+        Returns:
+            清理的文件数
+        """
+        with self._file_lock():
+            self.refresh()
+            cleaned = 0
+            for rel_path in list(self.temp_files):
+                try:
+                    os.remove(self.temp_path(rel_path))
+                    cleaned += 1
+                except FileNotFoundError:
+                    pass
+                self.temp_files.discard(rel_path)
+            self._append({'op': 'clean'})
+            return cleaned
+
+    def destroy(self):
+        """删除工作区目录和会话清单"""
+        with self._lock:
+            shutil.rmtree(self.workspace, ignore_errors=True)
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+            for path in (self.manifest_path, self.journal_path, self.lock_path):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+# 进程内会话缓存（按会话ID）
+_sessions: Dict[str, TempWorkspaceSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def _current_pointer(sessions_dir: Path) -> Path:
+    return sessions_dir / "current"
+
+
+def create_session(sessions_dir: Optional[Path] = None) -> TempWorkspaceSession:
+    """创建会话并设为当前会话"""
+    session = TempWorkspaceSession.create(sessions_dir)
+    with _sessions_lock:
+        _sessions[session.session_id] = session
+        _current_pointer(session.sessions_dir).write_text(session.session_id, encoding='utf-8')
+    return session
+
+
+def get_session(session_id: Optional[str] = None,
+                sessions_dir: Optional[Path] = None) -> Optional[TempWorkspaceSession]:
+    """
+    获取会话（未指定ID时使用最近创建的会话）
+
+    优先使用进程内缓存（先读入其他进程的修改），否则从磁盘清单恢复。
+    """
+    sessions_dir = Path(sessions_dir or SESSIONS_DIR)
+    with _sessions_lock:
+        if not session_id:
+            try:
+                session_id = _current_pointer(sessions_dir).read_text(encoding='utf-8').strip()
+            except OSError:
+                return None
+        session = _sessions.get(session_id)
+        if session is None or session.sessions_dir != sessions_dir:
+            session = TempWorkspaceSession.load(session_id, sessions_dir)
+            if session is not None:
+                _sessions[session_id] = session
+        elif os.path.exists(session.manifest_path):
+            session.refresh()
+        else:
+            # 会话已被其他进程销毁
+            _sessions.pop(session_id, None)
+            session = None
+        return session
+
+
+def list_sessions(sessions_dir: Optional[Path] = None) -> List[str]:
+    """列出磁盘上的所有会话ID"""
+    sessions_dir = Path(sessions_dir or SESSIONS_DIR)
+    if not sessions_dir.exists():
+        return []
+    return sorted(p.stem for p in sessions_dir.glob("session_*.json"))
+
 
 def execute(args: Dict[str, Any]) -> str:
     """
     Claude Skills标准执行入口
     """
     operation = args.get("operation", "status")
-    global _current_workspace, _active_session, _temp_files, _confirmed_files, _session_start_time
-    
+    sessions_dir = args.get("sessions_dir")
+
     if operation == "create-workspace":
         # 创建临时工作区
-        _current_workspace = tempfile.mkdtemp(prefix="dnaspec_ai_temp_workspace_")
-        _active_session = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        _session_start_time = datetime.now().isoformat()
-        
-        # 创建确认区域
-        confirmed_area = os.path.join(_current_workspace, "confirmed")
-        os.makedirs(confirmed_area, exist_ok=True)
-        
-        return f"📁 临时工作区已创建: {_current_workspace}\n会话: {_active_session}\n启动时间: {_session_start_time}"
-
-    elif operation == "add-file":
-        file_path = args.get("file_path", "")
-        content = args.get("content", "")
-        target_dir = args.get("target_dir", "")
-
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        
-        # 构造完整文件路径
-        full_file_path = os.path.join(_current_workspace, target_dir, file_path) if target_dir else os.path.join(_current_workspace, file_path)
-        os.makedirs(os.path.dirname(full_file_path), exist_ok=True)
-        
-        # 写入内容
-        with open(full_file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        # 添加到临时文件列表
-        if full_file_path not in _temp_files:
-            _temp_files.append(full_file_path)
-        
+        session = create_session(sessions_dir)
+        return f"📁 临时工作区已创建: {session.workspace}\n会话: {session.session_id}\n启动时间: {session.started_at}"
+
+    session = get_session(args.get("session_id"), sessions_dir)
+    if operation in ("add-file", "list-files", "confirm-file", "confirm-all", "clean-workspace",
+                     "get-workspace-path", "auto-manage", "integrate-with-git") and session is None:
+        return "❌ 错误: 未创建临时工作区"
+
+    if operation == "add-file":
+        full_file_path = session.add_file(
+            args.get("file_path", ""), args.get("content", ""), args.get("target_dir", "")
+        )
+
         # 文件统计信息
-        file_size = len(content.encode('utf-8'))
-        return f"📄 文件已添加到临时工作区\n文件: {full_file_path}\n大小: {file_size} 字节\n临时文件总数: {len(_temp_files)}"
+        file_size = len(args.get("content", "").encode('utf-8'))
+        return f"📄 文件已添加到临时工作区\n文件: {full_file_path}\n大小: {file_size} 字节\n临时文件总数: {len(session.temp_files)}"
 
     elif operation == "list-files":
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        
+        temp_files = sorted(session.temp_files)
+        confirmed_files = sorted(session.confirmed_files)
+
         lines = ["📋 临时工作区文件状态:"]
-        lines.append(f"临时文件: {len(_temp_files)} 个")
-        lines.append(f"确认文件: {len(_confirmed_files)} 个")
-        lines.append(f"活跃会话: {_active_session}")
-        
+        lines.append(f"临时文件: {len(temp_files)} 个")
+        lines.append(f"确认文件: {len(confirmed_files)} 个")
+        lines.append(f"活跃会话: {session.session_id}")
+
         detailed = args.get("detailed", False)
         if detailed:
             lines.append("\n临时文件列表:")
-            for i, file_path in enumerate(_temp_files[:10]):  # 只显示前10个
+            for i, rel_path in enumerate(temp_files[:10]):  # 只显示前10个
                 try:
-                    size = os.path.getsize(file_path)
-                    lines.append(f"  [{i+1}] {os.path.basename(file_path)} ({size} bytes)")
-                except:
-                    lines.append(f"  [{i+1}] {os.path.basename(file_path)} (大小未知)")
-            
-            if len(_temp_files) > 10:
-                lines.append(f"  ... 还有 {len(_temp_files) - 10} 个文件")
-            
+                    size = os.path.getsize(session.temp_path(rel_path))
+                    lines.append(f"  [{i+1}] {os.path.basename(rel_path)} ({size} bytes)")
+                except OSError:
+                    lines.append(f"  [{i+1}] {os.path.basename(rel_path)} (大小未知)")
+
+            if len(temp_files) > 10:
+                lines.append(f"  ... 还有 {len(temp_files) - 10} 个文件")
+
             lines.append("\n确认文件列表:")
-            for i, file_path in enumerate(_confirmed_files[:5]):
+            for i, rel_path in enumerate(confirmed_files[:5]):
                 try:
-                    size = os.path.getsize(file_path)
-                    lines.append(f"  ✅ [{i+1}] {os.path.basename(file_path)} ({size} bytes)")
-                except:
-                    lines.append(f"  ✅ [{i+1}] {os.path.basename(file_path)} (大小未知)")
-            
-            if len(_confirmed_files) > 5:
-                lines.append(f"  ... 还有 {len(_confirmed_files) - 5} 个确认文件")
-        
+                    size = os.path.getsize(session.confirmed_path(rel_path))
+                    lines.append(f"  ✅ [{i+1}] {os.path.basename(rel_path)} ({size} bytes)")
+                except OSError:
+                    lines.append(f"  ✅ [{i+1}] {os.path.basename(rel_path)} (大小未知)")
+
+            if len(confirmed_files) > 5:
+                lines.append(f"  ... 还有 {len(confirmed_files) - 5} 个确认文件")
+
         return "\n".join(lines)
 
     elif operation == "confirm-file":
         confirm_file = args.get("confirm_file", "")
-        
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        
-        temp_file_path = os.path.join(_current_workspace, confirm_file)
-        
-        if not os.path.exists(temp_file_path):
-            return f"❌ 错误: 临时文件不存在: {temp_file_path}"
-        
-        # 移动到确认区域
-        confirmed_area = os.path.join(_current_workspace, "confirmed")
-        confirmed_file_path = os.path.join(confirmed_area, confirm_file)
-        
-        os.makedirs(os.path.dirname(confirmed_file_path), exist_ok=True)
-        shutil.move(temp_file_path, confirmed_file_path)
-        
-        # 更新状态
-        if temp_file_path in _temp_files:
-            _temp_files.remove(temp_file_path)
-        if confirmed_file_path not in _confirmed_files:
-            _confirmed_files.append(confirmed_file_path)
-        
-        return f"✅ 文件已确认到确认区域: {confirmed_file_path}\n临时文件: {len(_temp_files)} 个 -> {len(_temp_files)} 个\n确认文件: {len(_confirmed_files)-1} 个 -> {len(_confirmed_files)} 个"
+        temp_count = len(session.temp_files)
+        confirmed_count = len(session.confirmed_files)
+
+        confirmed_file_path = session.confirm_file(confirm_file)
+        if confirmed_file_path is None:
+            return f"❌ 错误: 临时文件不存在: {os.path.join(session.workspace, confirm_file)}"
+
+        return f"✅ 文件已确认到确认区域: {confirmed_file_path}\n临时文件: {temp_count} 个 -> {len(session.temp_files)} 个\n确认文件: {confirmed_count} 个 -> {len(session.confirmed_files)} 个"
 
     elif operation == "confirm-all":
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        
-        confirmed_count = 0
-        for temp_file in _temp_files[:]:  # 复制列表以防止在迭代时修改
-            relative_path = os.path.relpath(temp_file, _current_workspace)
-            confirmed_area = os.path.join(_current_workspace, "confirmed")
-            confirmed_file_path = os.path.join(confirmed_area, relative_path)
-            
-            os.makedirs(os.path.dirname(confirmed_file_path), exist_ok=True)
-            shutil.move(temp_file, confirmed_file_path)
-            
-            _temp_files.remove(temp_file)
-            _confirmed_files.append(confirmed_file_path)
-            confirmed_count += 1
-        
-        return f"✅ 已确认所有 {confirmed_count} 个临时文件到确认区域\n已确认文件: {len(_confirmed_files)} 个"
+        confirmed_count = session.confirm_all()
+        return f"✅ 已确认所有 {confirmed_count} 个临时文件到确认区域\n已确认文件: {len(session.confirmed_files)} 个"
 
     elif operation == "clean-workspace":
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        
-        # 清理临时文件
-        for temp_file in _temp_files[:]:
-            try:
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                _temp_files.remove(temp_file)
-            except Exception as e:
-                return f"❌ 清理临时文件失败: {str(e)}"
-        
-        # 记录清理信息
-        cleaned_count = confirmed_count - len(_temp_files)  # 实际清理的文件数
-        return f"🧹 临时工作区清理完成\n清理临时文件: {cleaned_count} 个\n剩余确认文件: {len(_confirmed_files)} 个\n当前会话: {_active_session}"
+        try:
+            cleaned_count = session.clean()
+        except OSError as e:
+            return f"❌ 清理临时文件失败: {str(e)}"
+        return f"🧹 临时工作区清理完成\n清理临时文件: {cleaned_count} 个\n剩余确认文件: {len(session.confirmed_files)} 个\n当前会话: {session.session_id}"
 
     elif operation == "get-workspace-path":
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        return f"📍 临时工作区路径: {_current_workspace}"
+        return f"📍 临时工作区路径: {session.workspace}"
 
     elif operation == "auto-manage":
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        
-        temp_count = len(_temp_files)
-        confirmed_count = len(_confirmed_files)
-        
-        if temp_count > 10:  # 假设阈值为10个临时文件
-            return f"⚠️  临时文件数量 ({temp_count}) 达到阈值，建议确认或清理:\n1. 使用 confirm-all 操作确认所有文件\n2. 使用 confirm-file 操作选择性确认\n3. 使用 clean-workspace 清理临时文件\n\n当前文件:\n{chr(10).join(_temp_files[:5])}\n...{chr(10) if temp_count > 5 else ''}"
+        temp_count = len(session.temp_files)
+        confirmed_count = len(session.confirmed_files)
+
+        if temp_count > AUTO_MANAGE_THRESHOLD:
+            preview = [session.temp_path(p) for p in sorted(session.temp_files)[:5]]
+            return f"⚠️  临时文件数量 ({temp_count}) 达到阈值，建议确认或清理:\n1. 使用 confirm-all 操作确认所有文件\n2. 使用 confirm-file 操作选择性确认\n3. 使用 clean-workspace 清理临时文件\n\n当前文件:\n{chr(10).join(preview)}\n...{chr(10) if temp_count > 5 else ''}"
         else:
-            return f"✅ 临时工作区状态正常\n临时文件: {temp_count}\n确认文件: {confirmed_count}\n阈值: 10\n状态: 正常运行"
+            return f"✅ 临时工作区状态正常\n临时文件: {temp_count}\n确认文件: {confirmed_count}\n阈值: {AUTO_MANAGE_THRESHOLD}\n状态: 正常运行"
 
     elif operation == "integrate-with-git":
-        if not _current_workspace:
-            return "❌ 错误: 未创建临时工作区"
-        
         repo_path = args.get("repo_path", ".")
         confirm_to_git = args.get("confirm_to_git", True)
-        
+
         if confirm_to_git:
             # 将确认区域的文件复制到Git仓库
-            confirmed_area = os.path.join(_current_workspace, "confirmed")
-            if os.path.exists(confirmed_area):
+            if os.path.exists(session.confirmed_area):
                 import subprocess
                 try:
-                    # 获取确认区域的所有文件
-                    git_add_cmd = ["git", "add"]
-                    files_added = 0
-                    for root, dirs, filenames in os.walk(confirmed_area):
+                    rel_paths = []
+                    for root, dirs, filenames in os.walk(session.confirmed_area):
                         for filename in filenames:
                             file_path = os.path.join(root, filename)
-                            rel_path = os.path.relpath(file_path, confirmed_area)
+                            rel_path = os.path.relpath(file_path, session.confirmed_area)
                             target_path = os.path.join(repo_path, rel_path)
-                            
+
                             # 确保目标目录存在
                             os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                            
+
                             # 复制文件到目标位置
-                            import shutil
                             shutil.copy2(file_path, target_path)
-                            git_add_cmd.append(rel_path)
-                            files_added += 1
-                    
-                    # 添加到Git暂存区
-                    if files_added > 0:
-                        subprocess.run(["git", "add"] + [os.path.join(repo_path, rel_path) 
-                                                        for root, dirs, filenames in os.walk(confirmed_area)
-                                                        for filename in filenames
-                                                        for rel_path in [os.path.relpath(os.path.join(root, filename), confirmed_area)]],
-                                      cwd=repo_path, capture_output=True)
-                    
-                    return f"✅ 成功将 {files_added} 个确认文件集成到Git仓库: {repo_path}"
-                    
+                            rel_paths.append(rel_path)
+
+                    # 添加到Git暂存区（一次调用）
+                    if rel_paths:
+                        subprocess.run(["git", "add", "--"] + rel_paths, cwd=repo_path, capture_output=True)
+
+                    return f"✅ 成功将 {len(rel_paths)} 个确认文件集成到Git仓库: {repo_path}"
+
                 except Exception as e:
                     return f"❌ Git集成失败: {str(e)}"
             else:
                 return "❌ 确认区域不存在或为空"
         else:
-            return f"📊 临时工作区状态:\n  会话: {_active_session}\n  临时文件: {len(_temp_files)}\n  确认文件: {len(_confirmed_files)}\n  路径: {_current_workspace}"
+            return f"📊 临时工作区状态:\n  会话: {session.session_id}\n  临时文件: {len(session.temp_files)}\n  确认文件: {len(session.confirmed_files)}\n  路径: {session.workspace}"
 
     else:
         return f"❌ 未知操作: {operation}\n可用操作: create-workspace, add-file, list-files, confirm-file, confirm-all, clean-workspace, get-workspace-path, auto-manage, integrate-with-git"
@@ -277,6 +582,10 @@ def get_manifest() -> Dict[str, Any]:
                     "type": "boolean",
                     "description": "是否将确认文件提交到Git（integrate-with-git操作需要）",
                     "default": True
+                },
+                "session_id": {
+                    "type": "string",
+                    "description": "会话ID（省略时使用最近创建的会话）"
                 }
             },
             "required": ["operation"]
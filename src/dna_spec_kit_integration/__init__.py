@@ -1,20 +1,8 @@
 """
 DNASPEC与spec.kit整合项目 - 项目的主入口点
-"""
-from .core import (
-    CommandParser,
-    SkillMapper,
-    PythonBridge,
-    SkillExecutor,
-    CommandHandler,
-    InteractiveShell,
-    CliDetector,
-    ConfigGenerator,
-    IntegrationValidator,
-    AutoConfigurator,
-    PlatformUtils
-)
 
+核心类在首次访问时才从 core 导入，`dnaspec --help` 等命令无需加载它们
+"""
 __version__ = "0.2.0"
 __all__ = [
     'CommandParser',
@@ -28,4 +16,17 @@ __all__ = [
     'IntegrationValidator',
     'AutoConfigurator',
     'PlatformUtils'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import core
+        value = getattr(core, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
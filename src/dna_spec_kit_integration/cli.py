@@ -28,10 +28,42 @@ def is_stigmergy_available():
         return False
 
 
-def main():
+def _create_skill_executor():
+    """
+    创建技能执行器
+
+    当前目录的项目已由 dnaspec-init 启用缓存时，使用 .dnaspec/cache 中的结果缓存
+    """
+    from dna_spec_kit_integration.core.skill_executor import SkillExecutor
+    from dna_spec_kit_integration.core.python_bridge import PythonBridge, DEFAULT_MANIFEST_PATH
+    from dna_spec_kit_integration.core.skill_mapper import SkillMapper
+    from dna_spec_kit_integration.core.result_cache import TieredResultCache
+
+    python_bridge = PythonBridge(manifest_path=DEFAULT_MANIFEST_PATH)
+    skill_mapper = SkillMapper()
+    result_cache = TieredResultCache.for_project(os.getcwd())
+    return SkillExecutor(python_bridge, skill_mapper, result_cache=result_cache)
+
+
+def _create_command_handler():
+    """
+    创建命令处理器及其依赖的执行栈
+
+    只有 exec/shell/list 需要，按需导入以缩短其他命令的启动时间
+    """
+    from dna_spec_kit_integration.core.command_handler import CommandHandler
+
+    return CommandHandler(None, _create_skill_executor())
+
+
+def main(argv=None):
     """
     CLI主函数
+
+    Args:
+        argv: 命令行参数（默认取 sys.argv[1:]）
     """
+    argv = sys.argv[1:] if argv is None else list(argv)
     parser = argparse.ArgumentParser(
         description='DNA SPEC Context System (dnaspec) - Context Engineering Skills',
         prog='dnaspec'
@@ -88,10 +120,10 @@ def main():
     
     # 手动解析参数以处理复杂的slash命令
     # 对于slash命令，我们需要特殊的参数解析
-    if len(sys.argv) > 2 and sys.argv[1] == 'slash':
+    if len(argv) > 1 and argv[0] == 'slash':
         # 找到第一个不是空格的参数
         skill_args = []
-        for arg in sys.argv[2:]:
+        for arg in argv[1:]:
             if not arg.startswith('-'):
                 skill_args.append(arg)
             else:
@@ -105,26 +137,11 @@ def main():
         
         args = SimpleArgs()
     else:
-        args = parser.parse_args()
-    
-    # 检查Stigmergy可用性
-    stigmergy_available = is_stigmergy_available()
-    
-    # 延迟导入以避免循环依赖
-    from dna_spec_kit_integration.core.command_handler import CommandHandler
-    from dna_spec_kit_integration.core.interactive_shell import InteractiveShell
-    from dna_spec_kit_integration.core.skill_executor import SkillExecutor
-    from dna_spec_kit_integration.core.python_bridge import PythonBridge
-    from dna_spec_kit_integration.core.skill_mapper import SkillMapper
-    
-    # 创建组件
-    python_bridge = PythonBridge()
-    skill_mapper = SkillMapper()
-    skill_executor = SkillExecutor(python_bridge, skill_mapper)
-    command_handler = CommandHandler(None, skill_executor)
+        args = parser.parse_args(argv)
     
     if args.command == 'exec':
         # 执行命令
+        command_handler = _create_command_handler()
         result = command_handler.handle_command(args.command_string)
         
         if result['success']:
@@ -135,12 +152,13 @@ def main():
             
     elif args.command == 'shell':
         # 启动交互式Shell
-        shell = InteractiveShell(command_handler)
+        from dna_spec_kit_integration.core.interactive_shell import InteractiveShell
+        shell = InteractiveShell(_create_command_handler())
         shell.start()
         
     elif args.command == 'list':
         # 列出可用命令
-        commands = command_handler.get_available_commands()
+        commands = _create_command_handler().get_available_commands()
         print('Available DNASPEC Skills:')
         for cmd in commands:
             print(f'  {cmd}')
@@ -167,14 +185,8 @@ def main():
         
         # 导入并调用技能执行器
         try:
-            from dna_spec_kit_integration.core.skill_executor import SkillExecutor
-            from dna_spec_kit_integration.core.python_bridge import PythonBridge
-            from dna_spec_kit_integration.core.skill_mapper import SkillMapper
-            
             # 创建技能执行器
-            python_bridge = PythonBridge()
-            skill_mapper = SkillMapper()
-            skill_executor = SkillExecutor(python_bridge, skill_mapper)
+            skill_executor = _create_skill_executor()
             
             # 执行技能
             params_str = ' '.join(skill_params) if skill_params else ''
@@ -204,7 +216,7 @@ def main():
         # 验证集成
         if args.stigmergy:
             # 验证Stigmergy集成
-            if not stigmergy_available:
+            if not is_stigmergy_available():
                 print('❌ Stigmergy is not installed or not available')
                 print('Please install Stigmergy first: npm install -g stigmergy')
                 sys.exit(1)
@@ -321,7 +333,7 @@ def main():
             elif args.platform:
                 # 针对特定平台
                 print(f'🎯 Integrating DNASPEC skills to {args.platform}...')
-                if stigmergy_available and args.platform in manager.supported_clis:
+                if args.platform in manager.supported_clis and is_stigmergy_available():
                     # 使用Stigmergy集成
                     from dna_spec_kit_integration.core.stigmergy_adapter import StigmergyAdapter
                     adapter = StigmergyAdapter()
@@ -395,7 +407,7 @@ def main():
         parser.print_help()
         
         # 显示Stigmergy状态
-        if stigmergy_available:
+        if is_stigmergy_available():
             print('\n💡 Stigmergy detected! You can integrate DNASPEC with Stigmergy using:')
             print('   dnaspec integrate --stigmergy')
         else:
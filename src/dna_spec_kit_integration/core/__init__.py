@@ -1,28 +1,36 @@
 """
 DNASPEC核心模块初始化文件
+
+核心类按需导入（PEP 562），避免CLI启动时加载整个核心栈
 """
-from .command_parser import CommandParser
-from .skill_mapper import SkillMapper
-from .python_bridge import PythonBridge
-from .skill_executor import SkillExecutor
-from .command_handler import CommandHandler
-from .interactive_shell import InteractiveShell
-from .cli_detector import CliDetector
-from .config_generator import ConfigGenerator
-from .integration_validator import IntegrationValidator
-from .auto_configurator import AutoConfigurator
-from .platform_utils import PlatformUtils
+import importlib
+
+# 导出名 -> 所在子模块
+_LAZY_EXPORTS = {
+    'CommandParser': 'command_parser',
+    'SkillMapper': 'skill_mapper',
+    'PythonBridge': 'python_bridge',
+    'SkillExecutor': 'skill_executor',
+    'CommandHandler': 'command_handler',
+    'InteractiveShell': 'interactive_shell',
+    'CliDetector': 'cli_detector',
+    'ConfigGenerator': 'config_generator',
+    'IntegrationValidator': 'integration_validator',
+    'AutoConfigurator': 'auto_configurator',
+    'PlatformUtils': 'platform_utils'
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = [
-    'CommandParser',
-    'SkillMapper',
-    'PythonBridge',
-    'SkillExecutor',
-    'CommandHandler',
-    'InteractiveShell',
-    'CliDetector',
-    'ConfigGenerator',
-    'IntegrationValidator',
-    'AutoConfigurator',
-    'PlatformUtils'
-]
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,14 +1,19 @@
 """
 核心共同状态管理器 - 技能协同契约系统的基础
 """
+import atexit
 import json
 import threading
+import time
 import os
+from collections import deque
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from enum import Enum
 
+from .state_journal import EventJournal
+
 class StateUpdateType(Enum):
     """状态更新类型"""
     TEMP_FILE_ADD = "temp_file_add"
@@ -22,22 +27,57 @@ class StateUpdateType(Enum):
     QUALITY_METRIC = "quality_metric"
 
 class CommonStateManager:
-    """核心共同状态管理器"""
+    """
+    核心共同状态管理器
+
+    状态采用写时复制：每次更新替换根字典和被修改的类别字典，已被读取的状态对象
+    不再被修改，因此读取无需加锁也能得到一致快照。列表只在发布后被读取过时才复制：
+    读取方通过 _observe 取得状态并打上标记，此前由管理器复制出、尚未被读取的列表
+    原地追加/删除，连续 n 次追加为 O(n) 而不是 O(n²)。列表成员检查由集合索引支持。
+
+    write_behind=True 时更新只标记脏计数，由后台定时器（flush_interval 秒）或
+    脏计数达到 flush_threshold 时合并写盘；写盘使用临时文件 + 重命名。
+
+    每次变更同时追加到事件日志（<状态文件>.journal/），快照记录已包含的日志序号
+    journal_seq。启动时在快照之上重放其后的日志记录，崩溃前未写盘的变更不会丢失。
+    """
     
-    def __init__(self, state_file: str = None):
+    def __init__(self, state_file: str = None, write_behind: bool = False,
+                 flush_interval: float = 1.0, flush_threshold: int = 100,
+                 history_size: int = 1000, journal_dir: str = None,
+                 journal_enabled: bool = True):
         self._state = self._initialize_default_state()
         self._lock = threading.RLock()  # 可重入锁，防止死锁
-        self._event_history = []  # 状态变更历史
+        self._flush_lock = threading.Lock()  # 串行化写盘
+        self._event_history = deque(maxlen=history_size)  # 最近的状态变更历史（环形缓冲）
         self._state_file = state_file or self._get_default_state_file()
+        self._journal: Optional[EventJournal] = None
+        if journal_enabled:
+            self._journal = EventJournal(journal_dir or self._state_file + '.journal')
+        self._applied_seq = 0  # 已并入 self._state 的最大日志序号
+        self._list_members: Dict[tuple, set] = {}  # (类别, 键) -> 列表成员键集合
+        self._publish_lock = threading.Lock()  # 串行化发布与无锁读取方的标记
+        self._observed = True  # 当前发布的状态是否已被读取
+        self._owned_lists: Dict[tuple, list] = {}  # (类别, 键) -> 尚未被读取、可原地修改的列表
         
-        # 从文件加载现有状态
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._dirty = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        if write_behind:
+            atexit.register(self.flush)
+        
+        # 从文件加载现有状态，再重放快照之后的日志
         self._load_state_from_file()
+        self._recover_from_journal()
         
     def _initialize_default_state(self) -> Dict[str, Any]:
         """初始化默认状态"""
         return {
             "version": "1.0.0",
             "last_updated": datetime.now().isoformat(),
+            "journal_seq": 0,
             "temp_workspace": {
                 "active_session": None,
                 "temp_files": [],
@@ -106,38 +146,230 @@ class CommonStateManager:
             print(f"⚠️  加载状态文件失败: {e}")
             # 如果加载失败，使用默认状态
     
+    def _recover_from_journal(self):
+        """
+        在快照之上重放日志，并用日志填充最近的变更历史
+
+        从最新分段往前读，只读到既覆盖快照之后的全部记录、又凑满历史容量为止。
+        """
+        if self._journal is None:
+            return
+        snapshot_seq = self._state.get("journal_seq", 0)
+        chunks = []
+        events = 0
+        for chunk in self._journal.segments_newest_first():
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            events += sum(1 for record in chunk if record.get("event"))
+            if events >= self._event_history.maxlen and chunk[0]["seq"] <= snapshot_seq + 1:
+                break
+        state = self._state
+        for record in (record for chunk in reversed(chunks) for record in chunk):
+            if record.get("event"):
+                self._event_history.append(record["event"])
+            if record["seq"] > snapshot_seq:
+                self._apply_record(state, record)
+                state["journal_seq"] = record["seq"]
+        # 日志被删除时序号从快照继续
+        self._journal.last_seq = max(self._journal.last_seq, snapshot_seq)
+        self._applied_seq = state.get("journal_seq", 0)
+    
+    @staticmethod
+    def _apply_record(state: Dict[str, Any], record: Dict[str, Any]):
+        """把一条日志记录原地应用到状态字典"""
+        op = record["op"]
+        category = record["category"]
+        if op == "reset":
+            state[category] = dict(record["value"])
+        else:
+            values = state.setdefault(category, {})
+            key = record["key"]
+            if op == "set":
+                values[key] = record["value"]
+            elif op == "append":
+                items = values.setdefault(key, [])
+                if record["value"] not in items:
+                    items.append(record["value"])
+            elif op == "remove":
+                items = values.get(key)
+                if isinstance(items, list) and record["value"] in items:
+                    items.remove(record["value"])
+        state["last_updated"] = datetime.fromtimestamp(record["ts"]).isoformat()
+    
+    @classmethod
+    def _apply_record_copy(cls, state: Dict[str, Any], record: Dict[str, Any]):
+        """写时复制地应用日志记录：先复制受影响的类别字典与列表，已发布的对象不被修改"""
+        if record["op"] != "reset":
+            category = record["category"]
+            current = state.get(category)
+            values = dict(current) if isinstance(current, dict) else {}
+            items = values.get(record["key"])
+            if isinstance(items, list):
+                values[record["key"]] = list(items)
+            state[category] = values
+        cls._apply_record(state, record)
+    
     def _save_state_to_file(self):
-        """保存状态到文件"""
+        """原子地保存状态到文件（临时文件 + 重命名）"""
         try:
-            self._ensure_state_directory()
-            with open(self._state_file, 'w', encoding='utf-8') as f:
-                json.dump(self._state, f, ensure_ascii=False, indent=2)
+            with self._flush_lock:
+                # 已发布的状态不会被原地修改，无需持有状态锁即可序列化；
+                # 在写盘锁内读取最新状态，保证后写入的文件不会比先写入的旧
+                self._dirty = 0
+                state = self._observe()
+                data = json.dumps(state, ensure_ascii=False, separators=(',', ':'))
+                self._ensure_state_directory()
+                tmp_file = self._state_file + '.tmp'
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(tmp_file, self._state_file)
+                if self._journal is not None:
+                    # 已进入快照的旧分段可以回收
+                    self._journal.prune(state.get("journal_seq", 0))
         except Exception as e:
             print(f"❌ 保存状态文件失败: {e}")
     
+    def _mark_dirty(self):
+        """记录一次变更；同步模式立即写盘，写回模式按阈值或定时合并写盘"""
+        if not self.write_behind:
+            self._save_state_to_file()
+            return
+        
+        self._dirty += 1
+        if self._dirty >= self.flush_threshold:
+            self._save_state_to_file()
+        elif self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_interval, self._flush_from_timer)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+    
+    def _flush_from_timer(self):
+        with self._lock:
+            self._flush_timer = None
+        self.flush()
+    
+    def flush(self):
+        """把尚未写盘的变更写入文件"""
+        if self._dirty:
+            self._save_state_to_file()
+    
+    def close(self):
+        """停止定时写盘并写入剩余变更"""
+        with self._lock:
+            timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+        if self._journal is not None:
+            self._journal.close()
+        if self.write_behind:
+            atexit.unregister(self.flush)
+    
+    @property
+    def pending_updates(self) -> int:
+        """尚未写盘的变更数"""
+        return self._dirty
+    
+    def _set_category(self, category: str, values: Dict[str, Any], op: str,
+                      key: Optional[str] = None, value: Any = None,
+                      event: Optional[Dict[str, Any]] = None):
+        """
+        记录日志并发布新的类别字典（写时复制，调用方持有锁）
+        
+        Args:
+            op: 日志操作 set/append/remove/reset
+            key: 被修改的键
+            value: 操作的值（reset 为整个类别）
+            event: 同时记录的变更历史条目
+        """
+        state = dict(self._state)
+        state[category] = values
+        merged = False
+        if self._journal is not None:
+            record = {"op": op, "category": category, "key": key, "value": value, "event": event}
+            seq = self._journal.append(record)
+            if seq != self._applied_seq + 1:
+                # 共用日志的其他实例在此之前写入了记录：按序号先并入它们，再重放本次操作
+                state = dict(self._state)
+                for foreign in self._journal.records(after_seq=self._applied_seq):
+                    if foreign["seq"] >= seq:
+                        break
+                    self._apply_record_copy(state, foreign)
+                    if foreign.get("event"):
+                        self._event_history.append(foreign["event"])
+                self._apply_record_copy(state, {**record, "ts": time.time()})
+                self._list_members.clear()
+                merged = True
+            state["journal_seq"] = self._applied_seq = seq
+        state["last_updated"] = datetime.now().isoformat()
+        with self._publish_lock:
+            if op in ("append", "remove") and not merged:
+                values[key] = self._updated_list(category, key, values[key], op, value)
+            self._state = state
+            self._observed = False
+    
+    def _updated_list(self, category: str, key: str, items: List[Any], op: str, item: Any) -> List[Any]:
+        """追加/删除列表项（调用方持有发布锁）：未被读取过的自有列表原地修改，否则复制"""
+        if self._observed or self._owned_lists.get((category, key)) is not items:
+            if self._observed:
+                # 已发布的列表都可能被读取方持有
+                self._owned_lists.clear()
+            items = list(items)
+            self._owned_lists[(category, key)] = items
+        if op == "append":
+            items.append(item)
+        else:
+            del items[items.index(item)]
+        return items
+    
+    def _observe(self) -> Dict[str, Any]:
+        """无锁读取方获取当前发布的状态；此后其中的对象不再被原地修改"""
+        with self._publish_lock:
+            self._observed = True
+            return self._state
+    
+    def _category_copy(self, category: str) -> Dict[str, Any]:
+        current = self._state.get(category)
+        return dict(current) if isinstance(current, dict) else {}
+    
+    @staticmethod
+    def _member_key(item: Any) -> Any:
+        try:
+            hash(item)
+            return item
+        except TypeError:
+            return json.dumps(item, sort_keys=True, ensure_ascii=False, default=str)
+    
+    def _members(self, category: str, key: str, items: List[Any]) -> set:
+        members = self._list_members.get((category, key))
+        if members is None:
+            members = {self._member_key(existing) for existing in items}
+            self._list_members[(category, key)] = members
+        return members
+    
     def update_state(self, category: str, key: str, value: Any) -> bool:
         """更新状态"""
         with self._lock:
             try:
-                # 确保类别存在
-                if category not in self._state:
-                    self._state[category] = {}
+                values = self._category_copy(category)
                 
                 # 记录旧值
-                old_value = self._state[category].get(key)
-                
-                # 更新值
-                self._state[category][key] = value
-                self._state["last_updated"] = datetime.now().isoformat()
+                old_value = values.get(key)
                 
                 # 记录变更事件
                 state_update_type = (StateUpdateType.CONTEXT_ANALYSIS if "context" in category
                                    else StateUpdateType.GIT_OPERATION if "git" in category
                                    else StateUpdateType.TEMP_FILE_ADD)
-                self._log_state_update(state_update_type, category, key, old_value, value)
+                event = self._log_state_update(state_update_type, category, key, old_value, value)
+                
+                # 更新值
+                values[key] = value
+                self._set_category(category, values, "set", key, value, event)
+                self._list_members.pop((category, key), None)
                 
                 # 保存到文件
-                self._save_state_to_file()
+                self._mark_dirty()
                 
                 return True
             except Exception as e:
@@ -145,25 +377,25 @@ class CommonStateManager:
                 return False
     
     def get_state(self, category: str, key: str = None) -> Any:
-        """获取状态"""
-        with self._lock:
-            if key is None:
-                return self._state.get(category, {})
-            return self._state.get(category, {}).get(key)
+        """获取状态（无锁读取当前发布的快照）"""
+        state = self._observe()
+        if key is None:
+            return state.get(category, {})
+        return state.get(category, {}).get(key)
     
     def append_to_list(self, category: str, key: str, item: Any) -> bool:
         """向列表添加项"""
         with self._lock:
             try:
-                if category not in self._state:
-                    self._state[category] = {}
-                if key not in self._state[category]:
-                    self._state[category][key] = []
+                values = self._category_copy(category)
+                items = values.get(key)
+                if not isinstance(items, list):
+                    items = []
+                    self._list_members.pop((category, key), None)
+                members = self._members(category, key, items)
                 
-                if item not in self._state[category][key]:  # 避免重复
-                    self._state[category][key].append(item)
-                    self._state["last_updated"] = datetime.now().isoformat()
-                    
+                member_key = self._member_key(item)
+                if member_key not in members:  # 避免重复
                     # 记录变更事件
                     if "temp" in category:
                         state_update_type = StateUpdateType.TEMP_FILE_ADD
@@ -172,9 +404,13 @@ class CommonStateManager:
                     else:
                         state_update_type = StateUpdateType.GIT_OPERATION
 
-                    self._log_state_update(state_update_type, category, key, "list_append", item)
+                    event = self._log_state_update(state_update_type, category, key, "list_append", item)
                     
-                    self._save_state_to_file()
+                    values[key] = items  # 由 _set_category 在发布时追加
+                    members.add(member_key)
+                    self._set_category(category, values, "append", key, item, event)
+                    
+                    self._mark_dirty()
                 
                 return True
             except Exception as e:
@@ -185,15 +421,17 @@ class CommonStateManager:
         """从列表移除项"""
         with self._lock:
             try:
-                if (category in self._state and 
-                    key in self._state[category] and 
-                    isinstance(self._state[category][key], list) and
-                    item in self._state[category][key]):
-                    
-                    self._state[category][key].remove(item)
-                    self._state["last_updated"] = datetime.now().isoformat()
-                    
-                    self._save_state_to_file()
+                items = self._state.get(category, {}).get(key)
+                if isinstance(items, list):
+                    members = self._members(category, key, items)
+                    member_key = self._member_key(item)
+                    if member_key in members:
+                        values = self._category_copy(category)
+                        values[key] = items  # 由 _set_category 在发布时删除
+                        members.discard(member_key)
+                        self._set_category(category, values, "remove", key, item)
+                        
+                        self._mark_dirty()
                 
                 return True
             except Exception as e:
@@ -204,14 +442,12 @@ class CommonStateManager:
         """递增计数器"""
         with self._lock:
             try:
-                if category not in self._state:
-                    self._state[category] = {}
-                current_val = self._state[category].get(key, 0)
-                new_val = current_val + 1
-                self._state[category][key] = new_val
-                self._state["last_updated"] = datetime.now().isoformat()
+                values = self._category_copy(category)
+                new_val = values.get(key, 0) + 1
+                values[key] = new_val
+                self._set_category(category, values, "set", key, new_val)
                 
-                self._save_state_to_file()
+                self._mark_dirty()
                 
                 return new_val
             except Exception as e:
@@ -219,7 +455,7 @@ class CommonStateManager:
                 return 0
     
     def _log_state_update(self, update_type: StateUpdateType, category: str, key: str, 
-                         old_value: Any, new_value: Any):
+                         old_value: Any, new_value: Any) -> Dict[str, Any]:
         """记录状态变更"""
         update_record = {
             "timestamp": datetime.now().isoformat(),
@@ -229,21 +465,72 @@ class CommonStateManager:
             "old_value": old_value,
             "new_value": new_value
         }
-        self._event_history.append(update_record)
-        
-        # 保持历史记录在合理大小
-        if len(self._event_history) > 1000:
-            self._event_history = self._event_history[-500:]  # 保留最近500条
+        self._event_history.append(update_record)  # 环形缓冲自动丢弃最旧的记录
+        return update_record
     
     def get_event_history(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """获取状态变更历史"""
+        """获取最近的状态变更历史（内存环形缓冲）"""
         with self._lock:
-            return self._event_history[-limit:]
+            history = list(self._event_history)
+        return history[-limit:] if limit else history
+    
+    @staticmethod
+    def _to_timestamp(value: Union[datetime, float, None]) -> Optional[float]:
+        if isinstance(value, datetime):
+            return value.timestamp()
+        return value
+    
+    def query_events(self, start: Union[datetime, float, None] = None,
+                     end: Union[datetime, float, None] = None,
+                     category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        按时间范围查询日志中的变更记录
+        
+        Args:
+            start: 起始时间（datetime 或时间戳，含）
+            end: 结束时间（含）
+            category: 只返回该类别的记录
+            
+        Returns:
+            按序号排列的日志记录（seq、ts、op、category、key、value、event）
+        """
+        if self._journal is None:
+            return []
+        return [
+            record for record in self._journal.records(
+                start=self._to_timestamp(start), end=self._to_timestamp(end)
+            )
+            if category is None or record["category"] == category
+        ]
+    
+    def replay_journal(self, until: Union[datetime, float, None] = None) -> Dict[str, Any]:
+        """
+        从默认状态开始重放保留的全部日志，重建状态
+        
+        日志分段被回收后，结果只包含保留分段中的变更；崩溃恢复使用快照 + 日志，不受影响。
+        
+        Args:
+            until: 只重放到该时间为止（含），用于查看历史时刻的状态
+            
+        Returns:
+            重建的状态字典
+        """
+        state = self._initialize_default_state()
+        if self._journal is None:
+            return state
+        for record in self._journal.records(end=self._to_timestamp(until)):
+            self._apply_record(state, record)
+            state["journal_seq"] = record["seq"]
+        return state
     
     def get_full_state_snapshot(self) -> Dict[str, Any]:
-        """获取完整状态快照"""
-        with self._lock:
-            return json.loads(json.dumps(self._state))  # 深拷贝避免外部修改
+        """
+        获取完整状态快照（无锁）
+        
+        根字典和类别字典是副本；更深层的值与已发布状态共享，管理器不会原地修改它们
+        """
+        state = self._observe()
+        return {name: dict(value) if isinstance(value, dict) else value for name, value in state.items()}
     
     def reset_category(self, category: str):
         """重置特定类别的状态"""
@@ -258,44 +545,49 @@ class CommonStateManager:
             }
             
             if category in default_categories:
-                self._state[category] = default_categories[category]
-                self._state["last_updated"] = datetime.now().isoformat()
-                self._save_state_to_file()
+                self._set_category(category, default_categories[category], "reset",
+                                   value=default_categories[category])
+                for list_key in [k for k in self._list_members if k[0] == category]:
+                    del self._list_members[list_key]
+                self._mark_dirty()
     
     def check_integrity(self) -> Dict[str, Any]:
         """检查状态完整性"""
-        with self._lock:
-            issues = []
-            
-            # 检查临时文件完整性
-            temp_files = set(self._state["temp_workspace"].get("temp_files", []))
-            confirmed_files = set(self._state["temp_workspace"].get("confirmed_files", []))
-            if temp_files & confirmed_files:  # 求交集，不应该有交集
-                issues.append("临时文件和确认文件有重复")
-            
-            # 检查上下文链完整性
-            if (self._state["context_chain"].get("chain_integrity_status") == "invalid" and
-                self._state["context_chain"].get("current_analysis") is not None):
-                issues.append("上下文链状态无效但仍有分析数据")
-            
-            # 检查安全状态
-            violation_count = self._state["security"].get("violation_tracker", [])
-            if len(violation_count) > 100:  # 假设超过100个违规需要关注
-                issues.append(f"安全违规数量过多: {len(violation_count)}")
-            
-            return {
-                "status": "ok" if not issues else "warning",
-                "issues": issues,
-                "categories": list(self._state.keys())
-            }
+        state = self._observe()
+        issues = []
+        
+        # 检查临时文件完整性
+        temp_files = set(state["temp_workspace"].get("temp_files", []))
+        confirmed_files = set(state["temp_workspace"].get("confirmed_files", []))
+        if temp_files & confirmed_files:  # 求交集，不应该有交集
+            issues.append("临时文件和确认文件有重复")
+        
+        # 检查上下文链完整性
+        if (state["context_chain"].get("chain_integrity_status") == "invalid" and
+            state["context_chain"].get("current_analysis") is not None):
+            issues.append("上下文链状态无效但仍有分析数据")
+        
+        # 检查安全状态
+        violation_count = state["security"].get("violation_tracker", [])
+        if len(violation_count) > 100:  # 假设超过100个违规需要关注
+            issues.append(f"安全违规数量过多: {len(violation_count)}")
+        
+        return {
+            "status": "ok" if not issues else "warning",
+            "issues": issues,
+            "categories": list(state.keys())
+        }
 
 # 全局共同状态实例
 COMMON_STATE_MANAGER = CommonStateManager()
 
 def initialize_common_state():
-    """初始化共同状态 - 项目启动时调用"""
-    global COMMON_STATE_MANAGER
-    COMMON_STATE_MANAGER = CommonStateManager()
+    """
+    初始化共同状态 - 项目启动时调用
+    
+    复用模块级实例：其他模块已通过 import 持有 COMMON_STATE_MANAGER，
+    另建实例会让两个管理器各自写同一状态文件与日志。
+    """
     print("✅ 共同状态管理器已初始化")
     
     # 验证状态完整性
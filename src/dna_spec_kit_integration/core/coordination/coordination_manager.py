@@ -3,22 +3,35 @@
 负责技能间的协调、工作流编排和数据传递
 """
 import json
+import os
 import uuid
+import heapq
+import queue
+import threading
+import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from .constitution_detector import ConstitutionDetector, ConstitutionInfo
 
 
+# 流式流水线各阶段之间的队列容量（可由工作流上下文 queue_size 覆盖）
+DEFAULT_STREAM_QUEUE_SIZE = 16
+
+# 流式流水线阶段队列的结束标记
+_END_OF_STREAM = object()
+
+
 class CoordinationMode(Enum):
     """协调模式枚举"""
     SEQUENTIAL = "sequential"      # 顺序执行
     PARALLEL = "parallel"          # 并行执行
     PIPELINE = "pipeline"          # 流水线执行
+    STREAMING = "streaming"        # 流式流水线执行（多条数据逐条流过各阶段）
     ADAPTIVE = "adaptive"          # 自适应执行
 
 
@@ -78,17 +91,19 @@ class CoordinationManager:
     负责技能间的协调、工作流编排和数据传递
     """
     
-    def __init__(self, constitution_detector: ConstitutionDetector = None):
+    def __init__(self, constitution_detector: ConstitutionDetector = None, max_workers: int = 4):
         """
         初始化协调管理器
         
         Args:
             constitution_detector: 宪法检测器实例
+            max_workers: 并行模式的最大并发任务数
         """
         self.constitution_detector = constitution_detector or ConstitutionDetector()
         self.active_workflows: Dict[str, CoordinationWorkflow] = {}
         self.skill_registry: Dict[str, Any] = {}
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
         
         # 加载技能注册表
         self._load_skill_registry()
@@ -196,6 +211,8 @@ class CoordinationManager:
                 result = self._execute_parallel_workflow(workflow)
             elif workflow.mode == CoordinationMode.PIPELINE:
                 result = self._execute_pipeline_workflow(workflow)
+            elif workflow.mode == CoordinationMode.STREAMING:
+                result = self._execute_streaming_workflow(workflow)
             else:  # ADAPTIVE
                 result = self._execute_adaptive_workflow(workflow)
             
@@ -256,35 +273,139 @@ class CoordinationManager:
         return results
     
     def _execute_parallel_workflow(self, workflow: CoordinationWorkflow) -> Dict[str, Any]:
-        """并行执行工作流"""
-        # 并行执行没有依赖的任务
-        results = {}
-        completed_tasks = set()
+        """
+        并行执行工作流
         
-        # 获取可以并行执行的任务组
-        task_groups = self._group_parallel_tasks(workflow.tasks)
+        就绪队列调度：任务的全部依赖完成后立即进入就绪堆，按关键路径长度优先派发到线程池，
+        并发数不超过 max_workers。依赖失败或缺失的任务标记为跳过。
+        """
+        tasks = {task.task_id: task for task in workflow.tasks}
+        order = {task_id: index for index, task_id in enumerate(tasks)}
+        priorities = self._critical_path_lengths(workflow.tasks)  # 有环时抛出 ValueError
+        
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in tasks}
+        remaining: Dict[str, int] = {}
+        ready: List[Tuple[int, int, str]] = []
+        ready_at: Dict[str, float] = {}
+        for task in workflow.tasks:
+            deps = set(task.dependencies)
+            for dep in deps & tasks.keys():
+                dependents[dep].append(task.task_id)
+            remaining[task.task_id] = len(deps & tasks.keys())
+            missing = sorted(deps - tasks.keys())
+            if missing:
+                self._skip_task(task, f"Missing dependencies: {', '.join(missing)}")
+        
+        def make_ready(task_id: str):
+            ready_at[task_id] = time.perf_counter()
+            heapq.heappush(ready, (-priorities[task_id], order[task_id], task_id))
+        
+        def skip_dependents(task_id: str):
+            stack = list(dependents[task_id])
+            while stack:
+                dependent = tasks[stack.pop()]
+                if dependent.status == TaskStatus.PENDING:
+                    self._skip_task(dependent, f"Dependency not completed: {task_id}")
+                    stack.extend(dependents[dependent.task_id])
         
-        for group in task_groups:
-            # 并行执行组内任务
-            group_results = self._execute_task_group_parallel(group, results)
-            results.update(group_results)
-            completed_tasks.update([task.task_id for task in group])
-            
-            # 检查是否有依赖完成的任务可以执行
-            remaining_tasks = [task for task in workflow.tasks 
-                             if task.task_id not in completed_tasks and task.status == TaskStatus.PENDING]
+        for task in workflow.tasks:
+            if task.status == TaskStatus.PENDING and remaining.get(task.task_id) == 0:
+                make_ready(task.task_id)
+        
+        # 跳过缺失依赖的任务时连带跳过其下游
+        for task in workflow.tasks:
+            if task.status == TaskStatus.SKIPPED:
+                skip_dependents(task.task_id)
+        
+        results: Dict[str, Any] = {}
+        running = {}
+        while ready or running:
+            while ready and len(running) < self.max_workers:
+                _, _, task_id = heapq.heappop(ready)
+                task = tasks[task_id]
+                task.status = TaskStatus.RUNNING
+                task.metadata['critical_path'] = priorities[task_id]
+                future = self.executor.submit(self._run_scheduled_task, task, dict(results))
+                running[future] = task_id
             
-            if remaining_tasks:
-                # 检查新完成的任务是否解除了某些任务的依赖
-                newly_ready = self._get_ready_tasks(remaining_tasks, results)
-                for task in newly_ready:
-                    task_result = self._execute_single_task(task, results)
-                    if task_result["success"]:
-                        results[task.task_id] = task_result["result"]
-                        completed_tasks.add(task.task_id)
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = tasks[running.pop(future)]
+                try:
+                    task_result, started, finished = future.result()
+                except Exception as e:
+                    task_result, started, finished = {"success": False, "error": str(e)}, None, time.perf_counter()
+                started = started if started is not None else finished
+                task.metadata['queue_wait'] = started - ready_at[task.task_id]
+                task.metadata['run_time'] = finished - started
+                task.end_time = datetime.now()
+                
+                if task_result["success"]:
+                    task.status = TaskStatus.COMPLETED
+                    task.result = task_result["result"]
+                    results[task.task_id] = task_result["result"]
+                    for dependent in dependents[task.task_id]:
+                        remaining[dependent] -= 1
+                        if remaining[dependent] == 0 and tasks[dependent].status == TaskStatus.PENDING:
+                            make_ready(dependent)
+                else:
+                    task.status = TaskStatus.FAILED
+                    task.error = task_result["error"]
+                    skip_dependents(task.task_id)
         
         return results
     
+    def _run_scheduled_task(self, task: CoordinationTask,
+                            context: Dict[str, Any]) -> Tuple[Dict[str, Any], float, float]:
+        """在工作线程中执行任务并记录实际开始与结束时间"""
+        started = time.perf_counter()
+        task.start_time = datetime.now()
+        try:
+            task_result = self._execute_single_task(task, context)
+        except Exception as e:
+            task_result = {"success": False, "error": str(e)}
+        return task_result, started, time.perf_counter()
+    
+    def _skip_task(self, task: CoordinationTask, reason: str):
+        task.status = TaskStatus.SKIPPED
+        task.error = reason
+    
+    def _critical_path_lengths(self, tasks: List[CoordinationTask]) -> Dict[str, int]:
+        """
+        计算每个任务到终点的关键路径长度（路径上的任务数）
+        
+        Raises:
+            ValueError: 依赖图中存在环
+        """
+        task_ids = {task.task_id for task in tasks}
+        dependents: Dict[str, List[str]] = {task.task_id: [] for task in tasks}
+        indegree: Dict[str, int] = {}
+        for task in tasks:
+            deps = {dep for dep in task.dependencies if dep in task_ids}
+            indegree[task.task_id] = len(deps)
+            for dep in deps:
+                dependents[dep].append(task.task_id)
+        
+        # Kahn 拓扑排序
+        topo_order = []
+        queue = [task.task_id for task in tasks if indegree[task.task_id] == 0]
+        while queue:
+            task_id = queue.pop()
+            topo_order.append(task_id)
+            for dependent in dependents[task_id]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        
+        if len(topo_order) != len(task_ids):
+            cyclic = sorted(task_id for task_id, degree in indegree.items() if degree > 0)
+            raise ValueError(f"Dependency cycle detected among tasks: {', '.join(cyclic)}")
+        
+        lengths: Dict[str, int] = {}
+        for task_id in reversed(topo_order):
+            lengths[task_id] = 1 + max((lengths[d] for d in dependents[task_id]), default=0)
+        return lengths
+    
     def _execute_pipeline_workflow(self, workflow: CoordinationWorkflow) -> Dict[str, Any]:
         """流水线执行工作流"""
         # 流水线模式：前一任务的输出作为后一任务的输入
@@ -321,6 +442,113 @@ class CoordinationManager:
         
         return pipeline_data
     
+    def _execute_streaming_workflow(self, workflow: CoordinationWorkflow) -> Dict[str, Any]:
+        """
+        流式流水线执行工作流
+        
+        工作流上下文的 items 为输入数据序列，每个任务是一个阶段，阶段之间用有界队列连接：
+        阶段逐条处理数据并把结果（作为下一阶段的 item）放入下游队列，下游队列满时上游阻塞。
+        单条数据处理失败只丢弃该条数据，不影响其余数据。
+        输入序列本身出错（如生成器抛出异常）时停止读取，已读入的数据照常处理，
+        错误记录在结果的 source_error 中。
+        """
+        stages = workflow.tasks
+        items = workflow.context.get('items', [])
+        queue_size = workflow.context.get('queue_size', DEFAULT_STREAM_QUEUE_SIZE)
+        source_error: List[str] = []
+        if not stages:
+            collected = []
+            try:
+                collected.extend(items)
+            except Exception as e:
+                source_error.append(str(e))
+            return {"items": collected, "failed_items": [],
+                    "source_error": source_error[0] if source_error else None}
+        
+        queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        outputs: List[Tuple[int, Any]] = []
+        failed_items: List[Dict[str, Any]] = []
+        failed_lock = threading.Lock()
+        
+        for task in stages:
+            task.status = TaskStatus.RUNNING
+            task.start_time = datetime.now()
+            task.metadata['stream'] = {
+                "processed": 0, "failed": 0, "throughput": 0.0, "busy_time": 0.0,
+                "queue_depth": 0, "max_queue_depth": 0, "queue_size": queue_size
+            }
+        
+        def feed():
+            try:
+                for index, item in enumerate(items):
+                    queues[0].put((index, item))
+            except Exception as e:
+                source_error.append(str(e))
+            finally:
+                # 输入序列出错时也必须发送结束标记，否则各阶段永久阻塞
+                queues[0].put(_END_OF_STREAM)
+        
+        def run_stage(position: int):
+            task = stages[position]
+            inbox = queues[position]
+            outbox = queues[position + 1] if position + 1 < len(stages) else None
+            metrics = task.metadata['stream']
+            started = time.perf_counter()
+            entry = None
+            try:
+                while True:
+                    entry = inbox.get()
+                    depth = inbox.qsize()
+                    metrics["queue_depth"] = depth
+                    metrics["max_queue_depth"] = max(metrics["max_queue_depth"], depth + 1)
+                    if entry is _END_OF_STREAM:
+                        break
+                    
+                    index, item = entry
+                    input_data = task.input_data.copy()
+                    input_data["item"] = item
+                    item_start = time.perf_counter()
+                    task_result = self._execute_task_with_input(task.skill_name, input_data)
+                    metrics["busy_time"] += time.perf_counter() - item_start
+                    
+                    if task_result["success"]:
+                        metrics["processed"] += 1
+                        if outbox is not None:
+                            outbox.put((index, task_result["result"]))
+                        else:
+                            outputs.append((index, task_result["result"]))
+                    else:
+                        metrics["failed"] += 1
+                        with failed_lock:
+                            failed_items.append({
+                                "index": index, "stage": task.task_id, "error": task_result["error"]
+                            })
+                    elapsed = time.perf_counter() - started
+                    metrics["throughput"] = metrics["processed"] / elapsed if elapsed > 0 else 0.0
+            finally:
+                # 异常退出时继续消费上游数据，避免上游在满队列上永久阻塞
+                while entry is not _END_OF_STREAM:
+                    entry = inbox.get()
+                # 无论本阶段如何结束都通知下游，避免下游永久阻塞
+                if outbox is not None:
+                    outbox.put(_END_OF_STREAM)
+                task.end_time = datetime.now()
+                task.status = TaskStatus.COMPLETED
+        
+        # 每个阶段独占一个线程，避免与并行模式共享的线程池互相阻塞
+        with ThreadPoolExecutor(max_workers=len(stages) + 1) as pool:
+            futures = [pool.submit(feed)] + [pool.submit(run_stage, i) for i in range(len(stages))]
+            for future in futures:
+                future.result()
+        
+        outputs.sort(key=lambda entry: entry[0])
+        failed_items.sort(key=lambda entry: entry["index"])
+        return {
+            "items": [result for _, result in outputs],
+            "failed_items": failed_items,
+            "source_error": source_error[0] if source_error else None
+        }
+    
     def _execute_adaptive_workflow(self, workflow: CoordinationWorkflow) -> Dict[str, Any]:
         """自适应执行工作流"""
         # 根据任务复杂度和依赖关系自动选择执行策略
@@ -391,66 +619,6 @@ class CoordinationManager:
                 return False
         return True
     
-    def _group_parallel_tasks(self, tasks: List[CoordinationTask]) -> List[List[CoordinationTask]]:
-        """将任务分组为可以并行执行的组"""
-        groups = []
-        remaining_tasks = tasks.copy()
-        
-        while remaining_tasks:
-            # 找到当前可以执行的任务（依赖已满足或无依赖）
-            ready_tasks = []
-            for task in remaining_tasks:
-                if self._check_dependencies(task, {}):  # 在开始时，context为空
-                    ready_tasks.append(task)
-            
-            if not ready_tasks:
-                # 如果没有可执行的任务，选择依赖最少的一个
-                ready_tasks = [min(remaining_tasks, key=lambda t: len(t.dependencies))]
-            
-            groups.append(ready_tasks)
-            # 移除已分组的任务
-            for task in ready_tasks:
-                remaining_tasks.remove(task)
-        
-        return groups
-    
-    def _execute_task_group_parallel(self, task_group: List[CoordinationTask], 
-                                   context: Dict[str, Any]) -> Dict[str, Any]:
-        """并行执行任务组"""
-        results = {}
-        
-        # 使用线程池并行执行任务
-        futures = []
-        for task in task_group:
-            future = self.executor.submit(self._execute_single_task, task, context)
-            futures.append((task, future))
-        
-        # 收集结果
-        for task, future in futures:
-            try:
-                result = future.result(timeout=300)  # 5分钟超时
-                if result["success"]:
-                    results[task.task_id] = result["result"]
-                    task.status = TaskStatus.COMPLETED
-                    task.result = result["result"]
-                else:
-                    task.status = TaskStatus.FAILED
-                    task.error = result["error"]
-            except Exception as e:
-                task.status = TaskStatus.FAILED
-                task.error = str(e)
-        
-        return results
-    
-    def _get_ready_tasks(self, tasks: List[CoordinationTask], 
-                        completed_results: Dict[str, Any]) -> List[CoordinationTask]:
-        """获取准备好的任务"""
-        ready_tasks = []
-        for task in tasks:
-            if self._check_dependencies(task, completed_results):
-                ready_tasks.append(task)
-        return ready_tasks
-    
     def _analyze_task_graph(self, tasks: List[CoordinationTask]) -> Dict[str, Any]:
         """分析任务依赖图"""
         graph = {}
@@ -545,7 +713,19 @@ class CoordinationManager:
             "completed_tasks": len([t for t in workflow.tasks if t.status == TaskStatus.COMPLETED]),
             "failed_tasks": len([t for t in workflow.tasks if t.status == TaskStatus.FAILED]),
             "created_at": workflow.created_at.isoformat(),
-            "completed_at": workflow.completed_at.isoformat() if workflow.completed_at else None
+            "completed_at": workflow.completed_at.isoformat() if workflow.completed_at else None,
+            "task_timings": {
+                task.task_id: {
+                    "queue_wait": task.metadata['queue_wait'],
+                    "run_time": task.metadata['run_time'],
+                    "critical_path": task.metadata.get('critical_path')
+                }
+                for task in workflow.tasks if 'run_time' in task.metadata
+            },
+            "stage_metrics": {
+                task.task_id: dict(task.metadata['stream'])
+                for task in workflow.tasks if 'stream' in task.metadata
+            }
         }
     
     def get_workflow(self, workflow_id: str) -> Optional[CoordinationWorkflow]:
@@ -3,9 +3,9 @@ DNASPEC技能管理器
 管理所有DNASPEC技能并与spec.kit适配器集成
 """
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Optional, Any
 from .skill import DNASpecSkill, SkillInfo, SkillResult
-from .matcher import IntelligentMatcher
+from .matcher import IntelligentMatcher, MatchResult
 from .hook import HookSystem
 
 
@@ -223,7 +223,23 @@ class SkillManager:
     def match_skill_intelligently(self, user_request: str) -> Optional[Dict[str, Any]]:
         """智能匹配技能"""
         match_result = self._intelligent_matcher.match_intelligently(user_request)
+        return self._match_result_to_dict(match_result)
+    
+    def match_skills_batch(self, user_requests: Iterable[str], workers: int = 0,
+                           chunk_size: int = 256) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        批量智能匹配技能（按输入顺序流式产出，格式同 match_skill_intelligently）
         
+        Args:
+            user_requests: 用户请求序列
+            workers: 工作进程数，大于1时使用进程池
+            chunk_size: 每个工作进程一次处理的请求数
+        """
+        for match_result in self._intelligent_matcher.match_batch(user_requests, workers, chunk_size):
+            yield self._match_result_to_dict(match_result)
+    
+    @staticmethod
+    def _match_result_to_dict(match_result: Optional[MatchResult]) -> Optional[Dict[str, Any]]:
         if match_result:
             return {
                 'skill_name': match_result.skill_name,
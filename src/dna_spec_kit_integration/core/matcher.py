@@ -2,9 +2,146 @@
 智能匹配系统
 提供用户意图识别和技能自动匹配功能
 """
+import os
 import re
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, replace
+
+# 词元：连续的字母/数字/下划线或中文字符
+_TOKEN_RE = re.compile(r'[\w\u4e00-\u9fff]+')
+
+# 请求类型指示器
+CONTEXT_TYPE_PATTERNS = {
+    'creation': ['创建', '生成', '设计', '构建', 'create', 'generate', 'build', '设计'],
+    'decomposition': ['分解', '拆分', '细化', '任务分析', 'task', '分解任务'],
+    'validation': ['检查', '验证', '核验', '一致性', 'validate', '检查接口'],
+    'generation': ['生成', '产生', 'create', 'generate', '生成约束'],
+    'optimization': ['优化', '重构', '改进', 'optimize', 'refactor', '模块化'],
+    'analysis': ['分析', '评估', '审查', 'analyze', 'evaluate', '分析系统']
+}
+
+# 领域指示器
+CONTEXT_DOMAIN_PATTERNS = {
+    'ai': ['智能', 'ai', 'agent', '智能体', '创建智能体'],
+    'software': ['软件', '程序', '代码', 'software', '开发'],
+    'system': ['系统', '架构', 'system', 'architecture', '系统设计'],
+    'project': ['项目', '工程', 'project', '任务'],
+    'data': ['数据', 'database', '信息', 'data', '接口']
+}
+
+# 技能上下文相关性
+SKILL_CONTEXT_RELEVANCE = {
+    'dnaspec-architect': ['system', 'architecture', 'design', 'creation', '分析'],
+    'dnaspec-agent-creator': ['ai', 'creation', 'agent', '智能体'],
+    'dnaspec-task-decomposer': ['decomposition', 'task', 'project', '分析'],
+    'dnaspec-constraint-generator': ['generation', 'validation', '生成'],
+    'dnaspec-dapi-checker': ['validation', 'data', 'system', '检查'],
+    'dnaspec-modulizer': ['optimization', 'analysis', 'system', '优化']
+}
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """把文本（小写后）切分为词元集合"""
+    return frozenset(_TOKEN_RE.findall(text.lower()))
+
+
+class KeywordAutomaton:
+    """
+    Aho–Corasick 多模式匹配自动机
+
+    一次扫描文本即可找出所有出现过的模式，代价与模式数量无关
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        Args:
+            patterns: 模式串（区分大小写，调用方负责统一小写）
+        """
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        self._always: List[int] = []  # 空模式总是命中
+
+        for pattern in patterns:
+            self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern: str):
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        if not pattern:
+            self._always.append(pattern_id)
+            return
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(pattern_id)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                # 合并失败链上的输出，匹配时无需再沿链回溯
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> Set[int]:
+        """
+        查找文本中出现的模式
+
+        Returns:
+            出现过的模式ID集合
+        """
+        found = set(self._always)
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+
+# 批量匹配时进程池中每个工作进程持有的匹配器
+_worker_matcher = None
+
+
+def _init_batch_worker(matcher_class, state: Dict[str, Any]):
+    global _worker_matcher
+    _worker_matcher = matcher_class()
+    _worker_matcher.match_threshold = state['match_threshold']
+    for skill_name, keywords in state['skill_keywords'].items():
+        _worker_matcher.register_skill_keywords(skill_name, keywords)
+    for skill_name, patterns in state['command_patterns'].items():
+        _worker_matcher.register_command_pattern(skill_name, patterns)
+
+
+def _match_chunk_worker(requests: List[str]) -> List[Optional['MatchResult']]:
+    return list(_worker_matcher._match_chunk(requests))
 
 
 @dataclass
@@ -24,6 +161,15 @@ class IntelligentMatcher:
         self.match_threshold = 0.3  # 匹配阈值
         self._skill_keywords = {}   # 技能关键词映射
         self._command_patterns = {} # 命令模式映射
+        self._keyword_tokens: Dict[str, List[FrozenSet[str]]] = {}  # 注册时预先切分的关键词词元
+        self._context_skills: Dict[str, FrozenSet[str]] = {}  # 有上下文相关性的技能
+
+        # 以下索引在注册后首次匹配时重建
+        self._index_dirty = False
+        self._skill_order: Dict[str, int] = {}
+        self._automaton: Optional[KeywordAutomaton] = None
+        self._pattern_postings: List[List[Tuple[str, int]]] = []   # 模式ID -> [(技能, 关键词序号)]
+        self._token_postings: Dict[str, List[Tuple[str, int]]] = {}  # 词元 -> [(技能, 关键词序号)]
     
     def register_skill_keywords(self, skill_name: str, keywords: List[str]) -> bool:
         """注册技能关键词"""
@@ -31,8 +177,38 @@ class IntelligentMatcher:
             return False
         
         self._skill_keywords[skill_name] = keywords
+        self._keyword_tokens[skill_name] = [tokenize(keyword) for keyword in keywords]
+        relevance = self._get_skill_context_relevance(skill_name)
+        if relevance:
+            self._context_skills[skill_name] = frozenset(relevance)
+        self._index_dirty = True
         return True
     
+    def _ensure_index(self):
+        """按注册的关键词重建自动机与倒排索引"""
+        if not self._index_dirty and self._automaton is not None:
+            return
+        
+        self._skill_order = {name: order for order, name in enumerate(self._skill_keywords)}
+        pattern_ids: Dict[str, int] = {}
+        self._pattern_postings = []
+        self._token_postings = {}
+        
+        for skill_name, keywords in self._skill_keywords.items():
+            token_sets = self._keyword_tokens[skill_name]
+            for position, keyword in enumerate(keywords):
+                pattern = keyword.lower()
+                pattern_id = pattern_ids.get(pattern)
+                if pattern_id is None:
+                    pattern_id = pattern_ids[pattern] = len(self._pattern_postings)
+                    self._pattern_postings.append([])
+                self._pattern_postings[pattern_id].append((skill_name, position))
+                for token in token_sets[position]:
+                    self._token_postings.setdefault(token, []).append((skill_name, position))
+        
+        self._automaton = KeywordAutomaton(pattern_ids)
+        self._index_dirty = False
+    
     def register_command_pattern(self, skill_name: str, patterns: List[str]) -> bool:
         """注册命令模式"""
         if not skill_name or not patterns:
@@ -43,7 +219,6 @@ class IntelligentMatcher:
     
     def match_intelligently(self, user_request: str) -> Optional[MatchResult]:
         """智能匹配用户请求到相应技能"""
-        import time
         start_time = time.time()
         
         if not user_request:
@@ -74,6 +249,86 @@ class IntelligentMatcher:
         
         return best_match
     
+    def match_batch(self, user_requests: Iterable[str], workers: int = 0,
+                    chunk_size: int = 256) -> Iterator[Optional[MatchResult]]:
+        """
+        批量匹配用户请求
+        
+        按输入顺序逐个产出结果（与 match_intelligently 相同），不会一次性读入全部请求。
+        批次内重复的请求只计算一次。
+        
+        Args:
+            user_requests: 用户请求序列（可以是生成器）
+            workers: 工作进程数，大于1时把请求分块交给进程池
+            chunk_size: 每块的请求数
+            
+        Yields:
+            每个请求的匹配结果（未匹配为None）
+        """
+        if workers and workers > 1:
+            yield from self._match_batch_parallel(user_requests, workers, chunk_size)
+        else:
+            yield from self._match_chunk(user_requests)
+    
+    def _match_chunk(self, user_requests: Iterable[str],
+                     memo_size: int = 4096) -> Iterator[Optional[MatchResult]]:
+        """顺序匹配，按请求文本复用最近的结果"""
+        self._ensure_index()
+        memo: "OrderedDict[str, Optional[MatchResult]]" = OrderedDict()
+        for user_request in user_requests:
+            if user_request in memo:
+                memo.move_to_end(user_request)
+                cached = memo[user_request]
+                # 返回副本，避免调用方修改结果时互相影响
+                yield replace(cached, matched_keywords=list(cached.matched_keywords)) if cached else None
+                continue
+            
+            result = self.match_intelligently(user_request)
+            memo[user_request] = result
+            if len(memo) > memo_size:
+                memo.popitem(last=False)
+            yield replace(result, matched_keywords=list(result.matched_keywords)) if result else None
+    
+    def _match_batch_parallel(self, user_requests: Iterable[str], workers: int,
+                              chunk_size: int) -> Iterator[Optional[MatchResult]]:
+        """
+        分块提交到进程池，最多同时处理 2*workers 块并按顺序产出
+        
+        进程池无法创建或中途失效（工作进程崩溃等）时，从第一个尚未产出的请求起退回顺序匹配。
+        """
+        state = {
+            'match_threshold': self.match_threshold,
+            'skill_keywords': self._skill_keywords,
+            'command_patterns': self._command_patterns
+        }
+        workers = min(workers, os.cpu_count() or 1)
+        requests = iter(user_requests)
+        pending = deque()  # (请求块, future)
+        chunk: List[str] = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                     initargs=(type(self), state)) as pool:
+                for user_request in requests:
+                    chunk.append(user_request)
+                    if len(chunk) >= chunk_size:
+                        pending.append((chunk, pool.submit(_match_chunk_worker, chunk)))
+                        chunk = []
+                        if len(pending) >= workers * 2:
+                            results = pending[0][1].result()
+                            pending.popleft()
+                            yield from results
+                if chunk:
+                    pending.append((chunk, pool.submit(_match_chunk_worker, chunk)))
+                    chunk = []
+                while pending:
+                    results = pending[0][1].result()
+                    pending.popleft()
+                    yield from results
+        except (BrokenProcessPool, OSError, NotImplementedError, RuntimeError):
+            # 不支持多进程或进程池失效：未完成的块、未提交的请求和剩余输入按原顺序顺序匹配
+            remaining = chain(chain.from_iterable(block for block, _ in pending), chunk, requests)
+            yield from self._match_chunk(remaining)
+    
     def _match_spec_kit_commands(self, request: str) -> Optional[MatchResult]:
         """匹配spec.kit命令模式"""
         if not request.startswith("/speckit.dnaspec."):
@@ -97,75 +352,82 @@ class IntelligentMatcher:
         )
     
     def _find_keyword_matches(self, request: str) -> List[Dict[str, Any]]:
-        """查找关键词匹配"""
-        request_lower = request.lower()
-        matches = []
+        """查找关键词匹配（自动机一次扫描所有关键词）"""
+        self._ensure_index()
+        hits: Dict[str, List[int]] = {}
+        for pattern_id in self._automaton.find(request.lower()):
+            for skill_name, position in self._pattern_postings[pattern_id]:
+                hits.setdefault(skill_name, []).append(position)
         
-        for skill_name, keywords in self._skill_keywords.items():
+        matches = []
+        for skill_name in sorted(hits, key=self._skill_order.__getitem__):
+            keywords = self._skill_keywords[skill_name]
             score = 0.0
             matched_keywords = []
             
-            for keyword in keywords:
-                if keyword.lower() in request_lower:
-                    matched_keywords.append(keyword)
-                    score += 1.0 / len(keywords)
+            for position in sorted(hits[skill_name]):
+                matched_keywords.append(keywords[position])
+                score += 1.0 / len(keywords)
             
-            if score > 0:
-                matches.append({
-                    'skill_name': skill_name,
-                    'score': min(score, 1.0),
-                    'type': 'keyword',
-                    'matched_keywords': matched_keywords
-                })
+            matches.append({
+                'skill_name': skill_name,
+                'score': min(score, 1.0),
+                'type': 'keyword',
+                'matched_keywords': matched_keywords
+            })
         
         return matches
     
     def _find_semantic_matches(self, request: str) -> List[Dict[str, Any]]:
-        """查找语义匹配"""
-        request_lower = request.lower()
-        matches = []
+        """查找语义匹配（通过词元倒排索引只访问有共同词元的关键词）"""
+        self._ensure_index()
+        request_words = tokenize(request)
         
-        # 提取请求中的关键词
-        request_words = set(re.findall(r'[\w\u4e00-\u9fff]+', request_lower))
+        # (技能, 关键词序号) -> 共同词元
+        common: Dict[Tuple[str, int], List[str]] = {}
+        for word in request_words:
+            for posting in self._token_postings.get(word, ()):
+                common.setdefault(posting, []).append(word)
         
-        for skill_name, keywords in self._skill_keywords.items():
+        per_skill: Dict[str, List[int]] = {}
+        for skill_name, position in common:
+            per_skill.setdefault(skill_name, []).append(position)
+        
+        matches = []
+        for skill_name in sorted(per_skill, key=self._skill_order.__getitem__):
+            token_sets = self._keyword_tokens[skill_name]
             score = 0.0
             matched_words = []
             
             # 计算语义相似度
-            for keyword in keywords:
-                keyword_words = set(re.findall(r'[\w\u4e00-\u9fff]+', keyword.lower()))
-                common_words = len(request_words.intersection(keyword_words))
-                
-                if common_words > 0:
-                    semantic_score = common_words / max(len(keyword_words), 1)
-                    score += semantic_score
-                    matched_words.extend(list(request_words.intersection(keyword_words)))
+            for position in sorted(per_skill[skill_name]):
+                words = common[(skill_name, position)]
+                score += len(words) / max(len(token_sets[position]), 1)
+                matched_words.extend(words)
             
-            if score > 0:
-                matches.append({
-                    'skill_name': skill_name,
-                    'score': min(score, 1.0),
-                    'type': 'semantic',
-                    'matched_words': matched_words
-                })
+            matches.append({
+                'skill_name': skill_name,
+                'score': min(score, 1.0),
+                'type': 'semantic',
+                'matched_words': matched_words
+            })
         
         return matches
     
     def _find_context_matches(self, request: str) -> List[Dict[str, Any]]:
         """查找上下文匹配"""
         matches = []
-        request_lower = request.lower()
         
         # 上下文指示器
         context_indicators = self._extract_context_indicators(request)
+        if not context_indicators:
+            return matches
         
-        for skill_name in self._skill_keywords.keys():
+        for skill_name, skill_relevance in self._context_skills.items():
             score = 0.0
             matched_contexts = []
             
             # 检查技能相关性
-            skill_relevance = self._get_skill_context_relevance(skill_name)
             for indicator in context_indicators:
                 if indicator in skill_relevance:
                     matched_contexts.append(indicator)
@@ -186,51 +448,18 @@ class IntelligentMatcher:
         indicators = []
         request_lower = request.lower()
         
-        # 请求类型指示器
-        type_patterns = {
-            'creation': ['创建', '生成', '设计', '构建', 'create', 'generate', 'build', '设计'],
-            'decomposition': ['分解', '拆分', '细化', '任务分析', 'task', '分解任务'],
-            'validation': ['检查', '验证', '核验', '一致性', 'validate', '检查接口'],
-            'generation': ['生成', '产生', 'create', 'generate', '生成约束'],
-            'optimization': ['优化', '重构', '改进', 'optimize', 'refactor', '模块化'],
-            'analysis': ['分析', '评估', '审查', 'analyze', 'evaluate', '分析系统']
-        }
-        
-        for type_name, patterns in type_patterns.items():
-            for pattern in patterns:
-                if pattern in request_lower:
-                    indicators.append(type_name)
-                    break
-        
-        # 领域指示器
-        domain_patterns = {
-            'ai': ['智能', 'ai', 'agent', '智能体', '创建智能体'],
-            'software': ['软件', '程序', '代码', 'software', '开发'],
-            'system': ['系统', '架构', 'system', 'architecture', '系统设计'],
-            'project': ['项目', '工程', 'project', '任务'],
-            'data': ['数据', 'database', '信息', 'data', '接口']
-        }
-        
-        for domain, patterns in domain_patterns.items():
-            for pattern in patterns:
-                if pattern in request_lower:
-                    indicators.append(domain)
-                    break
+        for patterns_by_name in (CONTEXT_TYPE_PATTERNS, CONTEXT_DOMAIN_PATTERNS):
+            for name, patterns in patterns_by_name.items():
+                for pattern in patterns:
+                    if pattern in request_lower:
+                        indicators.append(name)
+                        break
         
         return list(set(indicators))  # 去重
     
     def _get_skill_context_relevance(self, skill_name: str) -> List[str]:
         """获取技能上下文相关性"""
-        context_relevance = {
-            'dnaspec-architect': ['system', 'architecture', 'design', 'creation', '分析'],
-            'dnaspec-agent-creator': ['ai', 'creation', 'agent', '智能体'],
-            'dnaspec-task-decomposer': ['decomposition', 'task', 'project', '分析'],
-            'dnaspec-constraint-generator': ['generation', 'validation', '生成'],
-            'dnaspec-dapi-checker': ['validation', 'data', 'system', '检查'],
-            'dnaspec-modulizer': ['optimization', 'analysis', 'system', '优化']
-        }
-        
-        return context_relevance.get(skill_name, [])
+        return SKILL_CONTEXT_RELEVANCE.get(skill_name, [])
     
     def _get_best_match(self, request: str, keyword_matches: List, 
                        semantic_matches: List, context_matches: List) -> Optional[MatchResult]:
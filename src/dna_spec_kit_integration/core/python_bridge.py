@@ -2,12 +2,109 @@
 Enhanced Python桥接器模块
 负责调用Python实现的DNASPEC技能
 扩展了模块查找功能以支持多路径查找
+
+技能入口只在首次调用时解析，结果保存在进程级注册表中（可选持久化为清单文件），
+之后每次调用只需一次字典查找。
 """
+import hashlib
 import importlib
+import importlib.util
+import json
+import logging
+import os
 import sys
-from typing import Dict, Any, Optional
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# CLI默认使用的入口清单位置
+DEFAULT_MANIFEST_PATH = Path.home() / '.dnaspec' / 'python_bridge_manifest.json'
+
+MANIFEST_VERSION = 1
+
+# 映射到Claude技能中支持的工具名称
+TOOL_NAME_MAPPING = {
+    'context-analysis': 'context-analyzer',
+    'context-analyzer': 'context-analyzer',
+    'context-optimization': 'context-optimizer',
+    'context-optimizer': 'context-optimizer',
+    'cognitive-template': 'cognitive-templater',
+    'cognitive-templater': 'cognitive-templater',
+    'agent-creator': 'agent-creator',
+    'task-decomposer': 'task-decomposer',
+    'constraint-generator': 'constraint-generator',
+    'architect': 'architect',
+    'simple-architect': 'architect',
+    'system-architect': 'architect',
+    'api-checker': 'context-analyzer',  # 使用上下文分析作为基础
+    'git-operations': 'context-analyzer',  # 使用上下文分析作为基础
+    'temp-workspace': 'context-analyzer',  # 使用上下文分析作为基础
+    'liveness': 'context-analyzer',  # 使用上下文分析作为基础
+    'dnaspec-init': 'dnaspec-init',
+    'temp-workspace-skill': 'context-analyzer'  # 使用上下文分析作为基础
+}
+
+
+@dataclass
+class ResolvedEntry:
+    """已解析的技能入口"""
+    module_path: str
+    module: Any
+    execute: Callable[[Dict[str, Any]], Any]
+    source_file: Optional[str] = None
+    file_based: bool = False
+    mtime: Optional[float] = None
+
+    def to_manifest(self) -> Dict[str, Any]:
+        return {
+            'module_path': self.module_path,
+            'source_file': self.source_file,
+            'file_based': self.file_based
+        }
+
+
+class SkillResolutionError(ImportError):
+    """所有查找路径都无法导入技能模块"""
+
+
+def _source_mtime(source_file: Optional[str]) -> Optional[float]:
+    if not source_file:
+        return None
+    try:
+        return os.stat(source_file).st_mtime
+    except OSError:
+        return None
+
+
+def _loaded_files_under(directory: str) -> List[str]:
+    """已加载模块中源文件位于 directory 下的全部文件"""
+    prefix = os.path.join(os.path.abspath(directory), '')
+    files = set()
+    for module in list(sys.modules.values()):
+        module_file = getattr(module, '__file__', None)
+        if module_file and os.path.abspath(module_file).startswith(prefix):
+            files.add(os.path.abspath(module_file))
+    return sorted(files)
+
+
+def _files_fingerprint(files: List[str]) -> str:
+    digest = hashlib.sha1()
+    for path in files:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}\n".encode('utf-8'))
+        except OSError:
+            digest.update(f"{path}:missing\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _project_root() -> str:
+    current_file_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    return os.path.dirname(current_file_dir)
+
 
 class PythonBridge:
     """
@@ -15,15 +112,268 @@ class PythonBridge:
     负责调用Python实现的DNASPEC技能
     """
 
-    def __init__(self, skills_base_path: Optional[str] = None):
+    # 进程级注册表：(skills_base_path, 模式, 技能名称) -> 已解析入口
+    _shared_registry: Dict[Tuple[str, str, str], ResolvedEntry] = {}
+    _registry_lock = threading.RLock()
+
+    def __init__(self, skills_base_path: Optional[str] = None,
+                 manifest_path: Optional[str] = None,
+                 auto_reload: bool = False):
         """
         初始化Python桥接器
 
         Args:
             skills_base_path: 技能模块的基础路径
+            manifest_path: 入口清单文件（为None时不持久化）
+            auto_reload: 开发模式，源文件修改时间变化后重新加载模块
         """
         self.skills_base_path = skills_base_path or "dna_spec_kit_integration.skills"
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self.auto_reload = auto_reload
         self._imported_modules = {}
+        # 入口源目录 -> (sys.modules 大小, 该目录下已加载的源文件)
+        self._implementation_files: Dict[str, Tuple[int, List[str]]] = {}
+        self._manifest: Dict[str, Dict[str, Any]] = self._load_manifest()
+
+    # ------------------------------------------------------------------
+    # 清单
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        if not self.manifest_path:
+            return {}
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if data.get('version') != MANIFEST_VERSION or data.get('skills_base_path') != self.skills_base_path:
+            return {}
+        return data.get('entries', {})
+
+    def _save_manifest(self):
+        if not self.manifest_path:
+            return
+        try:
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.manifest_path.with_name(self.manifest_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': MANIFEST_VERSION,
+                    'skills_base_path': self.skills_base_path,
+                    'entries': self._manifest
+                }, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.debug("无法写入技能入口清单 %s: %s", self.manifest_path, e)
+
+    # ------------------------------------------------------------------
+    # 解析
+    # ------------------------------------------------------------------
+
+    def _import_entry(self, module_path: str, source_file: Optional[str] = None,
+                      file_based: bool = False) -> ResolvedEntry:
+        if file_based:
+            spec = importlib.util.spec_from_file_location(module_path, source_file)
+            if not spec or not spec.loader:
+                raise ImportError(f"cannot load {source_file}")
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        else:
+            module = importlib.import_module(module_path)
+            source_file = getattr(module, '__file__', None)
+
+        self._imported_modules[module_path] = module
+        return ResolvedEntry(
+            module_path=module_path,
+            module=module,
+            execute=getattr(module, 'execute', None),
+            source_file=source_file,
+            file_based=file_based,
+            mtime=_source_mtime(source_file)
+        )
+
+    def _candidate_paths(self, skill_name: str, json_params: bool) -> List[str]:
+        # 将技能名称规范化为模块名称，例如 'dnaspec-architect' -> 'architect'
+        module_name = skill_name.replace('dnaspec-', '')
+        if json_params:
+            return [
+                f"{self.skills_base_path}.{module_name}",  # Standard path
+                f"dna_context_engineering.{module_name}",  # Context engineering path
+                f"{module_name}"  # Direct path
+            ]
+        # 按优先级排序：Claude技能路径优先，其次标准路径、上下文工程路径、模块名本身
+        return [
+            "claude_skills.claude_skill",
+            "claude_skills.main",
+            f"{self.skills_base_path}.{module_name}",
+            f"dna_context_engineering.{module_name}",
+            f"{module_name}"
+        ]
+
+    def _resolve_uncached(self, skill_name: str, json_params: bool) -> ResolvedEntry:
+        error_messages = []
+        for module_path in self._candidate_paths(skill_name, json_params):
+            try:
+                return self._import_entry(module_path)
+            except ImportError as e:
+                error_messages.append(f"{module_path}: {str(e)}")
+
+        if not json_params:
+            # 标准路径都没有找到模块时，尝试项目根目录下的 claude_skills 目录
+            project_root = _project_root()
+            if project_root not in sys.path:
+                sys.path.insert(0, project_root)
+
+            claude_skills_dir = os.path.join(project_root, "claude_skills")
+            if os.path.exists(claude_skills_dir):
+                if claude_skills_dir not in sys.path:
+                    sys.path.insert(0, claude_skills_dir)
+                try:
+                    return self._import_entry("claude_skill")
+                except ImportError as e:
+                    error_messages.append(f"claude_skill (from claude_skills): {str(e)}")
+
+                main_path = os.path.join(claude_skills_dir, "main.py")
+                if os.path.exists(main_path):
+                    try:
+                        return self._import_entry("main_skill", main_path, file_based=True)
+                    except Exception as e:
+                        error_messages.append(f"main.py import: {str(e)}")
+            else:
+                error_messages.append("claude_skills directory does not exist")
+
+        raise SkillResolutionError(
+            'Failed to import skill module from any location:\n' + '\n'.join(error_messages)
+        )
+
+    def _resolve_from_manifest(self, manifest_key: str) -> Optional[ResolvedEntry]:
+        recorded = self._manifest.get(manifest_key)
+        if not recorded:
+            return None
+        source_file = recorded.get('source_file')
+        if source_file and not os.path.exists(source_file):
+            return None
+        try:
+            return self._import_entry(recorded['module_path'], source_file, recorded.get('file_based', False))
+        except Exception as e:
+            logger.debug("清单入口失效 %s: %s", manifest_key, e)
+            return None
+
+    def resolve(self, skill_name: str, json_params: bool = False) -> ResolvedEntry:
+        """
+        解析技能入口（进程内只解析一次）
+
+        Args:
+            skill_name: 技能名称
+            json_params: 是否为JSON参数调用（查找路径不同）
+
+        Returns:
+            已解析入口
+
+        Raises:
+            SkillResolutionError: 找不到技能模块
+        """
+        mode = 'json' if json_params else 'text'
+        key = (self.skills_base_path, mode, skill_name)
+        entry = self._shared_registry.get(key)
+        if entry is not None:
+            if self.auto_reload:
+                entry = self._reload_if_changed(key, entry)
+            return entry
+
+        with self._registry_lock:
+            entry = self._shared_registry.get(key)
+            if entry is not None:
+                return entry
+
+            manifest_key = f"{mode}:{skill_name}"
+            entry = self._resolve_from_manifest(manifest_key)
+            if entry is None:
+                entry = self._resolve_uncached(skill_name, json_params)
+                self._manifest[manifest_key] = entry.to_manifest()
+                self._save_manifest()
+            self._shared_registry[key] = entry
+            return entry
+
+    def _reload_if_changed(self, key: Tuple[str, str, str], entry: ResolvedEntry) -> ResolvedEntry:
+        mtime = _source_mtime(entry.source_file)
+        if mtime is None or mtime == entry.mtime:
+            return entry
+
+        with self._registry_lock:
+            if entry.file_based:
+                reloaded = self._import_entry(entry.module_path, entry.source_file, file_based=True)
+            else:
+                module = importlib.reload(entry.module)
+                reloaded = ResolvedEntry(
+                    module_path=entry.module_path,
+                    module=module,
+                    execute=getattr(module, 'execute', None),
+                    source_file=entry.source_file,
+                    mtime=mtime
+                )
+            logger.debug("技能模块已重新加载: %s", entry.module_path)
+            # 共享同一模块的其他入口一并更新
+            for other_key, other in list(self._shared_registry.items()):
+                if other.module is entry.module:
+                    self._shared_registry[other_key] = reloaded
+            return reloaded
+
+    @classmethod
+    def clear_registry(cls):
+        """清空进程级入口注册表"""
+        with cls._registry_lock:
+            cls._shared_registry.clear()
+
+    def is_skill_available(self, skill_name: str) -> bool:
+        """
+        检查技能模块是否可以解析
+
+        Args:
+            skill_name: 技能名称
+
+        Returns:
+            技能是否可用
+        """
+        try:
+            return self.resolve(skill_name).execute is not None
+        except SkillResolutionError:
+            return False
+
+    def skill_version(self, skill_name: str) -> Optional[str]:
+        """
+        技能实现的版本标识：模块路径、模块 __version__ 与实现源文件指纹
+
+        入口可能只是薄包装（如 claude_skill.py 从 main.py 导入 execute），
+        因此指纹覆盖入口源文件所在目录下所有已加载模块的修改时间和大小。
+
+        Args:
+            skill_name: 技能名称
+
+        Returns:
+            版本标识，技能无法解析时返回None
+        """
+        try:
+            entry = self.resolve(skill_name)
+        except SkillResolutionError:
+            return None
+        version = getattr(entry.module, '__version__', None)
+        if not entry.source_file:
+            return f"{entry.module_path}:{version}:{entry.mtime}"
+        source_dir = os.path.dirname(os.path.abspath(entry.source_file))
+        cached = self._implementation_files.get(source_dir)
+        if cached is None or cached[0] != len(sys.modules):
+            files = _loaded_files_under(source_dir)
+            if os.path.abspath(entry.source_file) not in files:
+                files = sorted(files + [os.path.abspath(entry.source_file)])
+            cached = (len(sys.modules), files)
+            self._implementation_files[source_dir] = cached
+        return f"{entry.module_path}:{version}:{_files_fingerprint(cached[1])}"
+
+    # ------------------------------------------------------------------
+    # 执行
+    # ------------------------------------------------------------------
 
     def execute_skill(self, skill_name: str, params: str, original_skill_name: str = None) -> Dict[str, Any]:
         """
@@ -38,166 +388,42 @@ class PythonBridge:
             执行结果字典
         """
         try:
-            # Import required modules at function start to avoid local variable issues
-            import importlib
-            import importlib.util
-            import sys
-            import os
-
-            # 首先尝试直接导入claude_skills模块，这是最常见的情况
-            module = None
-            full_module_path = None
-            
-            # 尝试多种导入方式，确保能找到已安装的包
-            # 方式1：直接导入
-            try:
-                import claude_skills.claude_skill as claude_module
-                module = claude_module
-                full_module_path = "claude_skills.claude_skill"
-                self._imported_modules[full_module_path] = module
-                print(f"Successfully imported: {full_module_path}")  # 调试信息
-            except ImportError as e:
-                print(f"Failed to import claude_skills.claude_skill: {e}")  # 调试信息
-                # 方式2：使用importlib导入
-                try:
-                    module = importlib.import_module("claude_skills.claude_skill")
-                    full_module_path = "claude_skills.claude_skill"
-                    self._imported_modules[full_module_path] = module
-                    print(f"Successfully imported via importlib: {full_module_path}")  # 调试信息
-                except ImportError as e2:
-                    print(f"Failed to import via importlib: {e2}")  # 调试信息
-                    # 如果直接导入失败，尝试其他路径
-                    # 将技能名称规范化为模块名称
-                    # 例如 'dnaspec-architect' -> 'architect'
-                    module_name = skill_name.replace('dnaspec-', '')
-
-                    # 定义要尝试的模块路径列表
-                    # 按优先级排序：
-                    # 1. Claude技能路径 (claude_skills) - 优先使用Claude标准
-                    # 2. 标准路径 (dna_spec_kit_integration.skills.{module_name})
-                    # 3. 上下文工程路径 (dna_context_engineering.{module_name})
-                    # 4. 模块名本身 (如果模块名已是完整路径)
-                    module_paths_to_try = [
-                        f"claude_skills.claude_skill",  # Claude skills path - HIGHEST PRIORITY
-                        f"claude_skills.main",  # Claude main module
-                        f"{self.skills_base_path}.{module_name}",  # Standard path: dna_spec_kit_integration.skills.{module_name}
-                        f"dna_context_engineering.{module_name}",  # Context engineering path
-                        f"{module_name}"  # Module name directly (could be full path)
-                    ]
-
-                    # 尝试导入技能模块 - 按顺序尝试不同路径
-                    error_messages = []
-
-                    for module_path in module_paths_to_try:
-                        try:
-                            module = importlib.import_module(module_path)
-                            # 更新模块路径以使用找到的路径
-                            full_module_path = module_path  # Set the correct path that worked
-                            self._imported_modules[module_path] = module  # Cache the successful import
-                            print(f"Successfully imported via importlib: {full_module_path}")  # 调试信息
-                            break  # Stop if successful
-                        except ImportError as e:
-                            error_messages.append(f"{module_path}: {str(e)}")
-                            continue  # Try next path
-
-                    # 如果标准路径都没有找到模块，尝试在项目根目录下查找
-                    if module is None:
-                        # 获取项目根目录
-                        current_file_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-                        project_root = os.path.dirname(current_file_dir)  # Go up one more level to project root
-                        if project_root not in sys.path:
-                            sys.path.insert(0, project_root)
-
-                        # 尝试直接从 claude_skills 目录导入
-                        claude_skills_dir = os.path.join(project_root, "claude_skills")
-                        if os.path.exists(claude_skills_dir):
-                            if claude_skills_dir not in sys.path:
-                                sys.path.insert(0, claude_skills_dir)
-
-                            try:
-                                # 尝试导入统一技能模块
-                                module = importlib.import_module("claude_skill")
-                                full_module_path = "claude_skill"
-                                self._imported_modules[full_module_path] = module
-                                print(f"Found unified skill module: {full_module_path}")
-                            except ImportError as e:
-                                error_messages.append(f"claude_skill (from claude_skills): {str(e)}")
-
-                                # 最后尝试导入main模块
-                                try:
-                                    main_path = os.path.join(claude_skills_dir, "main.py")
-                                    if os.path.exists(main_path):
-                                        spec = importlib.util.spec_from_file_location("main_skill", main_path)
-                                        if spec and spec.loader:
-                                            module = importlib.util.module_from_spec(spec)
-                                            spec.loader.exec_module(module)
-                                            full_module_path = "main_skill"
-                                            self._imported_modules[full_module_path] = module
-                                            print(f"Imported from main.py: {full_module_path}")
-                                except Exception as e2:
-                                    error_messages.append(f"main.py import: {str(e2)}")
-                        else:
-                            error_messages.append("claude_skills directory does not exist")
-
-                    # 如果所有路径都失败，返回错误
-                    if module is None:
-                        return {
-                            'success': False,
-                            'error': f'Failed to import skill module from any location:\n' + '\n'.join(error_messages),
-                            'skill': skill_name
-                        }
+            entry = self.resolve(skill_name)
 
             # 验证模块是否包含execute函数
-            if not hasattr(module, 'execute'):
+            if entry.execute is None:
                 return {
                     'success': False,
-                    'error': f'Skill module {full_module_path} does not have execute function',
+                    'error': f'Skill module {entry.module_path} does not have execute function',
                     'skill': skill_name
                 }
 
-            # 准备参数字典
             # 使用原始技能名称来正确映射Claude工具名称
             actual_skill_name = original_skill_name if original_skill_name else skill_name
             skill_for_claude = actual_skill_name.replace('dnaspec-', '').replace('_', '-')
-            # 映射到Claude技能中支持的工具名称
-            tool_name_mapping = {
-                'context-analysis': 'context-analyzer',
-                'context-analyzer': 'context-analyzer', 
-                'context-optimization': 'context-optimizer',
-                'context-optimizer': 'context-optimizer',
-                'cognitive-template': 'cognitive-templater',
-                'cognitive-templater': 'cognitive-templater',
-                'agent-creator': 'agent-creator',
-                'task-decomposer': 'task-decomposer',
-                'constraint-generator': 'constraint-generator',
-                'architect': 'architect',
-                'simple-architect': 'architect',
-                'system-architect': 'architect',
-                'api-checker': 'context-analyzer',  # 使用上下文分析作为基础
-                'git-operations': 'context-analyzer',  # 使用上下文分析作为基础
-                'temp-workspace': 'context-analyzer',  # 使用上下文分析作为基础
-                'liveness': 'context-analyzer',  # 使用上下文分析作为基础
-                'dnaspec-init': 'dnaspec-init',
-                'temp-workspace-skill': 'context-analyzer'  # 使用上下文分析作为基础
-            }
-            
-            claude_tool_name = tool_name_mapping.get(skill_for_claude, skill_for_claude)
-            
+            claude_tool_name = TOOL_NAME_MAPPING.get(skill_for_claude, skill_for_claude)
+
             args = {
                 'inputs': [{'input': params, 'skill': actual_skill_name}],
                 'tool_name': claude_tool_name
             }
 
             # 执行技能
-            result = module.execute(args)
+            result = entry.execute(args)
 
             return {
                 'success': True,
                 'result': result,
                 'skill': skill_name,
-                'module_path': full_module_path
+                'module_path': entry.module_path
             }
 
+        except SkillResolutionError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'skill': skill_name
+            }
         except Exception as e:
             return {
                 'success': False,
@@ -218,62 +444,36 @@ class PythonBridge:
             执行结果字典
         """
         try:
-            # 将技能名称规范化为模块名称
-            module_name = skill_name.replace('dnaspec-', '')
-
-            # 定义要尝试的模块路径列表
-            module_paths_to_try = [
-                f"{self.skills_base_path}.{module_name}",  # Standard path
-                f"dna_context_engineering.{module_name}",  # Context engineering path
-                f"{module_name}"  # Direct path
-            ]
-
-            # 尝试导入技能模块 - 按顺序尝试不同路径
-            module = None
-            error_messages = []
-            
-            for module_path in module_paths_to_try:
-                try:
-                    module = importlib.import_module(module_path)
-                    # 更新模块路径以使用找到的路径
-                    if module_path not in self._imported_modules:
-                        self._imported_modules[module_path] = module
-                    full_module_path = module_path
-                    break  # Stop if successful
-                except ImportError as e:
-                    error_messages.append(f"{module_path}: {str(e)}")
-                    continue  # Try next path
-
-            # 如果所有路径都失败，返回错误
-            if module is None:
-                return {
-                    'success': False,
-                    'error': f'Failed to import skill module from any location:\n' + '\n'.join(error_messages),
-                    'skill': skill_name
-                }
+            entry = self.resolve(skill_name, json_params=True)
 
             # 验证模块是否包含execute函数
-            if not hasattr(module, 'execute'):
+            if entry.execute is None:
                 return {
                     'success': False,
-                    'error': f'Skill module {full_module_path} does not have execute function',
+                    'error': f'Skill module {entry.module_path} does not have execute function',
                     'skill': skill_name
                 }
 
             # 执行技能
-            result = module.execute(params)
+            result = entry.execute(params)
 
             return {
                 'success': True,
                 'result': result,
                 'skill': skill_name,
-                'module_path': full_module_path
+                'module_path': entry.module_path
             }
 
+        except SkillResolutionError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'skill': skill_name
+            }
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e),
                 'skill': skill_name,
                 'stack': str(e.__traceback__) if e.__traceback__ else None
-            }
\ No newline at end of file
+            }
@@ -0,0 +1,435 @@
+"""
+技能结果缓存模块
+读取 dnaspec-init 生成的 .dnaspec/cache/config.json，提供两级结果缓存：
+内存LRU（memory_cache）+ 磁盘内容寻址存储（file_cache）
+"""
+import atexit
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+INDEX_FILE = "index.json"
+RESULTS_DIR = "results"
+
+# 索引批量写盘：累计变更数或距上次写盘的秒数达到阈值时才重写 index.json
+INDEX_FLUSH_THRESHOLD = 32
+INDEX_FLUSH_INTERVAL = 5.0
+
+_MISSING = object()
+
+# 尚未关闭的缓存实例（弱引用，不会因退出时写盘而常驻内存）
+_open_caches: "weakref.WeakSet[TieredResultCache]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_caches():
+    """进程退出时写入所有未关闭缓存的待写索引"""
+    for cache in list(_open_caches):
+        cache._flush_pending()
+
+
+def _copy_value(value: Any) -> Any:
+    """内存层存取时复制结果，调用方修改结果不会影响之后的命中（无法复制的对象原样返回）"""
+    try:
+        return copy.deepcopy(value)
+    except Exception:
+        return value
+
+
+@dataclass
+class CacheConfig:
+    """缓存配置（字段对应 cache/config.json）"""
+    enabled: bool = True
+    memory_enabled: bool = True
+    memory_ttl: float = 1800
+    memory_max_entries: int = 256
+    file_enabled: bool = True
+    file_ttl: float = 3600
+    max_cache_size_mb: float = 512
+    cleanup_interval: float = 3600
+    meta_dir: str = "cache/meta"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CacheConfig':
+        """从 config.json 内容创建配置"""
+        strategies = data.get("cache_strategies", {})
+        memory = strategies.get("memory_cache", {})
+        file_cache = strategies.get("file_cache", {})
+        performance = data.get("performance", {})
+        defaults = cls()
+        return cls(
+            enabled=data.get("cache_enabled", defaults.enabled),
+            memory_enabled=memory.get("enabled", defaults.memory_enabled),
+            memory_ttl=memory.get("ttl", defaults.memory_ttl),
+            memory_max_entries=memory.get("max_entries", defaults.memory_max_entries),
+            file_enabled=file_cache.get("enabled", defaults.file_enabled),
+            file_ttl=file_cache.get("ttl", defaults.file_ttl),
+            max_cache_size_mb=performance.get("max_cache_size_mb", defaults.max_cache_size_mb),
+            cleanup_interval=performance.get("cleanup_interval", defaults.cleanup_interval),
+            meta_dir=data.get("directories", {}).get("meta", defaults.meta_dir)
+        )
+
+    @classmethod
+    def load(cls, dnaspec_dir: str) -> Optional['CacheConfig']:
+        """
+        读取 <dnaspec_dir>/cache/config.json
+
+        Returns:
+            缓存配置，文件不存在或无法解析时返回None
+        """
+        config_file = os.path.join(dnaspec_dir, 'cache', 'config.json')
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+
+def make_cache_key(*parts: Any) -> str:
+    """规范化JSON（键排序）后取SHA-256作为缓存键"""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def read_cache_stats(dnaspec_dir: str, meta_dir: str = "cache/meta") -> Optional[Dict[str, Any]]:
+    """
+    读取磁盘缓存索引中的统计信息（无需遍历缓存目录）
+
+    Returns:
+        统计字典，索引不存在时返回None
+    """
+    index_file = os.path.join(dnaspec_dir, meta_dir, INDEX_FILE)
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    stats = dict(index.get("stats", {}))
+    entries = index.get("entries", {})
+    stats["entries"] = len(entries)
+    stats["size_bytes"] = sum(entry[0] for entry in entries.values())
+    return stats
+
+
+class TieredResultCache:
+    """
+    两级结果缓存
+
+    - 内存层：OrderedDict LRU，按 memory_ttl 过期
+    - 磁盘层：results/<键前两位>/<键>.json，按 file_ttl 过期；
+      条目大小与访问时间记录在 meta/index.json 中，总大小超过
+      max_cache_size_mb 时按最久未访问淘汰
+
+    index.json 批量写盘（见 INDEX_FLUSH_THRESHOLD/INDEX_FLUSH_INTERVAL，退出时
+    flush）；索引中缺失但结果文件仍在的条目在下次读取时按文件内的创建时间重新登记。
+    """
+
+    def __init__(self, dnaspec_dir: str, config: Optional[CacheConfig] = None,
+                 index_flush_threshold: int = INDEX_FLUSH_THRESHOLD,
+                 index_flush_interval: float = INDEX_FLUSH_INTERVAL):
+        """
+        初始化结果缓存
+
+        Args:
+            dnaspec_dir: .dnaspec 目录
+            config: 缓存配置，默认读取 cache/config.json
+            index_flush_threshold: 累计多少次变更后重写索引
+            index_flush_interval: 距上次写索引超过多少秒后重写索引
+        """
+        self.dnaspec_dir = dnaspec_dir
+        self.config = config or CacheConfig.load(dnaspec_dir) or CacheConfig()
+        self.results_dir = os.path.join(dnaspec_dir, 'cache', RESULTS_DIR)
+        self.index_file = os.path.join(dnaspec_dir, self.config.meta_dir, INDEX_FILE)
+        self.max_size_bytes = int(self.config.max_cache_size_mb * 1024 * 1024)
+
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # 键 -> [大小, 过期时间, 最近访问时间]
+        self._entries: Dict[str, list] = {}
+        self._size_bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "evictions": 0,
+            "expired": 0,
+            "last_cleanup": None
+        }
+        self._lock = threading.RLock()
+        self.index_flush_threshold = index_flush_threshold
+        self.index_flush_interval = index_flush_interval
+        self._index_dirty = 0
+        self._index_saved_at = time.time()
+        self._load_index()
+        _open_caches.add(self)
+
+    @classmethod
+    def for_project(cls, project_root: str) -> Optional['TieredResultCache']:
+        """
+        为已初始化缓存功能的项目创建缓存
+
+        Returns:
+            缓存实例，项目未启用缓存时返回None
+        """
+        dnaspec_dir = os.path.join(os.path.abspath(project_root), '.dnaspec')
+        config = CacheConfig.load(dnaspec_dir)
+        if config is None or not config.enabled:
+            return None
+        return cls(dnaspec_dir, config)
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        self._entries = {key: list(entry) for key, entry in index.get("entries", {}).items()}
+        self._size_bytes = sum(entry[0] for entry in self._entries.values())
+        saved = index.get("stats", {})
+        for name in self._stats:
+            if name in saved:
+                self._stats[name] = saved[name]
+
+    def _save_index(self):
+        self._index_dirty = 0
+        self._index_saved_at = time.time()
+        os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+        tmp_file = self.index_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "updated_at": datetime.now().isoformat(),
+                "stats": self._stats,
+                "entries": self._entries
+            }, f, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+
+    def _mark_index_dirty(self, now: float):
+        self._index_dirty += 1
+        if (self._index_dirty >= self.index_flush_threshold
+                or now - self._index_saved_at >= self.index_flush_interval):
+            self._save_index()
+
+    def _result_path(self, key: str) -> str:
+        return os.path.join(self.results_dir, key[:2], key + '.json')
+
+    def _adopt_unindexed(self, key: str, now: float) -> Optional[list]:
+        """登记索引写盘前留下的结果文件（如进程异常退出），已过期的直接删除"""
+        path = self._result_path(key)
+        try:
+            size = os.path.getsize(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                expires_at = json.load(f)["created_at"] + self.config.file_ttl
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            return None
+        if expires_at <= now:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return None
+        entry = self._entries[key] = [size, expires_at, now]
+        self._size_bytes += size
+        self._mark_index_dirty(now)
+        return entry
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键（见 make_cache_key）
+            default: 未命中时的返回值
+
+        Returns:
+            缓存值或default
+        """
+        value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def _lookup(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            if self.config.memory_enabled:
+                cached = self._memory.get(key)
+                if cached is not None:
+                    if cached[0] > now:
+                        self._memory.move_to_end(key)
+                        self._stats["hits"] += 1
+                        self._stats["memory_hits"] += 1
+                        return _copy_value(cached[1])
+                    del self._memory[key]
+
+            entry = None
+            if self.config.file_enabled:
+                entry = self._entries.get(key) or self._adopt_unindexed(key, now)
+            if entry is not None:
+                if entry[1] <= now:
+                    self._remove_entry(key)
+                    self._stats["expired"] += 1
+                else:
+                    try:
+                        with open(self._result_path(key), 'r', encoding='utf-8') as f:
+                            value = json.load(f)["value"]
+                    except (OSError, json.JSONDecodeError, KeyError):
+                        self._remove_entry(key)
+                    else:
+                        entry[2] = now
+                        self._stats["hits"] += 1
+                        self._stats["disk_hits"] += 1
+                        self._remember(key, _copy_value(value), now)
+                        return value
+
+            self._stats["misses"] += 1
+            return _MISSING
+
+    def _remember(self, key: str, value: Any, now: float):
+        if not self.config.memory_enabled:
+            return
+        self._memory[key] = (now + self.config.memory_ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, key: str, value: Any):
+        """
+        写入缓存（值必须可JSON序列化才会落盘）
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+        """
+        now = time.time()
+        with self._lock:
+            self._remember(key, _copy_value(value), now)
+            if not self.config.file_enabled:
+                return
+
+            try:
+                payload = json.dumps({"key": key, "created_at": now, "value": value}, ensure_ascii=False)
+            except (TypeError, ValueError):
+                return  # 不可序列化的结果只保留在内存层
+
+            data = payload.encode('utf-8')
+            path = self._result_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+
+            previous = self._entries.get(key)
+            if previous is not None:
+                self._size_bytes -= previous[0]
+            self._entries[key] = [len(data), now + self.config.file_ttl, now]
+            self._size_bytes += len(data)
+
+            self._evict_over_size()
+            last_cleanup = self._stats["last_cleanup"]
+            if last_cleanup is None or now - last_cleanup >= self.config.cleanup_interval:
+                self._cleanup_expired(now)
+            self._mark_index_dirty(now)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        命中时返回缓存值，否则计算并写入
+
+        Returns:
+            (结果, 是否命中缓存)
+        """
+        value = self._lookup(key)
+        if value is not _MISSING:
+            return value, True
+        value = compute()
+        self.put(key, value)
+        return value, False
+
+    def invalidate(self, key: str):
+        """删除指定缓存"""
+        with self._lock:
+            self._memory.pop(key, None)
+            if key in self._entries:
+                self._remove_entry(key)
+                self._save_index()
+
+    def clear(self):
+        """清空全部缓存"""
+        with self._lock:
+            self._memory.clear()
+            for key in list(self._entries):
+                self._remove_entry(key)
+            self._save_index()
+
+    def _remove_entry(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size_bytes -= entry[0]
+        try:
+            os.remove(self._result_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict_over_size(self):
+        if self._size_bytes <= self.max_size_bytes:
+            return
+        # 按最近访问时间淘汰，直到回到上限以内
+        for key in sorted(self._entries, key=lambda k: self._entries[k][2]):
+            if self._size_bytes <= self.max_size_bytes:
+                break
+            self._remove_entry(key)
+            self._memory.pop(key, None)
+            self._stats["evictions"] += 1
+
+    def _cleanup_expired(self, now: float) -> int:
+        expired = [key for key, entry in self._entries.items() if entry[1] <= now]
+        for key in expired:
+            self._remove_entry(key)
+        self._stats["expired"] += len(expired)
+        self._stats["last_cleanup"] = now
+        return len(expired)
+
+    def cleanup(self) -> int:
+        """
+        清理过期的磁盘条目
+
+        Returns:
+            清理的条目数
+        """
+        with self._lock:
+            removed = self._cleanup_expired(time.time())
+            self._save_index()
+            return removed
+
+    def flush(self):
+        """持久化索引与命中统计"""
+        with self._lock:
+            self._save_index()
+
+    def _flush_pending(self):
+        with self._lock:
+            if self._index_dirty:
+                self._save_index()
+
+    def close(self):
+        """写入索引并取消退出时的自动写盘"""
+        self.flush()
+        _open_caches.discard(self)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """获取实时缓存统计"""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "memory_entries": len(self._memory),
+                "size_bytes": self._size_bytes,
+                "size_mb": round(self._size_bytes / (1024 * 1024), 2),
+                "max_size_mb": self.config.max_cache_size_mb
+            }
@@ -7,11 +7,28 @@ import os
 import json
 import yaml
 import re
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from argparse import Namespace
 
+from .skill_search import SkillSearchIndex
+
+
+# 解析结果缓存目录（按技能根目录的路径哈希区分）
+MANIFEST_CACHE_DIR = Path.home() / '.dnaspec' / 'skill_manifest_cache'
+MANIFEST_CACHE_VERSION = 1
+
+# 需要重新解析的技能数达到该值时使用多进程解析
+PARALLEL_PARSE_THRESHOLD = 16
+
+
+def _parse_skill_file_worker(skill_file: str) -> Optional[Dict[str, Any]]:
+    """进程池入口：解析单个 SKILL.md"""
+    return SkillCommandMapper(Path(skill_file).parent, use_cache=False)._parse_skill_file(Path(skill_file))
+
 
 @dataclass
 class SkillCommand:
@@ -29,53 +46,156 @@ class SkillCommand:
 class SkillCommandMapper:
     """技能命令映射器 - 支持双重部署模式"""
     
-    def __init__(self, skills_root: Path):
+    def __init__(self, skills_root: Path, cache_path: Optional[Path] = None,
+                 use_cache: bool = True, max_workers: Optional[int] = None):
         """
         初始化映射器
         
         Args:
             skills_root: 技能根目录路径
+            cache_path: 解析结果缓存文件，默认位于 MANIFEST_CACHE_DIR
+            use_cache: 是否使用解析结果缓存
+            max_workers: 冷启动并行解析的进程数
         """
         self.skills_root = Path(skills_root)
         self.skills_commands: Dict[str, SkillCommand] = {}
         self.command_index: Dict[str, str] = {}  # alias -> skill_name 映射
+        self.use_cache = use_cache
+        self.max_workers = max_workers
+        if cache_path is None and use_cache:
+            root_hash = hashlib.sha1(str(self.skills_root.resolve()).encode('utf-8')).hexdigest()[:16]
+            cache_path = MANIFEST_CACHE_DIR / f"{root_hash}.json"
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.scan_stats = {'cached': 0, 'parsed': 0}
+        self._search_index: Optional[SkillSearchIndex] = None
         
     def scan_skills(self) -> Dict[str, SkillCommand]:
         """
         扫描技能目录并生成命令映射
         
+        只重新解析路径、修改时间或大小发生变化的 SKILL.md，其余使用缓存结果。
+        
         Returns:
             技能命令字典
         """
         if not self.skills_root.exists():
             return {}
-            
-        # 扫描所有技能目录
-        for skill_dir in self.skills_root.iterdir():
+        
+        # 收集所有技能文件及其签名
+        skill_files: List[Tuple[Path, Path, List[int]]] = []
+        for skill_dir in sorted(self.skills_root.iterdir()):
             if not skill_dir.is_dir() or skill_dir.name.startswith('.'):
                 continue
                 
             skill_file = skill_dir / "SKILL.md"
-            if not skill_file.exists():
+            try:
+                stat = skill_file.stat()
+            except OSError:
+                continue
+            skill_files.append((skill_dir, skill_file, [stat.st_mtime_ns, stat.st_size]))
+        
+        cached_entries = self._load_cache()
+        infos: Dict[str, Optional[Dict[str, Any]]] = {}
+        stale: List[Path] = []
+        for _, skill_file, signature in skill_files:
+            entry = cached_entries.get(str(skill_file))
+            if entry is not None and entry.get('signature') == signature:
+                infos[str(skill_file)] = entry.get('info')
+            else:
+                stale.append(skill_file)
+        
+        # 新解析的结果与缓存读出的结果保持同样的JSON形态
+        parsed = self._parse_many(stale)
+        infos.update(json.loads(json.dumps(parsed, ensure_ascii=False, default=str)))
+        self.scan_stats = {'cached': len(skill_files) - len(stale), 'parsed': len(stale)}
+        
+        new_entries = {
+            str(skill_file): {'signature': signature, 'info': infos.get(str(skill_file))}
+            for _, skill_file, signature in skill_files
+        }
+        if stale or set(new_entries) != set(cached_entries):
+            self._save_cache(new_entries)
+        
+        for skill_dir, skill_file, _ in skill_files:
+            skill_info = infos.get(str(skill_file))
+            if not skill_info:
                 continue
-                
             try:
-                # 解析 SKILL.md 文件
-                skill_info = self._parse_skill_file(skill_file)
-                if skill_info:
-                    command = self._create_skill_command(skill_info, skill_dir)
-                    self.skills_commands[command.name] = command
+                command = self._create_skill_command(dict(skill_info), skill_dir)
+                self.skills_commands[command.name] = command
+                
+                # 建立别名映射
+                self.command_index[command.name] = command.name
+                for alias in command.aliases:
+                    self.command_index[alias] = command.name
                     
-                    # 建立别名映射
-                    self.command_index[command.name] = command.name
-                    for alias in command.aliases:
-                        self.command_index[alias] = command.name
-                        
             except Exception as e:
                 print(f"Warning: Failed to parse skill {skill_dir.name}: {e}")
-                
+        
+        # 技能可能已变化，搜索索引在下次使用时按指纹重新校验
+        self._search_index = None
         return self.skills_commands
     
+    def get_search_index(self) -> SkillSearchIndex:
+        """
+        获取技能搜索索引
+        
+        持久化在解析缓存旁（<缓存名>.search.json），技能内容未变化时直接读取。
+        
+        Returns:
+            搜索索引
+        """
+        if self._search_index is None:
+            index_path = None
+            if self.use_cache and self.cache_path:
+                index_path = self.cache_path.with_name(self.cache_path.stem + '.search.json')
+            self._search_index = SkillSearchIndex.load_or_build(self.skills_commands, index_path)
+        return self._search_index
+    
+    def _parse_many(self, skill_files: List[Path]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """解析多个技能文件；数量较多时使用进程池"""
+        if len(skill_files) < PARALLEL_PARSE_THRESHOLD:
+            return {str(f): self._parse_skill_file(f) for f in skill_files}
+        
+        paths = [str(f) for f in skill_files]
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(_parse_skill_file_worker, paths, chunksize=8))
+        except (OSError, RuntimeError, ImportError):
+            # 无法创建子进程的环境退回线程池
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                results = list(pool.map(lambda f: self._parse_skill_file(Path(f)), paths))
+        return dict(zip(paths, results))
+    
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        if not self.use_cache or not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if data.get('version') != MANIFEST_CACHE_VERSION:
+            return {}
+        return data.get('entries', {})
+    
+    def _save_cache(self, entries: Dict[str, Dict[str, Any]]):
+        if not self.use_cache or not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                # YAML 可能解析出日期等类型，统一转为字符串
+                json.dump({
+                    'version': MANIFEST_CACHE_VERSION,
+                    'skills_root': str(self.skills_root),
+                    'entries': entries
+                }, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            pass
+    
     def _parse_skill_file(self, skill_file: Path) -> Optional[Dict[str, Any]]:
         """
         解析 SKILL.md 文件
@@ -4,7 +4,21 @@
 """
 from .skill_mapper import SkillMapper
 from .python_bridge import PythonBridge
-from typing import Dict, Any
+from .result_cache import TieredResultCache, make_cache_key
+from typing import Dict, Any, Iterable, Optional
+
+# 输出只由技能实现与输入决定、没有副作用的技能，才允许使用结果缓存；
+# git-operations、temp-workspace 等有副作用或依赖外部状态的技能不在此列
+CACHEABLE_SKILLS = frozenset({
+    'architect',
+    'simple-architect',
+    'system-architect',
+    'task-decomposer',
+    'context-analysis',
+    'context-analyzer',
+    'cognitive-template',
+    'cognitive-templater',
+})
 
 
 class SkillExecutor:
@@ -13,16 +27,22 @@ class SkillExecutor:
     协调技能映射和Python桥接来执行技能
     """
     
-    def __init__(self, python_bridge: PythonBridge = None, skill_mapper: SkillMapper = None):
+    def __init__(self, python_bridge: PythonBridge = None, skill_mapper: SkillMapper = None,
+                 result_cache: Optional[TieredResultCache] = None,
+                 cacheable_skills: Optional[Iterable[str]] = None):
         """
         初始化技能执行器
         
         Args:
             python_bridge: Python桥接器实例
             skill_mapper: 技能映射器实例
+            result_cache: 技能结果缓存（可选，只缓存成功的执行结果）
+            cacheable_skills: 允许使用结果缓存的技能，默认 CACHEABLE_SKILLS
         """
         self.python_bridge = python_bridge or PythonBridge()
         self.skill_mapper = skill_mapper or SkillMapper()
+        self.result_cache = result_cache
+        self.cacheable_skills = frozenset(CACHEABLE_SKILLS if cacheable_skills is None else cacheable_skills)
     
     def execute(self, skill_name: str, params: str) -> Dict[str, Any]:
         """
@@ -55,7 +75,12 @@ class SkillExecutor:
                 }
             
             # 通过Python桥接器执行技能，传递原始技能名称用于正确映射工具名称
-            result = self.python_bridge.execute_skill(dnaspec_skill_name, params, original_skill_name=skill_name)
+            cache_key = self._cache_key(skill_name, dnaspec_skill_name, params)
+            result = self.result_cache.get(cache_key) if cache_key else None
+            if result is None:
+                result = self.python_bridge.execute_skill(dnaspec_skill_name, params, original_skill_name=skill_name)
+                if cache_key and result.get('success'):
+                    self.result_cache.put(cache_key, result)
             
             # 格式化输出
             formatted_result = {
@@ -78,6 +103,20 @@ class SkillExecutor:
                 'stack': str(e.__traceback__) if e.__traceback__ else None
             }
     
+    def _cache_key(self, skill_name: str, dnaspec_skill_name: str, params: str) -> Optional[str]:
+        """
+        计算结果缓存键（包含技能实现版本，技能更新后旧结果自动失效）
+        
+        Returns:
+            缓存键，未配置缓存、技能不可缓存或版本未知时返回None
+        """
+        if self.result_cache is None or skill_name not in self.cacheable_skills:
+            return None
+        version = self.python_bridge.skill_version(dnaspec_skill_name)
+        if version is None:
+            return None
+        return make_cache_key('skill-executor', skill_name, version, params)
+    
     def validate_input(self, skill_name: str, params: str) -> Dict[str, Any]:
         """
         验证输入参数
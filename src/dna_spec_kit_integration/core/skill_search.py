@@ -0,0 +1,291 @@
+"""
+技能搜索索引 - `dnaspec search` 使用的倒排索引
+
+索引字段：名称、别名、分类、描述、参数、示例（按字段加权），BM25 风格打分。
+查询词依次尝试精确匹配、前缀匹配（有序词表二分查找）和编辑距离为1的模糊匹配
+（删除邻域索引）。索引可序列化为JSON，按技能内容指纹判断是否需要重建。
+"""
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+SEARCH_INDEX_VERSION = 1
+
+# 字段权重
+FIELD_WEIGHTS = {
+    'name': 5.0,
+    'aliases': 4.0,
+    'category': 2.0,
+    'description': 2.0,
+    'parameters': 1.5,
+    'examples': 1.0
+}
+
+# 扩展匹配的折扣
+PREFIX_FACTOR = 0.7
+FUZZY_FACTOR = 0.5
+# 参与模糊匹配的最短词长
+FUZZY_MIN_LENGTH = 4
+# 名称/别名与查询完全相同、名称以查询开头时的加分
+EXACT_NAME_BONUS = 10.0
+NAME_PREFIX_BONUS = 3.0
+
+_BM25_K1 = 1.2
+
+_WORD_RE = re.compile(r'[\w\u4e00-\u9fff]+')
+_SEGMENT_RE = re.compile(r'[\u4e00-\u9fff]+|[^\u4e00-\u9fff_]+')
+_CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+
+
+def tokenize(text: str) -> List[str]:
+    """混合分词：拉丁词（按 - 和 _ 切开）+ 中文二元组"""
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        for segment in _SEGMENT_RE.findall(word):
+            if _CJK_RE.match(segment):
+                if len(segment) == 1:
+                    tokens.append(segment)
+                else:
+                    tokens.extend(segment[i:i + 2] for i in range(len(segment) - 1))
+            else:
+                tokens.append(segment)
+    return tokens
+
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """a、b 是否最多相差一次插入/删除/替换/相邻交换"""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    if la == lb:
+        diffs = [i for i in range(la) if a[i] != b[i]]
+        if len(diffs) == 1:
+            return True
+        return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                and a[diffs[0]] == b[diffs[1]] and a[diffs[1]] == b[diffs[0]])
+    if la > lb:
+        a, b = b, a
+    # b 比 a 多一个字符
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+def _document_fields(command: Any) -> Dict[str, str]:
+    """把 SkillCommand 展开为各字段文本"""
+    parameters = command.parameters or {}
+    parameter_text = ' '.join(
+        f"{name} {info.get('description', '') if isinstance(info, dict) else info}"
+        for name, info in parameters.items()
+    )
+    return {
+        'name': command.name,
+        'aliases': ' '.join(command.aliases or []),
+        'category': command.category or '',
+        'description': command.description or '',
+        'parameters': parameter_text,
+        'examples': ' '.join(str(example) for example in command.examples or [])
+    }
+
+
+def commands_fingerprint(commands: Dict[str, Any]) -> str:
+    """技能内容指纹（任一被索引字段变化都会改变指纹）"""
+    digest = hashlib.sha256()
+    for name in sorted(commands):
+        fields = _document_fields(commands[name])
+        digest.update(json.dumps([name, fields], sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SkillSearchIndex:
+    """技能搜索倒排索引"""
+
+    def __init__(self):
+        self.fingerprint: Optional[str] = None
+        self.docs: List[Dict[str, Any]] = []                # 文档号 -> {name, category, aliases}
+        self.postings: Dict[str, List[List[float]]] = {}    # 词 -> [[文档号, 加权词频], ...]
+        self._terms: List[str] = []
+        self._delete_index: Optional[Dict[str, List[str]]] = None
+
+    @classmethod
+    def build(cls, commands: Dict[str, Any]) -> 'SkillSearchIndex':
+        """
+        由技能命令构建索引
+
+        Args:
+            commands: 技能名 -> SkillCommand
+        """
+        index = cls()
+        index.fingerprint = commands_fingerprint(commands)
+        postings: Dict[str, Dict[int, float]] = {}
+        for doc_id, name in enumerate(sorted(commands)):
+            command = commands[name]
+            index.docs.append({
+                'name': command.name,
+                'category': command.category,
+                'aliases': [alias.lower() for alias in command.aliases or []]
+            })
+            for field, text in _document_fields(command).items():
+                weight = FIELD_WEIGHTS[field]
+                for token in tokenize(text):
+                    doc_weights = postings.setdefault(token, {})
+                    doc_weights[doc_id] = doc_weights.get(doc_id, 0.0) + weight
+        index.postings = {
+            term: [[doc_id, weight] for doc_id, weight in sorted(doc_weights.items())]
+            for term, doc_weights in postings.items()
+        }
+        index._terms = sorted(index.postings)
+        return index
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': SEARCH_INDEX_VERSION,
+            'fingerprint': self.fingerprint,
+            'docs': self.docs,
+            'postings': self.postings
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional['SkillSearchIndex']:
+        if data.get('version') != SEARCH_INDEX_VERSION:
+            return None
+        index = cls()
+        index.fingerprint = data.get('fingerprint')
+        index.docs = data.get('docs', [])
+        index.postings = data.get('postings', {})
+        index._terms = sorted(index.postings)
+        return index
+
+    def save(self, path: Path):
+        """原子写入索引文件"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['SkillSearchIndex']:
+        """读取索引文件，不存在或格式不符时返回None"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    @classmethod
+    def load_or_build(cls, commands: Dict[str, Any], path: Optional[Path] = None) -> 'SkillSearchIndex':
+        """
+        读取持久化索引；指纹与当前技能不一致时重建并写回
+
+        Args:
+            commands: 技能名 -> SkillCommand
+            path: 索引文件路径（None 表示不持久化）
+        """
+        fingerprint = commands_fingerprint(commands)
+        if path is not None:
+            index = cls.load(path)
+            if index is not None and index.fingerprint == fingerprint:
+                return index
+
+        index = cls.build(commands)
+        if path is not None:
+            try:
+                index.save(path)
+            except OSError:
+                pass
+        return index
+
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        """查询词 -> [(索引词, 折扣)]：精确、前缀，都没有时再做模糊匹配"""
+        expansions = []
+        if token in self.postings:
+            expansions.append((token, 1.0))
+
+        start = bisect.bisect_left(self._terms, token)
+        for term in self._terms[start:]:
+            if not term.startswith(token):
+                break
+            if term != token:
+                expansions.append((term, PREFIX_FACTOR))
+
+        if not expansions and len(token) >= FUZZY_MIN_LENGTH:
+            if self._delete_index is None:
+                self._build_delete_index()
+            candidates = set(self._delete_index.get(token, ()))
+            for variant in _deletes(token):
+                candidates.update(self._delete_index.get(variant, ()))
+            expansions.extend(
+                (term, FUZZY_FACTOR) for term in sorted(candidates) if _within_one_edit(token, term)
+            )
+        return expansions
+
+    def _build_delete_index(self):
+        self._delete_index = {}
+        for term in self._terms:
+            if len(term) < FUZZY_MIN_LENGTH - 1:
+                continue
+            for key in _deletes(term) | {term}:
+                self._delete_index.setdefault(key, []).append(term)
+
+    def search(self, query: str, category: Optional[str] = None,
+               limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        搜索技能
+
+        Args:
+            query: 查询文本
+            category: 限制分类
+            limit: 最多返回的结果数
+
+        Returns:
+            按相关度降序的 (技能名, 得分) 列表
+        """
+        query_lower = query.strip().lower()
+        tokens = list(dict.fromkeys(tokenize(query_lower)))
+        if not tokens:
+            return []
+
+        total_docs = len(self.docs)
+        scores: Dict[int, float] = {}
+        for token in tokens:
+            # 同一查询词只取每个文档的最佳扩展
+            best: Dict[int, float] = {}
+            for term, factor in self._expand(token):
+                entries = self.postings[term]
+                idf = math.log(1 + (total_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+                for doc_id, weight in entries:
+                    doc_id = int(doc_id)
+                    score = idf * factor * weight * (_BM25_K1 + 1) / (weight + _BM25_K1)
+                    if score > best.get(doc_id, 0.0):
+                        best[doc_id] = score
+            for doc_id, score in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        results = []
+        for doc_id, score in scores.items():
+            doc = self.docs[doc_id]
+            if category and doc['category'] != category:
+                continue
+            name = doc['name'].lower()
+            if query_lower == name or query_lower in doc['aliases']:
+                score += EXACT_NAME_BONUS
+            elif name.startswith(query_lower):
+                score += NAME_PREFIX_BONUS
+            results.append((doc['name'], score))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[:limit] if limit else results
@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import Dict, Any, List, Optional
 from .skill_command_mapper import SkillCommandMapper, SkillCommand
 
+VERSION_STRING = 'DNASPEC Skills System 2.0.0'
+
 
 class SlashCommandHandler:
     """Slash 命令处理器"""
@@ -31,13 +33,39 @@ class SlashCommandHandler:
         """加载所有命令"""
         self.commands = self.mapper.scan_skills()
     
-    def create_parser(self) -> argparse.ArgumentParser:
+    def resolve_command_name(self, name: str) -> Optional[str]:
+        """
+        把命令名或别名解析为技能名
+        
+        Args:
+            name: 命令名或别名
+            
+        Returns:
+            技能名，不是技能命令时返回None
+        """
+        if name in self.commands:
+            return name
+        for skill_name, command in self.commands.items():
+            if name in command.aliases:
+                return skill_name
+        return None
+    
+    def create_parser(self, argv: Optional[List[str]] = None) -> argparse.ArgumentParser:
         """
         创建命令解析器
         
+        Args:
+            argv: 将要解析的参数；给出时只为其中选中的技能构建完整参数，
+                其余技能子命令只注册名称和帮助（按需构建）
+        
         Returns:
             参数解析器
         """
+        target = None
+        if argv is not None:
+            first = next((arg for arg in argv if not arg.startswith('-')), None)
+            target = self.resolve_command_name(first) if first else None
+
         parser = argparse.ArgumentParser(
             prog='dnaspec',
             description='DNASPEC Context Engineering Skills - Dual Deployment System',
@@ -47,7 +75,7 @@ class SlashCommandHandler:
         parser.add_argument(
             '--version',
             action='version',
-            version='DNASPEC Skills System 2.0.0'
+            version=VERSION_STRING
         )
         
         # 创建子命令解析器
@@ -66,7 +94,8 @@ class SlashCommandHandler:
             )
             
             # 添加动态参数
-            self._add_skill_arguments(skill_parser, command)
+            if argv is None or skill_name == target:
+                self._add_skill_arguments(skill_parser, command)
             
         # 添加特殊命令
         self._add_utility_commands(subparsers)
@@ -299,6 +328,11 @@ class SlashCommandHandler:
             '--category',
             help='限制搜索分类'
         )
+        search_parser.add_argument(
+            '--limit',
+            type=int,
+            help='最多返回的结果数'
+        )
     
     def handle_command(self, args: argparse.Namespace) -> Dict[str, Any]:
         """
@@ -701,31 +735,34 @@ class SlashCommandHandler:
         return True
     
     def _handle_search(self, args: argparse.Namespace) -> Dict[str, Any]:
-        """处理搜索命令"""
-        query = args.query.lower()
+        """处理搜索命令（按相关度排序，支持前缀与拼写容错）"""
         category = args.category
+        limit = getattr(args, 'limit', None)
         
-        matching_commands = []
-        for skill_name, command in self.commands.items():
-            if category and command.category != category:
-                continue
-            
-            # 在名称、描述和别名中搜索
-            search_text = f"{skill_name} {command.description} {' '.join(command.aliases)}".lower()
-            if query in search_text:
-                matching_commands.append(command)
+        hits = self.mapper.get_search_index().search(args.query, category=category, limit=limit)
+        results = []
+        for skill_name, score in hits:
+            command = self.commands.get(skill_name)
+            if command is not None:
+                results.append({**command.__dict__, 'score': round(score, 4)})
         
         return {
             'success': True,
             'query': args.query,
             'category': category,
-            'results': [cmd.__dict__ for cmd in matching_commands],
-            'total_results': len(matching_commands)
+            'results': results,
+            'total_results': len(results)
         }
 
 
-def main():
+def main(argv: Optional[List[str]] = None):
     """主函数 - CLI 入口点"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ['--version']:
+        # 版本信息不需要扫描技能
+        print(VERSION_STRING)
+        return
+    
     skills_root = Path("../skills")
     
     if not skills_root.exists():
@@ -733,9 +770,9 @@ def main():
         sys.exit(1)
     
     handler = SlashCommandHandler(skills_root)
-    parser = handler.create_parser()
+    parser = handler.create_parser(argv)
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     result = handler.handle_command(args)
     
     # 输出结果
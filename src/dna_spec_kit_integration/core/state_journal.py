@@ -0,0 +1,334 @@
+"""
+状态事件日志 - 分段滚动的追加式日志
+
+每条记录一行JSON，包含递增序号 seq、时间戳 ts 和状态操作。
+文件按大小滚动为 segment-<首条序号>.jsonl，内存中保留每段的序号与时间范围，
+按时间范围查询时跳过不相关的分段。打开时只解析最新分段（中断写入留下的不完整
+末行在此时截掉），更早的分段序号范围由文件名推出，时间范围在读取时才用到。
+
+同一目录可由多个实例（或进程）共用：追加、读取和回收都持有目录下 .lock 文件的
+排他锁，并先同步其他实例写入的记录，保证序号全局递增且不重复。滚动或回收分段时
+向 .lock 追加一个字节作为代数，同步时只有代数变化才重新列目录，否则只读最新
+分段新增的字节。
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+LOCK_FILENAME = ".lock"
+
+
+class _Segment:
+    """分段元数据"""
+
+    def __init__(self, path: Path, first_seq: int):
+        self.path = path
+        self.first_seq = first_seq
+        self.last_seq = first_seq - 1
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+        self.size = 0
+        # 未解析的旧分段：last_seq 由下一段的首条序号推出，时间范围未知
+        self.scanned = True
+
+    def note(self, record: Dict[str, Any], size: int):
+        self.last_seq = record['seq']
+        if self.first_ts is None:
+            self.first_ts = record['ts']
+        self.last_ts = record['ts']
+        self.size += size
+
+
+class EventJournal:
+    """分段滚动的追加式事件日志"""
+
+    def __init__(self, journal_dir: str, segment_max_bytes: int = 1024 * 1024,
+                 max_segments: int = 8, fsync: bool = False):
+        """
+        Args:
+            journal_dir: 日志目录
+            segment_max_bytes: 单个分段的最大字节数，超过后滚动到新分段
+            max_segments: prune 时保留的分段数下限
+            fsync: 每条记录写入后是否 fsync
+        """
+        self.journal_dir = Path(journal_dir)
+        self.segment_max_bytes = segment_max_bytes
+        self.max_segments = max_segments
+        self.fsync = fsync
+        self.last_seq = 0
+        self._segments: List[_Segment] = []
+        self._file = None
+        self._file_segment: Optional[_Segment] = None  # self._file 所属分段
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self._generation: Optional[int] = None
+        with self._lock, self._file_lock():
+            self._refresh(truncate=True)
+
+    @contextmanager
+    def _file_lock(self):
+        """跨实例/进程的排他锁（目录不存在时无需加锁）"""
+        if self._lock_file is None:
+            if not self.journal_dir.exists():
+                yield
+                return
+            self._lock_file = open(self.journal_dir / LOCK_FILENAME, 'a+b')
+        fd = self._lock_file.fileno()
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            self._lock_file.seek(0)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+    def _list_segments(self) -> List[Tuple[int, Path]]:
+        if not self.journal_dir.exists():
+            return []
+        paths = []
+        for path in self.journal_dir.iterdir():
+            name = path.name
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    paths.append((int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]), path))
+                except ValueError:
+                    continue
+        return sorted(paths)
+
+    def _disk_generation(self) -> Optional[int]:
+        if self._lock_file is None:
+            return None
+        return os.fstat(self._lock_file.fileno()).st_size
+
+    def _bump_generation(self):
+        """通知其他实例分段列表已变化（调用方持有两把锁）"""
+        self._lock_file.write(b'\0')
+        self._lock_file.flush()
+        self._generation = self._disk_generation()
+
+    def _refresh(self, truncate: bool = False):
+        """
+        与磁盘上的分段同步（调用方持有两把锁）：读取其他实例追加的记录，
+        代数变化时登记其他实例新建的分段、移除已被回收的分段
+
+        Args:
+            truncate: 截掉中断写入留下的不完整末行（仅在打开时执行）
+        """
+        generation = self._disk_generation()
+        if truncate or generation != self._generation:
+            self._rescan(truncate)
+            self._generation = generation
+        elif self._segments:
+            tail = self._segments[-1]
+            if not self._read_new(tail):
+                self._rescan(False)
+            self.last_seq = max(self.last_seq, tail.last_seq)
+
+    def _rescan(self, truncate: bool):
+        """重新列目录；只解析新的最新分段和此前的最新分段新增的字节"""
+        known = {segment.path: segment for segment in self._segments}
+        previous_tail = self._segments[-1].path if self._segments else None
+        listing = self._list_segments()
+        segments = []
+        for index, (first_seq, path) in enumerate(listing):
+            segment = known.get(path)
+            is_tail = index == len(listing) - 1
+            if segment is None:
+                segment = _Segment(path, first_seq)
+                if not is_tail:
+                    segment.scanned = False
+            elif is_tail and not segment.scanned:
+                segment.scanned = True
+                segment.size = 0
+            if segment.scanned and (is_tail or path == previous_tail):
+                if not self._read_new(segment, truncate and is_tail):
+                    continue
+            if index + 1 < len(listing) and not segment.scanned:
+                segment.last_seq = listing[index + 1][0] - 1
+            segments.append(segment)
+            self.last_seq = max(self.last_seq, segment.last_seq)
+        self._segments = segments
+
+        # 其他实例滚动出新分段后，本实例也写入最新分段
+        if self._file is not None and (not segments or self._file_segment is not segments[-1]):
+            self._file.close()
+            self._file = None
+            self._file_segment = None
+
+    def _read_new(self, segment: _Segment, truncate: bool = False) -> bool:
+        """
+        解析分段中 segment.size 之后的完整行
+
+        Returns:
+            分段文件是否仍然存在
+        """
+        try:
+            if self._file is not None and self._file_segment is segment:
+                size = os.fstat(self._file.fileno()).st_size
+            else:
+                size = segment.path.stat().st_size
+        except FileNotFoundError:
+            return False
+        if size <= segment.size:
+            return True
+        with open(segment.path, 'rb+' if truncate else 'rb') as f:
+            f.seek(segment.size)
+            raw = f.read(size - segment.size)
+            complete = raw[:raw.rfind(b'\n') + 1]
+            if truncate and len(complete) < len(raw):
+                f.truncate(segment.size + len(complete))
+        for line in complete.splitlines(keepends=True):
+            try:
+                segment.note(json.loads(line), len(line))
+            except (json.JSONDecodeError, KeyError):
+                segment.size += len(line)
+        return True
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """
+        追加一条记录（自动填充 seq 与 ts）
+
+        Returns:
+            记录序号
+        """
+        with self._lock:
+            if self._lock_file is None:
+                self.journal_dir.mkdir(parents=True, exist_ok=True)
+            with self._file_lock():
+                self._refresh()
+                self.last_seq += 1
+                record = {'seq': self.last_seq, 'ts': time.time(), **record}
+                line = (json.dumps(record, ensure_ascii=False, default=str) + '\n').encode('utf-8')
+
+                segment = self._segments[-1] if self._segments else None
+                if segment is None or (segment.size and segment.size + len(line) > self.segment_max_bytes):
+                    segment = self._rotate()
+                elif self._file is None:
+                    self._file = open(segment.path, 'ab')
+                    self._file_segment = segment
+
+                self._file.write(line)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+                segment.note(record, len(line))
+                return record['seq']
+
+    def _rotate(self) -> _Segment:
+        if self._file is not None:
+            self._file.close()
+        path = self.journal_dir / f"{SEGMENT_PREFIX}{self.last_seq:012d}{SEGMENT_SUFFIX}"
+        segment = _Segment(path, self.last_seq)
+        self._segments.append(segment)
+        self._file = open(path, 'ab')
+        self._file_segment = segment
+        self._bump_generation()
+        return segment
+
+    def records(self, after_seq: int = 0, start: Optional[float] = None,
+                end: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        按序号顺序读取记录
+
+        Args:
+            after_seq: 只返回序号大于该值的记录
+            start: 时间下限（含，time.time() 时间戳）
+            end: 时间上限（含）
+        """
+        with self._lock, self._file_lock():
+            self._refresh()
+            segments = list(self._segments)
+
+        for segment in segments:
+            if segment.last_seq <= after_seq:
+                continue
+            if segment.scanned:
+                if segment.first_ts is None:
+                    continue
+                if start is not None and segment.last_ts < start:
+                    continue
+                if end is not None and segment.first_ts > end:
+                    continue
+            for record in self._read_segment(segment):
+                if record['seq'] <= after_seq:
+                    continue
+                if start is not None and record['ts'] < start:
+                    continue
+                if end is not None and record['ts'] > end:
+                    continue
+                yield record
+
+    @staticmethod
+    def _read_segment(segment: _Segment) -> Iterator[Dict[str, Any]]:
+        try:
+            f = open(segment.path, 'rb')
+        except FileNotFoundError:
+            # 已被其他实例回收
+            return
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def segments_newest_first(self) -> Iterator[List[Dict[str, Any]]]:
+        """从最新分段起逐段返回其全部记录（段内按序号顺序），调用方读够即可停止"""
+        with self._lock, self._file_lock():
+            self._refresh()
+            segments = list(self._segments)
+        for segment in reversed(segments):
+            yield list(self._read_segment(segment))
+
+    def prune(self, through_seq: int) -> int:
+        """
+        删除最旧的分段，直到只剩 max_segments 段；只删除记录全部不晚于 through_seq 的分段
+
+        Returns:
+            删除的分段数
+        """
+        removed = 0
+        with self._lock, self._file_lock():
+            self._refresh()
+            while (len(self._segments) > self.max_segments
+                   and self._segments[0].last_seq <= through_seq):
+                segment = self._segments.pop(0)
+                try:
+                    segment.path.unlink()
+                except FileNotFoundError:
+                    pass
+                removed += 1
+            if removed:
+                self._bump_generation()
+        return removed
+
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                self._file_segment = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
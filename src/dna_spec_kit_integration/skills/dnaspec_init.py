@@ -10,6 +10,8 @@ from enum import Enum
 from datetime import datetime
 import logging
 
+from ..core.result_cache import CacheConfig, TieredResultCache, read_cache_stats
+
 
 class InitOperation(Enum):
     """初始化操作枚举"""
@@ -751,6 +753,15 @@ class DNASPECInitSkill:
         with open(cache_config_file, 'w', encoding='utf-8') as f:
             json.dump(cache_config, f, indent=2, ensure_ascii=False)
     
+    def get_result_cache(self) -> Optional[TieredResultCache]:
+        """
+        获取项目的技能结果缓存
+
+        Returns:
+            结果缓存，未启用缓存功能时返回None
+        """
+        return TieredResultCache.for_project(self.project_root)
+    
     def _setup_git_hooks(self):
         """设置Git钩子"""
         git_hooks_dir = os.path.join(self.project_root, '.git', 'hooks')
@@ -898,6 +909,25 @@ jobs:
             "coordination_success_rate": 0.0
         }
         
+        # 优先读取结果缓存维护的索引统计，避免遍历缓存目录
+        cache_config = CacheConfig.load(self.dnaspec_dir)
+        cache_stats = read_cache_stats(
+            self.dnaspec_dir, cache_config.meta_dir if cache_config else CacheConfig.meta_dir
+        )
+        if cache_stats is not None:
+            lookups = cache_stats.get("hits", 0) + cache_stats.get("misses", 0)
+            last_cleanup = cache_stats.get("last_cleanup")
+            metrics["cache_size_mb"] = round(cache_stats["size_bytes"] / (1024 * 1024), 2)
+            metrics["cache_files_count"] = cache_stats["entries"]
+            metrics["last_cache_cleanup"] = (
+                datetime.fromtimestamp(last_cleanup).isoformat() if last_cleanup else None
+            )
+            metrics["cache_hits"] = cache_stats.get("hits", 0)
+            metrics["cache_misses"] = cache_stats.get("misses", 0)
+            metrics["cache_hit_rate"] = round(cache_stats.get("hits", 0) / lookups, 3) if lookups else 0.0
+            metrics["cache_evictions"] = cache_stats.get("evictions", 0)
+            return metrics
+        
         # 计算缓存大小
         cache_dir = os.path.join(self.dnaspec_dir, 'cache')
         if os.path.exists(cache_dir):
@@ -1,5 +1,6 @@
 import asyncio
-from typing import Dict, Any, Callable, List
+import heapq
+from typing import Dict, Any, Callable, List, Set
 from dataclasses import dataclass
 from .hooks.hook_system import hook_manager, HookContext, HookType
 from .agents.agent_manager import AgentManager
@@ -16,9 +17,16 @@ class TaskSpec:
 class SisyphusOrchestrator:
     """Sisyphus 主编排器（默认）"""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 4):
+        """
+        Args:
+            max_concurrency: 同时执行的任务数上限
+        """
         self.task_queue: List[TaskSpec] = []
         self.completed_tasks: List[str] = []
+        self.failed_tasks: Dict[str, str] = {}    # 任务名 -> 失败/取消/跳过原因
+        self.task_results: Dict[str, Any] = {}
+        self.max_concurrency = max_concurrency
         self.agent_manager: AgentManager = None
         self.initialized = False
     
@@ -37,44 +45,114 @@ class SisyphusOrchestrator:
         self.agent_manager = agent_manager
     
     def add_task(self, task_spec: TaskSpec):
-        """添加任务到队列"""
+        """添加任务到队列（执行顺序由 execute_tasks 按依赖与优先级决定）"""
         self.task_queue.append(task_spec)
-        self.task_queue.sort(key=lambda x: x.priority, reverse=True)
     
-    async def execute_tasks(self):
-        """执行所有任务"""
-        while self.task_queue:
-            # 查找没有未完成依赖的任务
-            executable_tasks = []
-            for task in self.task_queue[:]:  # 创建副本以避免修改时的问题
-                if self._can_execute_task(task):
-                    executable_tasks.append(task)
-            
-            if not executable_tasks:
-                print("No executable tasks found, dependencies not met")
-                break
-            
-            # 并行执行可执行任务
-            tasks_to_run = []
-            for task in executable_tasks:
-                task_coro = self._execute_single_task(task)
-                tasks_to_run.append(task_coro)
-            
-            if tasks_to_run:
-                await asyncio.gather(*tasks_to_run, return_exceptions=True)
-    
-    def _can_execute_task(self, task: TaskSpec) -> bool:
-        """检查任务是否可以执行（依赖是否都已完成）"""
-        if not task.dependencies:
-            return True
+    async def execute_tasks(self) -> Dict[str, Any]:
+        """
+        执行所有任务
+        
+        入度计数调度：任务的最后一个依赖完成时立即进入优先级就绪堆，受并发信号量限制
+        派发执行。任务失败或被取消时，其所有下游任务标记为跳过。存在循环依赖的任务
+        无法就绪，保留在 task_queue 中。
+        
+        Returns:
+            任务名 -> 执行结果
+        """
+        pending = {task.name: task for task in self.task_queue}
+        order = {name: index for index, name in enumerate(pending)}
+        completed = set(self.completed_tasks)
+        dependents: Dict[str, List[str]] = {name: [] for name in pending}
+        indegree: Dict[str, int] = {}
+        ready: List[tuple] = []
+        finished: Set[str] = set()
+        
+        def push_ready(name: str):
+            task = pending[name]
+            heapq.heappush(ready, (-task.priority, order[name], name))
+        
+        def fail(name: str, reason: str):
+            """标记任务失败，并沿依赖边把下游任务标记为跳过"""
+            stack = [(name, reason)]
+            while stack:
+                current, current_reason = stack.pop()
+                if current in finished:
+                    continue
+                finished.add(current)
+                self.failed_tasks[current] = current_reason
+                stack.extend(
+                    (dependent, f"Dependency {current} did not complete")
+                    for dependent in dependents[current]
+                )
+        
+        blocked = []
+        for name, task in pending.items():
+            deps = set(task.dependencies or []) - completed
+            for dep in deps & pending.keys():
+                dependents[dep].append(name)
+            indegree[name] = len(deps & pending.keys())
+            if deps - pending.keys():
+                blocked.append((name, f"Dependency not available: {', '.join(sorted(deps - pending.keys()))}"))
+            elif indegree[name] == 0:
+                push_ready(name)
+        for name, reason in blocked:
+            fail(name, reason)
         
-        for dep in task.dependencies:
-            if dep not in self.completed_tasks:
-                return False
-        return True
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        wakeup = asyncio.Event()
+        running: Set[asyncio.Task] = set()
+        
+        async def run(task: TaskSpec):
+            try:
+                result = await self._execute_single_task(task)
+            except asyncio.CancelledError:
+                fail(task.name, "Cancelled")
+            except Exception as e:
+                fail(task.name, str(e))
+            else:
+                finished.add(task.name)
+                self.completed_tasks.append(task.name)
+                self.task_results[task.name] = result
+                for dependent in dependents[task.name]:
+                    indegree[dependent] -= 1
+                    if indegree[dependent] == 0 and dependent not in finished:
+                        push_ready(dependent)
+            finally:
+                # 先于唤醒调度循环移出 running，避免调度循环误以为仍有任务在执行
+                running.discard(asyncio.current_task())
+                semaphore.release()
+                wakeup.set()
+        
+        try:
+            while True:
+                if not ready:
+                    if not running:
+                        break
+                    wakeup.clear()
+                    await wakeup.wait()
+                    continue
+                
+                await semaphore.acquire()
+                # 获得执行名额后再从堆顶取任务，等待期间新就绪的高优先级任务优先
+                _, _, name = heapq.heappop(ready)
+                runner = asyncio.ensure_future(run(pending[name]))
+                running.add(runner)
+        finally:
+            # 外部取消时一并取消正在执行的任务
+            for runner in list(running):
+                runner.cancel()
+            if running:
+                await asyncio.gather(*list(running), return_exceptions=True)
+            self.task_queue = [task for task in self.task_queue if task.name not in finished]
+        
+        if self.task_queue:
+            print(f"No executable tasks found, dependencies not met: "
+                  f"{', '.join(task.name for task in self.task_queue)}")
+        
+        return {name: self.task_results[name] for name in pending if name in self.task_results}
     
     async def _execute_single_task(self, task: TaskSpec):
-        """执行单个任务"""
+        """执行单个任务（失败时触发 agent_error hook 后重新抛出异常）"""
         try:
             # 触发代理处理前hook
             context = HookContext(
@@ -97,10 +175,6 @@ class SisyphusOrchestrator:
                 )
                 await hook_manager.trigger_hook('agent_after_process', context)
                 
-                # 标记任务为已完成
-                self.completed_tasks.append(task.name)
-                self.task_queue.remove(task)
-                
                 return result
             else:
                 raise ValueError(f"No agent found for type: {task.agent_type}")
@@ -113,4 +187,5 @@ class SisyphusOrchestrator:
                 hook_type=HookType.AGENT,
                 data={'task': task, 'error': e}
             )
-            await hook_manager.trigger_hook('agent_error', context)
\ No newline at end of file
+            await hook_manager.trigger_hook('agent_error', context)
+            raise
@@ -0,0 +1,112 @@
+"""
+dnaspec CLI 启动时间基准测试
+
+通过 `python -X importtime` 获取导入耗时明细，断言轻量命令不会加载
+执行栈，且入口模块的累计导入时间不超过预算（可用环境变量
+DNASPEC_STARTUP_BUDGET_MS 调整）。
+"""
+import sys
+import os
+import subprocess
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core import skill_command_mapper
+from src.dna_spec_kit_integration.core.slash_command_handler import SlashCommandHandler
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+
+# 入口模块累计导入时间预算（毫秒）
+STARTUP_BUDGET_MS = float(os.environ.get('DNASPEC_STARTUP_BUDGET_MS', 150))
+
+# 轻量命令不应加载的模块
+HEAVY_MODULES = (
+    'dna_spec_kit_integration.core.command_handler',
+    'dna_spec_kit_integration.core.skill_executor',
+    'dna_spec_kit_integration.core.python_bridge',
+    'dna_spec_kit_integration.core.skill_mapper',
+    'dna_spec_kit_integration.core.interactive_shell',
+    'yaml',
+)
+
+
+def parse_importtime(stderr):
+    """
+    解析 -X importtime 输出
+
+    Returns:
+        模块名 -> (自身耗时us, 累计耗时us)
+    """
+    breakdown = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # 表头
+        breakdown[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return breakdown
+
+
+def run_importtime(*args):
+    env = dict(os.environ, PYTHONPATH=SRC_DIR)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        capture_output=True, text=True, cwd=PROJECT_ROOT, env=env, timeout=60
+    )
+    return result, parse_importtime(result.stderr)
+
+
+def test_cli_import_within_budget():
+    result, breakdown = run_importtime('-c', 'import dna_spec_kit_integration.cli')
+    assert result.returncode == 0, result.stderr
+
+    cumulative_ms = breakdown['dna_spec_kit_integration.cli'][1] / 1000
+    slowest = sorted(breakdown.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    assert cumulative_ms <= STARTUP_BUDGET_MS, (
+        f"CLI 导入耗时 {cumulative_ms:.1f}ms 超出预算 {STARTUP_BUDGET_MS}ms，最慢模块: {slowest}"
+    )
+    assert not set(HEAVY_MODULES) & set(breakdown)
+
+
+@pytest.mark.parametrize('argv', [['--help'], ['--version'], ['validate', '--help']])
+def test_lightweight_commands_skip_execution_stack(argv):
+    result, breakdown = run_importtime('-m', 'dna_spec_kit_integration.cli', *argv)
+    assert result.returncode == 0, result.stderr
+    assert not set(HEAVY_MODULES) & set(breakdown)
+
+
+def test_package_exports_resolve_lazily():
+    code = (
+        "import sys, dna_spec_kit_integration as pkg\n"
+        "assert 'dna_spec_kit_integration.core.python_bridge' not in sys.modules\n"
+        "assert pkg.PythonBridge.__name__ == 'PythonBridge'\n"
+        "assert 'dna_spec_kit_integration.core.python_bridge' in sys.modules\n"
+    )
+    result, _ = run_importtime('-c', code)
+    assert result.returncode == 0, result.stderr
+
+
+def test_slash_parser_builds_only_requested_skill(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_command_mapper, 'MANIFEST_CACHE_DIR', tmp_path / 'cache')
+    for name in ('task-decomposer', 'context-analyzer'):
+        skill_dir = tmp_path / 'skills' / name
+        skill_dir.mkdir(parents=True)
+        (skill_dir / 'SKILL.md').write_text(
+            f"---\nname: {name}\ndescription: {name} skill\n---\n\n# {name}\n", encoding='utf-8'
+        )
+
+    handler = SlashCommandHandler(tmp_path / 'skills')
+    argv = ['task-decomposer', '--max-depth', '5']
+    args = handler.create_parser(argv).parse_args(argv)
+    assert args.command == 'task-decomposer'
+    assert args.max_depth == 5
+
+    # 未选中的技能只注册了子命令名称，没有构建参数
+    with pytest.raises(SystemExit):
+        handler.create_parser(argv).parse_args(['context-analyzer', '--benchmark', 'academic'])
+    full = handler.create_parser().parse_args(['context-analyzer', '--benchmark', 'academic'])
+    assert full.benchmark == 'academic'
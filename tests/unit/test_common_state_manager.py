@@ -0,0 +1,303 @@
+"""
+共同状态管理器单元测试
+"""
+import sys
+import os
+import json
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core.common_state_manager import CommonStateManager
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_synchronous_mode_persists_each_update(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    manager = CommonStateManager(state_file)
+    manager.update_state('temp_workspace', 'active_session', 's1')
+    assert _read(state_file)['temp_workspace']['active_session'] == 's1'
+    assert not os.path.exists(state_file + '.tmp')
+
+    reloaded = CommonStateManager(state_file)
+    assert reloaded.get_state('temp_workspace', 'active_session') == 's1'
+
+
+def test_write_behind_coalesces_until_threshold(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    manager = CommonStateManager(state_file, write_behind=True, flush_interval=60, flush_threshold=5)
+    try:
+        for i in range(4):
+            manager.increment_counter('security', 'violation_count')
+        assert not os.path.exists(state_file)
+        assert manager.pending_updates == 4
+
+        manager.increment_counter('security', 'violation_count')
+        assert _read(state_file)['security']['violation_count'] == 5
+        assert manager.pending_updates == 0
+    finally:
+        manager.close()
+
+
+def test_write_behind_flushes_on_interval_and_close(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    manager = CommonStateManager(state_file, write_behind=True, flush_interval=0.05)
+    manager.update_state('context_chain', 'context_id', 'c1')
+    deadline = time.time() + 5
+    while not os.path.exists(state_file) and time.time() < deadline:
+        time.sleep(0.01)
+    assert _read(state_file)['context_chain']['context_id'] == 'c1'
+
+    manager.update_state('context_chain', 'context_id', 'c2')
+    manager.close()
+    assert _read(state_file)['context_chain']['context_id'] == 'c2'
+
+
+def test_snapshots_are_isolated_from_later_updates(tmp_path):
+    manager = CommonStateManager(str(tmp_path / 'state.json'))
+    manager.append_to_list('temp_workspace', 'temp_files', 'a.tmp')
+    snapshot = manager.get_full_state_snapshot()
+    files_before = manager.get_state('temp_workspace', 'temp_files')
+
+    manager.append_to_list('temp_workspace', 'temp_files', 'b.tmp')
+    manager.remove_from_list('temp_workspace', 'temp_files', 'a.tmp')
+
+    assert snapshot['temp_workspace']['temp_files'] == ['a.tmp']
+    assert files_before == ['a.tmp']
+    assert manager.get_state('temp_workspace', 'temp_files') == ['b.tmp']
+
+
+def test_list_membership_deduplicates_hashable_and_dict_items(tmp_path):
+    manager = CommonStateManager(str(tmp_path / 'state.json'))
+    for _ in range(3):
+        manager.append_to_list('temp_workspace', 'temp_files', 'a.tmp')
+        manager.append_to_list('context_chain', 'analysis_history', {'id': 1, 'score': 0.5})
+    assert manager.get_state('temp_workspace', 'temp_files') == ['a.tmp']
+    assert manager.get_state('context_chain', 'analysis_history') == [{'id': 1, 'score': 0.5}]
+
+    manager.remove_from_list('temp_workspace', 'temp_files', 'a.tmp')
+    manager.append_to_list('temp_workspace', 'temp_files', 'a.tmp')
+    assert manager.get_state('temp_workspace', 'temp_files') == ['a.tmp']
+
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    manager = CommonStateManager(state_file, write_behind=True, flush_interval=0.01, flush_threshold=50)
+
+    def worker(n):
+        for i in range(100):
+            manager.increment_counter('security', 'violation_count')
+            manager.append_to_list('temp_workspace', 'temp_files', f'{n}-{i}.tmp')
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    manager.close()
+
+    saved = _read(state_file)
+    assert saved['security']['violation_count'] == 400
+    assert len(saved['temp_workspace']['temp_files']) == 400
+
+
+def test_event_history_is_bounded_ring_buffer(tmp_path):
+    manager = CommonStateManager(str(tmp_path / 'state.json'), history_size=5)
+    for i in range(8):
+        manager.update_state('context_chain', 'context_id', f'c{i}')
+    history = manager.get_event_history(limit=0)
+    assert [event['new_value'] for event in history] == ['c3', 'c4', 'c5', 'c6', 'c7']
+    assert len(manager.get_event_history(limit=2)) == 2
+
+
+def test_crash_recovery_replays_journal_after_snapshot(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    manager = CommonStateManager(state_file, write_behind=True, flush_interval=60)
+    manager.append_to_list('temp_workspace', 'temp_files', 'a.tmp')
+    manager.append_to_list('temp_workspace', 'temp_files', 'b.tmp')
+    manager.increment_counter('security', 'violation_count')
+    manager.flush()
+    manager.remove_from_list('temp_workspace', 'temp_files', 'a.tmp')
+    manager.update_state('context_chain', 'context_id', 'c1')
+    manager.reset_category('security')
+    assert manager.pending_updates == 3
+    # 模拟崩溃：不调用 close/flush，快照中没有最后三次变更
+    assert _read(state_file)['temp_workspace']['temp_files'] == ['a.tmp', 'b.tmp']
+
+    recovered = CommonStateManager(state_file)
+    assert recovered.get_state('temp_workspace', 'temp_files') == ['b.tmp']
+    assert recovered.get_state('context_chain', 'context_id') == 'c1'
+    assert recovered.get_state('security', 'violation_count') is None
+    assert recovered.get_event_history(limit=0)[-1]['new_value'] == 'c1'
+
+    # 恢复后继续写入，序号接续
+    recovered.update_state('context_chain', 'context_id', 'c2')
+    assert CommonStateManager(state_file).get_state('context_chain', 'context_id') == 'c2'
+    manager.close()
+
+
+def test_time_range_queries_and_replay(tmp_path):
+    manager = CommonStateManager(str(tmp_path / 'state.json'))
+    manager.update_state('context_chain', 'context_id', 'c1')
+    manager.append_to_list('temp_workspace', 'temp_files', 'a.tmp')
+    records = manager.query_events()
+    middle = records[0]['ts']
+    time.sleep(0.01)
+    later = time.time()
+    manager.update_state('context_chain', 'context_id', 'c2')
+
+    assert [r['value'] for r in manager.query_events(start=later)] == ['c2']
+    assert [r['op'] for r in manager.query_events(end=later)] == ['set', 'append']
+    assert [r['value'] for r in manager.query_events(category='context_chain')] == ['c1', 'c2']
+
+    assert manager.replay_journal(until=middle)['context_chain']['context_id'] == 'c1'
+    assert manager.replay_journal()['context_chain']['context_id'] == 'c2'
+
+
+def test_journal_segments_rotate_and_prune(tmp_path):
+    from src.dna_spec_kit_integration.core.state_journal import EventJournal
+
+    journal = EventJournal(str(tmp_path / 'journal'), segment_max_bytes=200, max_segments=2)
+    for i in range(20):
+        journal.append({'op': 'set', 'category': 'c', 'key': 'k', 'value': i})
+    assert journal.segment_count() > 2
+    assert [r['value'] for r in journal.records(after_seq=19)] == [19]
+
+    journal.prune(through_seq=20)
+    assert journal.segment_count() == 2
+    journal.close()
+
+    # 截断的末行在重新打开时被丢弃
+    last = sorted((tmp_path / 'journal').iterdir())[-1]
+    with open(last, 'ab') as f:
+        f.write(b'{"seq": 21, "ts"')
+    reopened = EventJournal(str(tmp_path / 'journal'))
+    assert reopened.last_seq == 20
+    assert reopened.append({'op': 'set', 'category': 'c', 'key': 'k', 'value': 'x'}) == 21
+    reopened.close()
+
+
+def test_two_managers_share_journal_without_losing_updates(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    first = CommonStateManager(state_file)
+    second = CommonStateManager(state_file)
+
+    first.update_state('context_chain', 'context_id', 'a1')
+    second.update_state('security', 'security_level', 'relaxed')
+    first.append_to_list('temp_workspace', 'temp_files', 'a.tmp')
+    second.append_to_list('temp_workspace', 'temp_files', 'b.tmp')
+
+    seqs = [record['seq'] for record in first.query_events()]
+    assert seqs == [1, 2, 3, 4]
+    # 后写入的实例并入了另一实例的变更
+    assert second.get_state('context_chain', 'context_id') == 'a1'
+    assert second.get_state('temp_workspace', 'temp_files') == ['a.tmp', 'b.tmp']
+    first.close()
+    second.close()
+
+    reopened = CommonStateManager(state_file)
+    assert reopened.get_state('context_chain', 'context_id') == 'a1'
+    assert reopened.get_state('security', 'security_level') == 'relaxed'
+    assert reopened.get_state('temp_workspace', 'temp_files') == ['a.tmp', 'b.tmp']
+
+
+def test_journal_instances_allocate_unique_sequence_numbers(tmp_path):
+    from src.dna_spec_kit_integration.core.state_journal import EventJournal
+
+    journals = [EventJournal(str(tmp_path / 'journal'), segment_max_bytes=300) for _ in range(2)]
+
+    def worker(journal, n):
+        for i in range(25):
+            journal.append({'op': 'set', 'category': 'c', 'key': str(n), 'value': i})
+
+    threads = [threading.Thread(target=worker, args=(journal, n)) for n, journal in enumerate(journals)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    seqs = [record['seq'] for record in EventJournal(str(tmp_path / 'journal')).records()]
+    assert seqs == list(range(1, 51))
+    for journal in journals:
+        journal.close()
+
+
+def test_initialize_common_state_reuses_module_instance():
+    from src.dna_spec_kit_integration.core import common_state_manager
+
+    existing = common_state_manager.COMMON_STATE_MANAGER
+    common_state_manager.initialize_common_state()
+    assert common_state_manager.COMMON_STATE_MANAGER is existing
+
+
+def test_recovery_reads_only_tail_segments(tmp_path, monkeypatch):
+    from src.dna_spec_kit_integration.core import state_journal
+
+    state_file = str(tmp_path / 'state.json')
+    journal_dir = str(tmp_path / 'journal')
+    manager = CommonStateManager(state_file, journal_dir=journal_dir, history_size=5)
+    manager._journal.segment_max_bytes = 1024
+    for i in range(200):
+        manager.update_state('context_chain', 'context_id', f'c{i}')
+    manager.flush()
+    manager.update_state('context_chain', 'context_id', 'after-snapshot')
+    segments = len(os.listdir(journal_dir)) - 1
+    assert segments > 3
+
+    opened = []
+    real_open = open
+    monkeypatch.setattr(state_journal, 'open',
+                        lambda path, *args, **kwargs: (opened.append(str(path)), real_open(path, *args, **kwargs))[1],
+                        raising=False)
+    recovered = CommonStateManager(state_file, journal_dir=journal_dir, history_size=5)
+
+    assert recovered.get_state('context_chain', 'context_id') == 'after-snapshot'
+    assert [e['new_value'] for e in recovered.get_event_history(limit=0)] == \
+        ['c196', 'c197', 'c198', 'c199', 'after-snapshot']
+    assert len({path for path in opened if 'segment-' in path}) <= 3
+    manager.close()
+    recovered.close()
+
+
+def test_append_lists_directory_only_when_segments_change(tmp_path, monkeypatch):
+    from src.dna_spec_kit_integration.core.state_journal import EventJournal
+
+    journal = EventJournal(str(tmp_path / 'journal'), segment_max_bytes=2000)
+    other = EventJournal(str(tmp_path / 'journal'), segment_max_bytes=2000)
+    listings = []
+    real_list = EventJournal._list_segments
+    monkeypatch.setattr(EventJournal, '_list_segments',
+                        lambda self: listings.append(self) or real_list(self))
+
+    for i in range(100):
+        (journal if i % 2 else other).append({'op': 'set', 'category': 'c', 'key': 'k', 'value': i})
+    rotations = len(list((tmp_path / 'journal').glob('segment-*')))
+    assert len(listings) <= 2 * rotations + 2
+    assert [r['value'] for r in journal.records()] == list(range(100))
+    journal.close()
+    other.close()
+
+
+def test_lists_are_copied_only_after_being_read(tmp_path):
+    manager = CommonStateManager(str(tmp_path / 'state.json'), write_behind=True,
+                                 flush_interval=60, flush_threshold=1000)
+    manager.append_to_list('temp_workspace', 'temp_files', 'a.tmp')
+    owned = manager._state['temp_workspace']['temp_files']
+    for i in range(100):
+        manager.append_to_list('temp_workspace', 'temp_files', f'{i}.tmp')
+    manager.remove_from_list('temp_workspace', 'temp_files', '0.tmp')
+    # 没有读取方时原地修改，不再每次复制整个列表
+    assert manager._state['temp_workspace']['temp_files'] is owned
+
+    held = manager.get_state('temp_workspace', 'temp_files')
+    manager.append_to_list('temp_workspace', 'temp_files', 'b.tmp')
+    manager.remove_from_list('temp_workspace', 'temp_files', 'a.tmp')
+    assert held[0] == 'a.tmp' and len(held) == 100
+    assert manager.get_state('temp_workspace', 'temp_files')[-1] == 'b.tmp'
+    manager.close()
@@ -0,0 +1,116 @@
+"""
+协调管理器并行调度单元测试
+"""
+import sys
+import os
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core.coordination.coordination_manager import (
+    CoordinationManager, CoordinationMode, TaskStatus
+)
+
+
+def _manager(skills, max_workers=4):
+    manager = CoordinationManager(max_workers=max_workers)
+    manager._get_skill_implementation = lambda name: skills.get(name)
+    return manager
+
+
+def _task(task_id, skill_name, dependencies=()):
+    return {'task_id': task_id, 'skill_name': skill_name, 'dependencies': list(dependencies)}
+
+
+def _recording_skill(log, delay=0.0, fail=False):
+    def skill(**input_data):
+        log.append(('start', input_data['name'], time.perf_counter()))
+        time.sleep(delay)
+        log.append(('end', input_data['name'], time.perf_counter()))
+        if fail:
+            raise RuntimeError('boom')
+        return {'name': input_data['name']}
+    return skill
+
+
+def _with_names(tasks):
+    for task in tasks:
+        task['input_data'] = {'name': task['task_id']}
+    return tasks
+
+
+def _events(log, kind):
+    return {name: at for event, name, at in log if event == kind}
+
+
+def test_dependent_starts_when_its_dependencies_finish():
+    log = []
+    manager = _manager({'slow': _recording_skill(log, 0.3), 'fast': _recording_skill(log, 0.02)})
+    workflow_id = manager.create_workflow('dag', _with_names([
+        _task('a', 'slow'), _task('b', 'fast'), _task('c', 'fast', ['b'])
+    ]), mode=CoordinationMode.PARALLEL)
+
+    result = manager.execute_workflow(workflow_id)
+    assert result['success']
+    assert set(result['results']) == {'a', 'b', 'c'}
+    # c 只依赖 b，不必等待同一批次中更慢的 a
+    assert _events(log, 'end')['c'] < _events(log, 'end')['a']
+
+
+def test_ready_tasks_prioritized_by_critical_path():
+    log = []
+    skill = _recording_skill(log)
+    manager = _manager({'s': skill}, max_workers=1)
+    workflow_id = manager.create_workflow('priority', _with_names([
+        _task('x', 's'), _task('y', 's'), _task('z', 's', ['y'])
+    ]), mode=CoordinationMode.PARALLEL)
+
+    assert manager.execute_workflow(workflow_id)['success']
+    assert [name for event, name, _ in log if event == 'start'] == ['y', 'x', 'z']
+
+
+def test_cycle_detected_before_any_task_runs():
+    log = []
+    manager = _manager({'s': _recording_skill(log)})
+    workflow_id = manager.create_workflow('cycle', _with_names([
+        _task('root', 's'), _task('a', 's', ['b']), _task('b', 's', ['a'])
+    ]), mode=CoordinationMode.PARALLEL)
+
+    result = manager.execute_workflow(workflow_id)
+    assert not result['success']
+    assert 'cycle' in result['error'] and 'a, b' in result['error']
+    assert log == []
+
+
+def test_failures_and_missing_dependencies_skip_dependents():
+    log = []
+    manager = _manager({'ok': _recording_skill(log), 'bad': _recording_skill(log, fail=True)})
+    workflow_id = manager.create_workflow('failures', _with_names([
+        _task('a', 'bad'), _task('b', 'ok', ['a']), _task('c', 'ok', ['b']),
+        _task('d', 'ok'), _task('e', 'ok', ['ghost'])
+    ]), mode=CoordinationMode.PARALLEL)
+
+    result = manager.execute_workflow(workflow_id)
+    assert set(result['results']) == {'d'}
+    statuses = {task.task_id: task.status for task in manager.get_workflow(workflow_id).tasks}
+    assert statuses == {
+        'a': TaskStatus.FAILED, 'b': TaskStatus.SKIPPED, 'c': TaskStatus.SKIPPED,
+        'd': TaskStatus.COMPLETED, 'e': TaskStatus.SKIPPED
+    }
+
+
+def test_status_reports_queue_wait_and_run_time():
+    manager = _manager({'s': _recording_skill([], 0.05)}, max_workers=1)
+    workflow_id = manager.create_workflow('timings', _with_names([
+        _task('first', 's'), _task('second', 's')
+    ]), mode=CoordinationMode.PARALLEL)
+    manager.execute_workflow(workflow_id)
+
+    timings = manager.get_workflow_status(workflow_id)['task_timings']
+    assert set(timings) == {'first', 'second'}
+    assert all(t['run_time'] >= 0.04 for t in timings.values())
+    # 单工作线程时第二个任务需要排队等待第一个完成
+    assert timings['second']['queue_wait'] >= 0.04
+    assert timings['first']['queue_wait'] < timings['second']['queue_wait']
@@ -0,0 +1,141 @@
+"""
+协调管理器流式流水线单元测试
+"""
+import sys
+import os
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core.coordination.coordination_manager import (
+    CoordinationManager, CoordinationMode, TaskStatus
+)
+
+
+def _manager(skills):
+    manager = CoordinationManager()
+    manager._get_skill_implementation = lambda name: skills.get(name)
+    return manager
+
+
+def _stages(*skill_names):
+    return [{'task_id': f'stage-{i}', 'skill_name': name} for i, name in enumerate(skill_names)]
+
+
+def test_items_flow_through_stages_in_order():
+    manager = _manager({
+        'decompose': lambda item, **_: {'requirement': item, 'parts': [item.upper()]},
+        'constrain': lambda item, **_: f"{item['requirement']}:{len(item['parts'])}"
+    })
+    items = [f'req{i}' for i in range(50)]
+    workflow_id = manager.create_workflow('stream', _stages('decompose', 'constrain'),
+                                          mode=CoordinationMode.STREAMING,
+                                          context={'items': items, 'queue_size': 4})
+
+    result = manager.execute_workflow(workflow_id)
+    assert result['success']
+    assert result['results']['items'] == [f'{item}:1' for item in items]
+    assert result['results']['failed_items'] == []
+
+    status = manager.get_workflow_status(workflow_id)
+    assert status['completed_tasks'] == 2
+    for metrics in status['stage_metrics'].values():
+        assert metrics['processed'] == 50
+        assert metrics['throughput'] > 0
+        assert metrics['max_queue_depth'] <= 4
+
+
+def test_downstream_starts_before_upstream_finishes():
+    events = []
+    lock = threading.Lock()
+
+    def record(stage):
+        def skill(item, **_):
+            time.sleep(0.01)
+            with lock:
+                events.append((stage, item))
+            return item
+        return skill
+
+    manager = _manager({'first': record('first'), 'second': record('second')})
+    workflow_id = manager.create_workflow('overlap', _stages('first', 'second'),
+                                          mode=CoordinationMode.STREAMING,
+                                          context={'items': list(range(10)), 'queue_size': 2})
+    manager.execute_workflow(workflow_id)
+
+    first_done = events.index(('first', 9))
+    assert ('second', 0) in events[:first_done]
+
+
+def test_bounded_queue_applies_backpressure():
+    produced = []
+
+    def fast(item, **_):
+        produced.append(item)
+        return item
+
+    def slow(item, **_):
+        # 慢阶段处理第一条数据时，上游最多领先一个队列容量
+        if item == 0:
+            time.sleep(0.2)
+            assert len(produced) <= 1 + 2 + 1
+        return item
+
+    manager = _manager({'fast': fast, 'slow': slow})
+    workflow_id = manager.create_workflow('backpressure', _stages('fast', 'slow'),
+                                          mode=CoordinationMode.STREAMING,
+                                          context={'items': list(range(20)), 'queue_size': 2})
+    result = manager.execute_workflow(workflow_id)
+    assert result['results']['items'] == list(range(20))
+    assert result['results']['failed_items'] == []
+
+
+def test_failed_items_are_dropped_without_stopping_the_stream():
+    def picky(item, **_):
+        if item % 3 == 0:
+            raise ValueError(f'bad item {item}')
+        return item * 10
+
+    manager = _manager({'picky': picky, 'echo': lambda item, **_: item})
+    workflow_id = manager.create_workflow('failures', _stages('picky', 'echo'),
+                                          mode=CoordinationMode.STREAMING,
+                                          context={'items': list(range(7))})
+    result = manager.execute_workflow(workflow_id)['results']
+
+    assert result['items'] == [10, 20, 40, 50]
+    assert [f['index'] for f in result['failed_items']] == [0, 3, 6]
+    assert all(f['stage'] == 'stage-0' for f in result['failed_items'])
+    tasks = manager.get_workflow(workflow_id).tasks
+    assert tasks[0].metadata['stream']['failed'] == 3
+    assert tasks[1].metadata['stream']['processed'] == 4
+    assert all(task.status == TaskStatus.COMPLETED for task in tasks)
+
+
+def test_failing_source_ends_stream_and_reports_error():
+    def source():
+        yield 'a'
+        yield 'b'
+        raise RuntimeError('source broke')
+
+    manager = _manager({'echo': lambda item, **_: item})
+    workflow_id = manager.create_workflow('stream', _stages('echo', 'echo'),
+                                          mode=CoordinationMode.STREAMING,
+                                          context={'items': source(), 'queue_size': 1})
+
+    result = manager.execute_workflow(workflow_id)
+    assert result['success']
+    assert result['results']['items'] == ['a', 'b']
+    assert result['results']['source_error'] == 'source broke'
+
+
+def test_missing_items_reports_error_instead_of_hanging():
+    manager = _manager({'echo': lambda item, **_: item})
+    workflow_id = manager.create_workflow('stream', _stages('echo'),
+                                          mode=CoordinationMode.STREAMING,
+                                          context={'items': None})
+
+    result = manager.execute_workflow(workflow_id)
+    assert result['results']['items'] == []
+    assert result['results']['source_error']
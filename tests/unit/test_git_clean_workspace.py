@@ -0,0 +1,55 @@
+"""
+工作区清理（单次遍历扫描）单元测试
+"""
+import sys
+import os
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering.git_operations import scan_workspace, clean_workspace
+
+
+class TestCleanWorkspace:
+    """单次遍历的工作区清理"""
+
+    @pytest.fixture
+    def workspace(self, tmp_path):
+        (tmp_path / "ai_generated_notes.md").write_text("x", encoding="utf-8")
+        (tmp_path / "experiment_run").mkdir()
+        (tmp_path / "experiment_run" / "data.txt").write_text("x", encoding="utf-8")
+        (tmp_path / "pkg" / "__pycache__").mkdir(parents=True)
+        (tmp_path / "pkg" / "keep.py").write_text("x", encoding="utf-8")
+        # 子目录中的同名文件不属于根目录临时文件
+        (tmp_path / "pkg" / "debug_helper.py").write_text("x", encoding="utf-8")
+        (tmp_path / "node_modules" / "lib" / "__pycache__").mkdir(parents=True)
+        (tmp_path / "build" / "__pycache__").mkdir(parents=True)
+        (tmp_path / "keep_build" / "__pycache__").mkdir(parents=True)
+        (tmp_path / ".gitignore").write_text("build/\n*_build/\n!keep_build/\n", encoding="utf-8")
+        return tmp_path
+
+    def test_scan_prunes_vendor_and_ignored_dirs(self, workspace):
+        files, dirs = scan_workspace(workspace)
+        rel = sorted(str(p.relative_to(workspace)) for p in files + dirs)
+        assert rel == [
+            "ai_generated_notes.md",
+            "experiment_run",
+            os.path.join("keep_build", "__pycache__"),
+            os.path.join("pkg", "__pycache__"),
+        ]
+
+    def test_dry_run_deletes_nothing(self, workspace):
+        result = clean_workspace(str(workspace), dry_run=True)
+        assert "预览" in result and "ai_generated_notes.md" in result
+        assert (workspace / "ai_generated_notes.md").exists()
+        assert (workspace / "pkg" / "__pycache__").exists()
+
+    def test_parallel_delete(self, workspace):
+        result = clean_workspace(str(workspace), workers=4)
+        assert "清理完成" in result
+        assert not (workspace / "experiment_run").exists()
+        assert not (workspace / "pkg" / "__pycache__").exists()
+        assert (workspace / "pkg" / "debug_helper.py").exists()
+        assert (workspace / "node_modules" / "lib" / "__pycache__").exists()
+        assert clean_workspace(str(workspace)) == "✅ 工作区已经清洁，无需清理"
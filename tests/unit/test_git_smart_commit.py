@@ -0,0 +1,61 @@
+"""
+智能提交批量暂存单元测试
+"""
+import sys
+import os
+import shutil
+import subprocess
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering.git_operations import parse_porcelain_z, smart_commit
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="需要git")
+
+
+def _git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, capture_output=True, text=True, check=True).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "dev@example.com")
+    _git(tmp_path, "config", "user.name", "dev")
+    (tmp_path / "old name.py").write_text("x = 1\n", encoding="utf-8")
+    _git(tmp_path, "add", "-A")
+    _git(tmp_path, "commit", "-q", "-m", "init")
+    return tmp_path
+
+
+def test_parse_porcelain_z_handles_renames_and_spaces():
+    output = "R  new name.py\0old name.py\0?? a b.txt\0 M src/模块.py\0"
+    assert parse_porcelain_z(output) == [
+        ("R ", "new name.py", "old name.py"),
+        ("??", "a b.txt", None),
+        (" M", "src/模块.py", None),
+    ]
+
+
+def test_smart_commit_stages_everything_in_one_pass(repo):
+    _git(repo, "mv", "old name.py", "new name.py")
+    (repo / "with space.txt").write_text("a\n", encoding="utf-8")
+    (repo / "glob[1]*.md").write_text("b\n", encoding="utf-8")
+    for i in range(50):
+        (repo / f"gen_{i}.py").write_text(f"v = {i}\n", encoding="utf-8")
+
+    result = smart_commit(str(repo), "[FEAT] 批量添加生成的模块文件")
+
+    assert "智能提交成功" in result
+    assert "阶段耗时" in result and "stage" in result
+    assert _git(repo, "status", "--porcelain") == ""
+    committed = _git(repo, "show", "--name-only", "--format=", "HEAD").splitlines()
+    assert "new name.py" in committed
+    assert "with space.txt" in committed
+    assert len(committed) >= 52
+
+
+def test_smart_commit_without_changes(repo):
+    assert "没有需要提交的更改" in smart_commit(str(repo), "[FEAT] 无更改的提交测试")
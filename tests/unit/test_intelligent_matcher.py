@@ -149,4 +149,159 @@ class TestIntelligentMatcher:
         assert 'registered_skills_count' in info
         assert 'registered_skills' in info
         assert 'registered_patterns_count' in info
-        assert info['registered_skills_count'] == 1
\ No newline at end of file
+        assert info['registered_skills_count'] == 1
+
+def _reference_keyword_scores(keywords_by_skill, request):
+    """逐关键词子串扫描的参考实现"""
+    request_lower = request.lower()
+    scores = {}
+    for skill_name, keywords in keywords_by_skill.items():
+        hits = [k for k in keywords if k.lower() in request_lower]
+        if hits:
+            scores[skill_name] = (min(len(hits) / len(keywords), 1.0), hits)
+    return scores
+
+
+class TestIndexedMatching:
+    """自动机与倒排索引的匹配结果应与逐个扫描一致"""
+
+    KEYWORDS = {
+        'dnaspec-architect': ['架构', '系统设计', 'architecture', 'System Design'],
+        'dnaspec-agent-creator': ['智能体', 'agent', 'create agent'],
+        'dnaspec-task-decomposer': ['任务', '分解', 'task', 'sub task'],
+        'dnaspec-modulizer': ['模块', 'module', 'modul'],
+    }
+    REQUESTS = [
+        "设计系统架构", "Create agent for system design", "把任务分解为 sub task",
+        "refactor into modules", "无关文本", "ARCHITECTURE review of agents",
+    ]
+
+    def _matcher(self):
+        matcher = IntelligentMatcher()
+        for skill_name, keywords in self.KEYWORDS.items():
+            matcher.register_skill_keywords(skill_name, keywords)
+        return matcher
+
+    def test_keyword_matches_equal_substring_scan(self):
+        matcher = self._matcher()
+        for request in self.REQUESTS:
+            matches = {m['skill_name']: (m['score'], m['matched_keywords'])
+                       for m in matcher._find_keyword_matches(request)}
+            assert matches == _reference_keyword_scores(self.KEYWORDS, request), request
+
+    def test_semantic_matches_use_token_overlap(self):
+        matcher = self._matcher()
+        matches = {m['skill_name']: m for m in matcher._find_semantic_matches("system design for an agent")}
+        assert set(matches) == {'dnaspec-architect', 'dnaspec-agent-creator'}
+        # 'System Design' 两个词元全部命中
+        assert matches['dnaspec-architect']['score'] == 1.0
+        assert sorted(matches['dnaspec-architect']['matched_words']) == ['design', 'system']
+        # 'agent' 完整命中，'create agent' 命中一半
+        assert matches['dnaspec-agent-creator']['score'] == 1.0
+
+    def test_reregistration_rebuilds_index(self):
+        matcher = self._matcher()
+        assert matcher.match_intelligently("module split").skill_name == 'dnaspec-modulizer'
+        matcher.register_skill_keywords('dnaspec-modulizer', ['拆包'])
+        assert not any(m['skill_name'] == 'dnaspec-modulizer'
+                       for m in matcher._find_keyword_matches("module split"))
+
+    def test_automaton_finds_overlapping_patterns(self):
+        from src.dna_spec_kit_integration.core.matcher import KeywordAutomaton
+        automaton = KeywordAutomaton(['he', 'she', 'his', 'hers', '系统', '系统设计'])
+        found = {automaton.patterns[i] for i in automaton.find('ushers 系统设计')}
+        assert found == {'he', 'she', 'hers', '系统', '系统设计'}
+
+
+class TestBatchMatching:
+    """批量匹配"""
+
+    REQUESTS = ["设计系统架构", "create agent", "无关文本", "设计系统架构", "/speckit.dnaspec.architect 电商", ""]
+
+    def _matcher(self):
+        matcher = IntelligentMatcher()
+        matcher.register_skill_keywords('dnaspec-architect', ['架构', '系统设计', 'architecture'])
+        matcher.register_skill_keywords('dnaspec-agent-creator', ['智能体', 'agent', 'create'])
+        return matcher
+
+    @staticmethod
+    def _summary(result):
+        return None if result is None else (result.skill_name, result.confidence, sorted(result.matched_keywords))
+
+    def test_batch_matches_single_requests(self):
+        matcher = self._matcher()
+        expected = [self._summary(matcher.match_intelligently(r)) for r in self.REQUESTS]
+        assert [self._summary(r) for r in matcher.match_batch(self.REQUESTS)] == expected
+
+    def test_batch_streams_lazily(self):
+        matcher = self._matcher()
+        pulled = []
+
+        def requests():
+            for request in self.REQUESTS:
+                pulled.append(request)
+                yield request
+
+        results = matcher.match_batch(requests())
+        next(results)
+        assert len(pulled) == 1
+
+    def test_duplicate_results_are_independent(self):
+        matcher = self._matcher()
+        first, second = matcher.match_batch(["设计系统架构", "设计系统架构"])
+        first.matched_keywords.append('mutated')
+        assert 'mutated' not in second.matched_keywords
+
+    def test_batch_with_process_pool(self):
+        matcher = self._matcher()
+        expected = [self._summary(matcher.match_intelligently(r)) for r in self.REQUESTS * 3]
+        results = matcher.match_batch(self.REQUESTS * 3, workers=2, chunk_size=4)
+        assert [self._summary(r) for r in results] == expected
+
+    def test_broken_process_pool_falls_back_to_serial(self, monkeypatch):
+        from concurrent.futures import Future
+        from concurrent.futures.process import BrokenProcessPool
+        from src.dna_spec_kit_integration.core import matcher as matcher_module
+
+        class BrokenAfterFirstChunk:
+            """第一块正常完成，之后的块因工作进程崩溃而失败"""
+
+            def __init__(self, *args, **kwargs):
+                self.submitted = 0
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def submit(self, fn, chunk):
+                self.submitted += 1
+                future = Future()
+                if self.submitted == 1:
+                    future.set_result([matcher.match_intelligently(r) for r in chunk])
+                else:
+                    future.set_exception(BrokenProcessPool('worker died'))
+                return future
+
+        monkeypatch.setattr(matcher_module, 'ProcessPoolExecutor', BrokenAfterFirstChunk)
+        matcher = self._matcher()
+        expected = [self._summary(matcher.match_intelligently(r)) for r in self.REQUESTS * 3]
+        results = matcher.match_batch(iter(self.REQUESTS * 3), workers=2, chunk_size=4)
+        assert [self._summary(r) for r in results] == expected
+
+    def test_skill_manager_batch_api(self):
+        from src.dna_spec_kit_integration.core.manager import SkillManager
+        from src.dna_spec_kit_integration.core.skill import DNASpecSkill
+
+        class ArchitectSkill(DNASpecSkill):
+            def _execute_skill_logic(self, request, context):
+                return request
+
+        manager = SkillManager()
+        manager.register_skill(ArchitectSkill('dnaspec-architect', '系统架构设计'))
+        requests = ["设计系统架构", "无关文本"]
+        expected = [manager.match_skill_intelligently(r) for r in requests]
+        results = list(manager.match_skills_batch(requests))
+        assert [r and r['skill_name'] for r in results] == [e and e['skill_name'] for e in expected]
+        assert results[0]['skill_name'] == 'dnaspec-architect'
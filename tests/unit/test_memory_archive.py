@@ -0,0 +1,128 @@
+"""
+记忆归档单元测试
+"""
+import sys
+import os
+import gzip
+import json
+import time
+from datetime import datetime
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering.memory.archive import (
+    ArchiveIntegrityError,
+    export_store,
+    import_memories,
+    iter_archive,
+    manifest_path_for,
+    verify_archive
+)
+from src.dna_context_engineering.memory.model import MemoryConfig, MemoryType
+from src.dna_context_engineering.memory.manager import MemoryManager
+from src.dna_context_engineering.memory.store import MemoryStore
+from src.dna_context_engineering.memory.skill_memory_integration import (
+    SkillsMemoryManager,
+    TaskDecomposerWithMemory
+)
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def populated_store(request, tmp_path):
+    store = MemoryStore(tmp_path / "source", backend=request.param)
+    manager = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path / "source", backend=request.param))
+    for i in range(5):
+        manager.add_memory("agent-a", f"设计决策 {i}")
+    manager.add_memory("agent-b", "long term fact", memory_type=MemoryType.LONG_TERM)
+    manager.store.close()
+    yield store
+    store.close()
+
+
+class TestMemoryArchive:
+    """流式导出/导入"""
+
+    def test_round_trip_compressed(self, populated_store, tmp_path):
+        archive = tmp_path / "backup.ndjson.gz"
+        manifest = export_store(populated_store, archive)
+
+        assert manifest["record_count"] == 6
+        assert manifest["agents"] == {"agent-a": 5, "agent-b": 1}
+        assert manifest["compressed"] is True
+        with gzip.open(archive, "rt", encoding="utf-8") as f:
+            assert len(f.readlines()) == 6
+
+        target = MemoryStore(tmp_path / "target", backend="sqlite")
+        try:
+            assert import_memories(target, archive) == {"agent-a": 5, "agent-b": 1}
+            assert target.get_stats("agent-a").total_memories == 5
+            assert target.get_stats("agent-b").long_term_count == 1
+            # 导入后的记忆可以被检索
+            assert len(target.search_memories("agent-a", "设计决策")) == 5
+        finally:
+            target.close()
+
+    def test_uncompressed_archive(self, populated_store, tmp_path):
+        archive = tmp_path / "backup.ndjson"
+        export_store(populated_store, archive, agent_ids=["agent-b"])
+        records = [json.loads(line) for line in archive.read_text(encoding="utf-8").splitlines()]
+        assert [r["agent_id"] for r in records] == ["agent-b"]
+
+    def test_incremental_since(self, populated_store, tmp_path):
+        time.sleep(0.05)
+        cutoff = datetime.now()
+        time.sleep(0.05)
+        manager = MemoryManager(MemoryConfig(
+            enabled=True, storage_path=populated_store.storage_path, backend=populated_store.backend_name
+        ))
+        manager.add_memory("agent-a", "new after cutoff")
+        manager.store.close()
+
+        archive = tmp_path / "incremental.ndjson.gz"
+        manifest = export_store(populated_store, archive, since=cutoff)
+        assert manifest["incremental"] is True
+        assert manifest["record_count"] == 1
+        assert [m.content for m in iter_archive(archive)] == ["new after cutoff"]
+
+    def test_tampered_archive_is_rejected(self, populated_store, tmp_path):
+        archive = tmp_path / "backup.ndjson"
+        export_store(populated_store, archive)
+        with open(archive, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"tampered": True}) + "\n")
+
+        with pytest.raises(ArchiveIntegrityError):
+            verify_archive(archive)
+        with pytest.raises(ArchiveIntegrityError):
+            list(iter_archive(archive))
+
+    def test_missing_manifest(self, populated_store, tmp_path):
+        archive = tmp_path / "backup.ndjson"
+        export_store(populated_store, archive)
+        manifest_path_for(archive).unlink()
+        with pytest.raises(ArchiveIntegrityError):
+            verify_archive(archive)
+
+
+class TestSkillsMemoryArchive:
+    """SkillsMemoryManager 导出归档"""
+
+    def test_export_memory_archive(self, tmp_path):
+        class _Decomposer:
+            def execute_skill(self, input_data):
+                return {"subtasks": ["a", "b"]}
+
+        skill = TaskDecomposerWithMemory(
+            _Decomposer(),
+            enable_memory=True,
+            memory_config=MemoryConfig(enabled=True, storage_path=tmp_path / "mem")
+        )
+        skill.execute({"input": "构建电商系统"})
+
+        manager = SkillsMemoryManager()
+        manager.register_skill(skill)
+        manifest = manager.export_memory_archive(tmp_path / "skills.ndjson.gz")
+
+        assert manifest["record_count"] >= 2
+        assert list(manifest["agents"]) == [skill.skill_id]
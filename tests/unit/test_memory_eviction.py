@@ -0,0 +1,160 @@
+"""
+记忆淘汰索引单元测试
+"""
+import sys
+import os
+from datetime import datetime, timedelta
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering.memory.eviction import DecayEvictionIndex
+from src.dna_context_engineering.memory.model import (
+    MemoryItem,
+    MemoryType,
+    MemoryImportance,
+    MemoryConfig
+)
+from src.dna_context_engineering.memory.manager import MemoryManager
+
+
+def _memory(memory_id, importance=MemoryImportance.MEDIUM, days_old=0, access_count=0,
+            memory_type=MemoryType.SHORT_TERM):
+    created = datetime.now() - timedelta(days=days_old)
+    return MemoryItem(
+        memory_id=memory_id,
+        agent_id="agent",
+        memory_type=memory_type,
+        content=memory_id,
+        importance=importance,
+        created_at=created,
+        accessed_at=created,
+        access_count=access_count
+    )
+
+
+class TestDecayEvictionIndex:
+    """衰减分数最小堆"""
+
+    def test_pops_lowest_score_first(self):
+        index = DecayEvictionIndex()
+        index.build("agent", [
+            _memory("critical", MemoryImportance.CRITICAL),
+            _memory("old-low", MemoryImportance.LOW, days_old=60),
+            _memory("new-low", MemoryImportance.LOW),
+        ])
+
+        assert index.pop_lowest("agent", "short_term") == "old-low"
+        assert index.pop_lowest("agent", "short_term") == "new-low"
+        assert index.count("agent", "short_term") == 1
+
+    def test_updates_and_removals_are_respected(self):
+        index = DecayEvictionIndex()
+        index.build("agent", [_memory("a", MemoryImportance.LOW), _memory("b", MemoryImportance.MEDIUM)])
+
+        # a 被频繁访问后分数超过 b
+        index.upsert(_memory("a", MemoryImportance.LOW, access_count=10))
+        assert index.pop_lowest("agent", "short_term") == "b"
+
+        index.remove("agent", "a")
+        assert index.pop_lowest("agent", "short_term") is None
+
+    def test_type_change_moves_between_heaps(self):
+        index = DecayEvictionIndex()
+        index.build("agent", [_memory("a")])
+        index.upsert(_memory("a", memory_type=MemoryType.LONG_TERM))
+
+        assert index.count("agent", "short_term") == 0
+        assert index.count("agent", "long_term") == 1
+        assert index.pop_lowest("agent", "short_term") is None
+
+    def test_untracked_agent_is_ignored(self):
+        index = DecayEvictionIndex()
+        index.upsert(_memory("a"))
+        assert not index.is_tracked("agent")
+        assert index.pop_lowest("agent", "short_term") is None
+
+    def test_eviction_uses_scores_at_eviction_time(self, monkeypatch):
+        from src.dna_context_engineering.memory import eviction, model
+
+        start = datetime(2026, 1, 1)
+
+        class Clock(datetime):
+            current = start
+
+            @classmethod
+            def now(cls, tz=None):
+                return cls.current
+
+        monkeypatch.setattr(model, "datetime", Clock)
+        monkeypatch.setattr(eviction, "datetime", Clock)
+
+        def memory(memory_id, importance, created):
+            return MemoryItem(memory_id=memory_id, agent_id="agent", memory_type=MemoryType.SHORT_TERM,
+                              content=memory_id, importance=importance,
+                              created_at=created, accessed_at=created)
+
+        index = DecayEvictionIndex()
+        # 建索引时 new-medium (0.5) 高于 old-high (0.43)
+        index.build("agent", [
+            memory("new-medium", MemoryImportance.MEDIUM, start),
+            memory("old-high", MemoryImportance.HIGH, start - timedelta(days=29)),
+        ])
+
+        # 40天后 new-medium 衰减到 0.3，old-high 截断后为 0.42
+        Clock.current = start + timedelta(days=40)
+        assert index.pop_lowest("agent", "short_term") == "new-medium"
+        assert index.pop_lowest("agent", "short_term") == "old-high"
+
+    def test_heap_compacts_on_repeated_updates(self):
+        index = DecayEvictionIndex()
+        index.build("agent", [_memory("a")])
+        for i in range(500):
+            index.upsert(_memory("a", access_count=i % 10))
+        assert len(index._agents["agent"].heaps["short_term"]) <= 2 + 64 + 1
+
+
+class TestManagerLimits:
+    """MemoryManager 在插入时执行上限"""
+
+    def test_add_memory_enforces_short_term_limit(self, tmp_path):
+        manager = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path, max_short_term=3))
+        keep = manager.add_memory("agent", "critical error in payment")
+        for i in range(5):
+            manager.add_memory("agent", f"note {i}", importance=MemoryImportance.LOW)
+
+        stats = manager.get_stats("agent")
+        assert stats["short_term_count"] == 3
+        assert stats["evicted_memories"] == 3
+        assert manager.store.load_memory(keep, "agent") is not None
+
+    def test_long_term_limit_is_independent(self, tmp_path):
+        manager = MemoryManager(MemoryConfig(
+            enabled=True, storage_path=tmp_path, max_short_term=2, max_long_term=5
+        ))
+        for i in range(4):
+            manager.add_memory("agent", f"long {i}", memory_type=MemoryType.LONG_TERM)
+        for i in range(4):
+            manager.add_memory("agent", f"short {i}")
+
+        stats = manager.get_stats("agent")
+        assert stats["long_term_count"] == 4
+        assert stats["short_term_count"] == 2
+
+    def test_auto_cleanup_disabled_keeps_everything(self, tmp_path):
+        manager = MemoryManager(MemoryConfig(
+            enabled=True, storage_path=tmp_path, max_short_term=1, auto_cleanup=False
+        ))
+        for i in range(3):
+            manager.add_memory("agent", f"note {i}")
+        assert manager.get_stats("agent")["short_term_count"] == 3
+
+    def test_cleanup_uses_existing_storage(self, tmp_path):
+        loose = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path, auto_cleanup=False))
+        for i in range(6):
+            loose.add_memory("agent", f"note {i}")
+
+        strict = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path, max_short_term=2))
+        strict.cleanup("agent")
+        assert strict.get_stats("agent")["short_term_count"] == 2
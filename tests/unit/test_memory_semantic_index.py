@@ -0,0 +1,139 @@
+"""
+记忆语义索引单元测试
+"""
+import sys
+import os
+import time
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering.memory.semantic_index import (
+    HashedNgramVectorizer,
+    SemanticMemoryIndex
+)
+from src.dna_context_engineering.memory.model import MemoryConfig, MemoryType
+from src.dna_context_engineering.memory.manager import MemoryManager, RECALL_KEYWORD
+
+
+class TestHashedNgramVectorizer:
+    """哈希 n-gram 向量化"""
+
+    def test_vectors_are_normalized_and_stable(self):
+        vectorizer = HashedNgramVectorizer(dim=64)
+        a = vectorizer.transform("decompose the checkout flow")
+        b = HashedNgramVectorizer(dim=64).transform("decompose the checkout flow")
+        assert a.dtype == np.float32
+        assert abs(float(np.linalg.norm(a)) - 1.0) < 1e-5
+        assert np.array_equal(a, b)
+
+    def test_word_variants_are_similar(self):
+        vectorizer = HashedNgramVectorizer()
+        base = vectorizer.transform("payment processing")
+        variant = vectorizer.transform("process payments")
+        unrelated = vectorizer.transform("frontend styling")
+        assert float(base @ variant) > float(base @ unrelated)
+
+    def test_empty_text(self):
+        assert not HashedNgramVectorizer().transform("!!!").any()
+
+
+class TestSemanticMemoryIndex:
+    """向量文件与 top-k 检索"""
+
+    def test_search_persists_and_filters(self, tmp_path):
+        index = SemanticMemoryIndex(tmp_path, dim=128)
+        index.add_documents("a", [
+            ("m1", "short_term", "user authentication with oauth tokens"),
+            ("m2", "long_term", "authenticate users via oauth"),
+            ("m3", "short_term", "render charts in dashboard"),
+        ])
+
+        results = SemanticMemoryIndex(tmp_path, dim=128).search("a", "oauth authentication", limit=2)
+        assert {memory_id for memory_id, _ in results} == {"m1", "m2"}
+
+        long_term = index.search("a", "oauth authentication", memory_type="long_term")
+        assert [memory_id for memory_id, _ in long_term] == ["m2"]
+
+    def test_replace_remove_and_compact(self, tmp_path):
+        index = SemanticMemoryIndex(tmp_path, dim=32)
+        for i in range(100):
+            index.add_document("a", "m1", "short_term", f"version {i}")
+        index.add_document("a", "m2", "short_term", "kept")
+        index.remove_document("a", "m2")
+
+        reloaded = SemanticMemoryIndex(tmp_path, dim=32)
+        assert reloaded.document_count("a") == 1
+        assert (tmp_path / "a.f32").stat().st_size < 100 * 32 * 4
+        assert reloaded.search("a", "version 99")[0][0] == "m1"
+
+    def test_truncated_write_is_recovered(self, tmp_path):
+        index = SemanticMemoryIndex(tmp_path, dim=16)
+        index.add_document("a", "m1", "short_term", "alpha")
+        with open(tmp_path / "a.ids.jsonl", "a", encoding="utf-8") as f:
+            f.write('{"id": "broken')
+
+        recovered = SemanticMemoryIndex(tmp_path, dim=16)
+        recovered.add_document("a", "m2", "short_term", "beta")
+        assert SemanticMemoryIndex(tmp_path, dim=16).search("a", "beta")[0][0] == "m2"
+
+    def test_large_search_is_fast(self, tmp_path):
+        index = SemanticMemoryIndex(tmp_path, dim=256)
+        rows = 100_000
+        vectors = np.random.default_rng(0).standard_normal((rows, 256)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors.tofile(tmp_path / "big.f32")
+        with open(tmp_path / "big.ids.jsonl", "w", encoding="utf-8") as f:
+            for i in range(rows):
+                f.write(f'{{"id": "m{i}", "type": "short_term"}}\n')
+
+        index.search("big", "warm up", min_score=-1.0)
+        start = time.perf_counter()
+        results = index.search("big", "database migration", limit=10, min_score=-1.0)
+        elapsed = time.perf_counter() - start
+        assert len(results) == 10
+        assert elapsed < 0.5
+
+
+class TestManagerSemanticRecall:
+    """MemoryManager 语义检索模式"""
+
+    def test_semantic_recall_matches_paraphrase(self, tmp_path):
+        manager = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path, semantic_recall=True))
+        manager.add_memory("agent", "decomposed the payments processing service into modules")
+        manager.add_memory("agent", "styled the landing page")
+
+        # 关键词模式下词形不同无法命中
+        assert manager.recall_memories("agent", "payment processor", mode=RECALL_KEYWORD) == []
+
+        results = manager.recall_memories("agent", "payment processor")
+        assert results and "payments" in results[0].content
+
+    def test_semantic_mode_requires_config(self, tmp_path):
+        manager = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path))
+        manager.add_memory("agent", "note")
+        with pytest.raises(RuntimeError):
+            manager.recall_memories("agent", "note", mode="semantic")
+        with pytest.raises(ValueError):
+            manager.recall_memories("agent", "note", mode="fuzzy")
+
+    def test_index_built_for_existing_memories(self, tmp_path):
+        plain = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path))
+        plain.add_memory("agent", "architecture review of microservices", memory_type=MemoryType.LONG_TERM)
+
+        semantic = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path, semantic_recall=True))
+        assert len(semantic.recall_memories("agent", "microservice architecture")) == 1
+
+    def test_existing_memories_indexed_after_first_semantic_save(self, tmp_path):
+        plain = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path))
+        for i in range(3):
+            plain.add_memory("agent", f"payments service refactor step {i}")
+
+        # 启用语义检索后的第一次保存不能让旧记忆被漏掉
+        semantic = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path, semantic_recall=True))
+        semantic.add_memory("agent", "payments gateway timeout")
+        assert len(semantic.recall_memories("agent", "payment service")) == 4
+        assert semantic.store.semantic_index.document_count("agent") == 4
@@ -0,0 +1,276 @@
+"""
+记忆存储后端单元测试
+"""
+import sys
+import os
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering.memory.model import (
+    MemoryItem,
+    MemoryType,
+    MemoryImportance,
+    MemoryConfig
+)
+from src.dna_context_engineering.memory.store import MemoryStore
+from src.dna_context_engineering.memory.backends import (
+    JsonFileBackend,
+    SQLiteBackend,
+    migrate_backend
+)
+from src.dna_context_engineering.memory.manager import MemoryManager
+
+
+def _make_memory(memory_id, agent_id="agent-1", memory_type=MemoryType.SHORT_TERM,
+                 content="记忆内容", importance=MemoryImportance.MEDIUM):
+    return MemoryItem(
+        memory_id=memory_id,
+        agent_id=agent_id,
+        memory_type=memory_type,
+        content=content,
+        importance=importance,
+        tags=["t"],
+        metadata={"k": "v"}
+    )
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    store = MemoryStore(tmp_path, backend=request.param)
+    yield store
+    store.close()
+
+
+class TestMemoryStoreBackends:
+    """MemoryStore在各后端上的行为一致"""
+
+    def test_save_and_load(self, store):
+        store.save_memory(_make_memory("m1"))
+        loaded = store.load_memory("m1", "agent-1")
+        assert loaded is not None
+        assert loaded.content == "记忆内容"
+        assert loaded.tags == ["t"]
+        assert loaded.metadata == {"k": "v"}
+        assert store.load_memory("missing", "agent-1") is None
+
+    def test_load_agent_memories_filters_type(self, store):
+        store.save_memory(_make_memory("m1"))
+        store.save_memory(_make_memory("m2", memory_type=MemoryType.LONG_TERM))
+        store.save_memory(_make_memory("m3", agent_id="agent-2"))
+
+        assert len(store.load_agent_memories("agent-1")) == 2
+        long_term = store.load_agent_memories("agent-1", MemoryType.LONG_TERM)
+        assert [m.memory_id for m in long_term] == ["m2"]
+        assert store.list_agents() == ["agent-1", "agent-2"]
+
+    def test_delete_and_stats(self, store):
+        store.save_memory(_make_memory("m1", content="abc"))
+        store.save_memory(_make_memory("m2", memory_type=MemoryType.LONG_TERM, content="de"))
+
+        stats = store.get_stats("agent-1")
+        assert stats.total_memories == 2
+        assert stats.short_term_count == 1
+        assert stats.long_term_count == 1
+        assert stats.total_size == 5
+        assert stats.oldest_memory is not None
+
+        assert store.delete_memory("m1", "agent-1") is True
+        assert store.delete_memory("m1", "agent-1") is False
+        assert store.get_stats("agent-1").total_memories == 1
+
+    def test_cleanup_low_value(self, store):
+        for i in range(5):
+            importance = MemoryImportance.CRITICAL if i == 0 else MemoryImportance.LOW
+            store.save_memory(_make_memory(f"m{i}", importance=importance))
+
+        assert store.cleanup_low_value("agent-1", keep_count=2) == 3
+        remaining = {m.memory_id for m in store.load_agent_memories("agent-1")}
+        assert len(remaining) == 2
+        assert "m0" in remaining
+
+
+class TestMigration:
+    """JSON -> SQLite 迁移"""
+
+    def test_migrate_json_to_sqlite(self, tmp_path):
+        json_backend = JsonFileBackend(tmp_path)
+        json_backend.save(_make_memory("m1"))
+        json_backend.save(_make_memory("m2", agent_id="agent-2"))
+
+        migrated = migrate_backend(tmp_path)
+        assert migrated == {"agent-1": 1, "agent-2": 1}
+
+        # 重复迁移是幂等的
+        migrate_backend(tmp_path)
+
+        sqlite_backend = SQLiteBackend(tmp_path)
+        try:
+            assert sqlite_backend.list_agents() == ["agent-1", "agent-2"]
+            assert sqlite_backend.stats("agent-1").total_memories == 1
+        finally:
+            sqlite_backend.close()
+
+    def test_unknown_backend(self, tmp_path):
+        with pytest.raises(ValueError):
+            MemoryStore(tmp_path, backend="redis")
+
+    def test_manager_uses_configured_backend(self, tmp_path):
+        manager = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path, backend="sqlite"))
+        memory_id = manager.add_memory("agent-1", "修复了一个bug")
+        assert memory_id is not None
+        assert manager.store.backend_name == "sqlite"
+        assert (tmp_path / SQLiteBackend.DB_FILENAME).exists()
+        assert manager.get_stats("agent-1")["total_memories"] == 1
+
+
+class TestAccessStatsJournal:
+    """访问统计合并写回"""
+
+    @pytest.fixture(params=["json", "sqlite"])
+    def manager(self, request, tmp_path):
+        manager = MemoryManager(MemoryConfig(
+            enabled=True,
+            storage_path=tmp_path,
+            backend=request.param,
+            access_flush_interval=3600,
+            access_flush_threshold=1000
+        ))
+        yield manager
+        manager.store.close()
+
+    def test_recall_is_buffered_then_flushed(self, manager):
+        memory_id = manager.add_memory("agent", "cache invalidation strategy")
+        for _ in range(3):
+            manager.recall_memories("agent", "cache")
+
+        # 未写回时后端仍是旧值，但通过存储加载能看到最新统计
+        assert manager.store.backend.load(memory_id, "agent").access_count == 0
+        assert manager.store.load_memory(memory_id, "agent").access_count == 3
+        assert manager.get_stats("agent")["pending_access_updates"] == 1
+
+        assert manager.flush() == 1
+        assert manager.store.backend.load(memory_id, "agent").access_count == 3
+        assert manager.store.access_journal.pending_count == 0
+
+    def test_threshold_triggers_flush(self, manager):
+        manager.store.access_journal.flush_threshold = 2
+        first = manager.add_memory("agent", "alpha note")
+        manager.add_memory("agent", "beta note")
+
+        manager.recall_memories("agent", "alpha")
+        assert manager.store.backend.load(first, "agent").access_count == 0
+        manager.recall_memories("agent", "note")
+        assert manager.store.backend.load(first, "agent").access_count == 2
+
+    def test_save_between_flushes_does_not_double_count(self, manager):
+        memory_id = manager.add_memory("agent", "promotion candidate")
+        manager.recall_memories("agent", "promotion")
+        manager.promote_to_long_term(memory_id, "agent")
+        manager.flush()
+
+        memory = manager.store.backend.load(memory_id, "agent")
+        assert memory.access_count == 1
+        assert memory.memory_type == MemoryType.LONG_TERM
+
+    def test_deleted_memory_is_discarded(self, manager):
+        manager.add_memory("agent", "ephemeral")
+        manager.recall_memories("agent", "ephemeral")
+        manager.clear_all("agent")
+        assert manager.store.access_journal.pending_count == 0
+
+
+class TestMemoryItemCache:
+    """已解析记忆的缓存"""
+
+    @pytest.fixture(params=["json", "sqlite"])
+    def store(self, request, tmp_path):
+        store = MemoryStore(tmp_path, backend=request.param)
+        yield store
+        store.close()
+
+    def test_repeated_loads_hit_cache(self, store):
+        store.save_memory(_make_memory("m1"))
+        store.load_agent_memories("agent-1")
+        store.load_agent_memories("agent-1")
+        store.load_agent_memories("agent-1", MemoryType.LONG_TERM)
+
+        stats = store.cache.stats()
+        assert stats['misses'] == 1
+        assert stats['hits'] == 2
+        assert stats['cached_memories'] == 1
+
+    def test_own_writes_update_cache(self, store):
+        store.save_memory(_make_memory("m1"))
+        store.load_agent_memories("agent-1")
+
+        store.save_memory(_make_memory("m2"))
+        store.delete_memory("m1", "agent-1")
+        memories = store.load_agent_memories("agent-1")
+
+        assert [m.memory_id for m in memories] == ["m2"]
+        assert store.cache.stats()['misses'] == 1
+
+    def test_returned_items_are_copies(self, store):
+        store.save_memory(_make_memory("m1"))
+        store.load_agent_memories("agent-1")[0].content = "changed"
+        assert store.load_agent_memories("agent-1")[0].content == "记忆内容"
+
+    def test_external_write_invalidates(self, store, tmp_path):
+        store.save_memory(_make_memory("m1"))
+        store.load_agent_memories("agent-1")
+
+        other = MemoryStore(tmp_path, backend=store.backend_name, cache_max_agents=0)
+        try:
+            other.save_memory(_make_memory("m2"))
+        finally:
+            other.close()
+
+        assert len(store.load_agent_memories("agent-1")) == 2
+        assert store.cache.stats()['invalidations'] == 1
+
+    def test_interleaved_writes_from_two_stores(self, store, tmp_path):
+        store.save_memory(_make_memory("m1"))
+        store.load_agent_memories("agent-1")
+
+        other = MemoryStore(tmp_path, backend=store.backend_name)
+        try:
+            other.save_memory(_make_memory("m2"))
+            # 本存储的写入不能把对方的修改吸收进过期缓存
+            store.save_memory(_make_memory("m3"))
+            assert sorted(m.memory_id for m in store.load_agent_memories("agent-1")) == ["m1", "m2", "m3"]
+
+            other.load_agent_memories("agent-1")
+            store.delete_memory("m3", "agent-1")
+            assert sorted(m.memory_id for m in other.load_agent_memories("agent-1")) == ["m1", "m2"]
+        finally:
+            other.close()
+
+    def test_in_place_rewrite_by_other_store_invalidates(self, store, tmp_path):
+        store.save_memory(_make_memory("m1", content="hello"))
+        assert store.load_agent_memories("agent-1")[0].content == "hello"
+
+        other = MemoryStore(tmp_path, backend=store.backend_name, cache_max_agents=0)
+        try:
+            other.save_memory(_make_memory("m1", content="CHANGED"))
+        finally:
+            other.close()
+
+        assert store.load_agent_memories("agent-1")[0].content == "CHANGED"
+
+    def test_lru_bound(self, tmp_path):
+        store = MemoryStore(tmp_path, cache_max_agents=2)
+        for agent in ("a", "b", "c"):
+            store.save_memory(_make_memory("m1", agent_id=agent))
+            store.load_agent_memories(agent)
+        assert store.cache.stats()['cached_agents'] == 2
+
+    def test_manager_stats_expose_cache(self, tmp_path):
+        manager = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path))
+        manager.add_memory("agent", "note")
+        manager.get_recent_memories("agent")
+        manager.get_recent_memories("agent")
+        cache_stats = manager.get_stats("agent")['cache']
+        assert cache_stats['hits'] >= 1
+        assert cache_stats['misses'] == 1
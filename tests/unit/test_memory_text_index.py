@@ -0,0 +1,126 @@
+"""
+记忆全文索引单元测试
+"""
+import sys
+import os
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering.memory.text_index import MemoryTextIndex, tokenize
+from src.dna_context_engineering.memory.model import MemoryConfig, MemoryImportance, MemoryItem, MemoryType
+from src.dna_context_engineering.memory.backends import JsonFileBackend
+from src.dna_context_engineering.memory.store import MemoryStore
+from src.dna_context_engineering.memory.manager import MemoryManager
+
+
+def _memory(memory_id, content, agent_id="agent"):
+    return MemoryItem(memory_id=memory_id, agent_id=agent_id, memory_type=MemoryType.SHORT_TERM,
+                      content=content, importance=MemoryImportance.MEDIUM)
+
+
+class TestTokenize:
+    """混合分词"""
+
+    def test_latin_words(self):
+        assert tokenize("Fix Login BUG") == ["fix", "login", "bug"]
+
+    def test_cjk_bigrams(self):
+        assert tokenize("用户登录") == ["用户", "户登", "登录"]
+        assert tokenize("修") == ["修"]
+
+    def test_mixed(self):
+        assert tokenize("修复bug, API_v2") == ["修复", "bug", "api_v2"]
+
+
+class TestMemoryTextIndex:
+    """倒排索引与BM25"""
+
+    def test_ranked_search(self, tmp_path):
+        index = MemoryTextIndex(tmp_path)
+        index.add_document("a", "m1", "short_term", "database migration plan")
+        index.add_document("a", "m2", "short_term", "database database index tuning")
+        index.add_document("a", "m3", "long_term", "frontend layout")
+
+        results = index.search("a", "database index")
+        assert [memory_id for memory_id, _ in results] == ["m2", "m1"]
+        assert index.search("a", "layout", memory_type="short_term") == []
+        assert index.search("a", "") == []
+
+    def test_persistence_and_removal(self, tmp_path):
+        index = MemoryTextIndex(tmp_path)
+        index.add_document("a", "m1", "short_term", "用户登录失败")
+        index.add_document("a", "m2", "short_term", "订单支付")
+        index.remove_document("a", "m2")
+
+        reloaded = MemoryTextIndex(tmp_path)
+        assert reloaded.indexed_ids("a") == {"m1"}
+        assert [m for m, _ in reloaded.search("a", "登录")] == ["m1"]
+
+    def test_compaction(self, tmp_path):
+        index = MemoryTextIndex(tmp_path)
+        index.COMPACT_MIN = 2
+        for i in range(10):
+            index.add_document("a", "m1", "short_term", f"revision {i}")
+
+        lines = (tmp_path / "a.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) <= 3
+        assert MemoryTextIndex(tmp_path).search("a", "revision 9")[0][0] == "m1"
+
+
+class TestManagerRecall:
+    """MemoryManager.recall_memories 使用索引"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        return MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path))
+
+    def test_multi_word_query_matches_without_exact_phrase(self, manager):
+        manager.add_memory("agent", "login page returns error after password reset")
+        manager.add_memory("agent", "unrelated note about styling")
+
+        results = manager.recall_memories("agent", "password login")
+        assert len(results) == 1
+        assert results[0].access_count == 1
+
+    def test_type_filter_and_limit(self, manager):
+        for i in range(5):
+            manager.add_memory("agent", f"任务分解 第{i}次", memory_type=MemoryType.LONG_TERM)
+        manager.add_memory("agent", "任务分解 短期")
+
+        assert len(manager.recall_memories("agent", "任务分解", limit=3)) == 3
+        long_term = manager.recall_memories("agent", "任务分解", memory_type=MemoryType.LONG_TERM)
+        assert len(long_term) == 5
+
+    def test_index_rebuilt_for_existing_storage(self, manager, tmp_path):
+        manager.add_memory("agent", "architecture review")
+        manager.store.text_index.clear("agent")
+
+        fresh = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path))
+        assert len(fresh.recall_memories("agent", "architecture")) == 1
+
+    def test_deleted_memories_not_recalled(self, manager):
+        manager.add_memory("agent", "temporary debug note")
+        assert manager.clear_all("agent") == 1
+        assert manager.recall_memories("agent", "debug") == []
+
+    def test_storage_from_before_the_index_is_fully_indexed(self, tmp_path):
+        # 建立索引之前写入的记忆：只有JSON文件，没有 index/ 目录
+        backend = JsonFileBackend(tmp_path)
+        for i in range(3):
+            backend.save(_memory(f"old-{i}", f"database note {i}"))
+
+        manager = MemoryManager(MemoryConfig(enabled=True, storage_path=tmp_path))
+        manager.add_memory("agent", "database migration")
+        assert len(manager.recall_memories("agent", "database")) == 4
+
+    def test_memories_written_by_another_store_are_recalled(self, tmp_path):
+        first = MemoryStore(tmp_path)
+        second = MemoryStore(tmp_path)
+        first.save_memory(_memory("a", "cache design"))
+        assert [m.memory_id for m in first.search_memories("agent", "cache")] == ["a"]
+
+        second.save_memory(_memory("b", "cache eviction"))
+        second.delete_memory("a", "agent")
+        assert [m.memory_id for m in first.search_memories("agent", "cache")] == ["b"]
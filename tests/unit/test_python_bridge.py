@@ -0,0 +1,87 @@
+"""
+Python桥接器入口注册表单元测试
+"""
+import sys
+import os
+import json
+import time
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core.python_bridge import PythonBridge, SkillResolutionError
+
+
+SKILL_TEMPLATE = '''
+def execute(args):
+    return "{tag}:" + args.get("tool_name", "")
+'''
+
+
+@pytest.fixture
+def skill_module(tmp_path, monkeypatch):
+    """在临时目录中放置一个可导入的技能模块"""
+    module_file = tmp_path / "bridge_probe_skill.py"
+    module_file.write_text(SKILL_TEMPLATE.format(tag="v1"), encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    PythonBridge.clear_registry()
+    yield module_file
+    PythonBridge.clear_registry()
+    sys.modules.pop("bridge_probe_skill", None)
+
+
+def _fail_resolution(*args, **kwargs):
+    raise AssertionError("不应再次逐个尝试导入路径")
+
+
+def _bridge(**kwargs):
+    return PythonBridge(skills_base_path="nonexistent_skills_pkg", **kwargs)
+
+
+def test_resolution_is_cached_across_instances(skill_module, monkeypatch):
+    bridge = _bridge()
+    result = bridge.execute_skill_with_json_params("bridge_probe_skill", {"tool_name": "x"})
+    assert result == {
+        'success': True, 'result': 'v1:x', 'skill': 'bridge_probe_skill', 'module_path': 'bridge_probe_skill'
+    }
+
+    monkeypatch.setattr(PythonBridge, "_resolve_uncached", _fail_resolution)
+    again = _bridge().execute_skill_with_json_params("bridge_probe_skill", {"tool_name": "y"})
+    assert again['result'] == 'v1:y'
+
+
+def test_manifest_skips_failed_candidates(skill_module, tmp_path, monkeypatch):
+    manifest = tmp_path / "manifest.json"
+    _bridge(manifest_path=str(manifest)).resolve("bridge_probe_skill", json_params=True)
+    entries = json.loads(manifest.read_text(encoding="utf-8"))["entries"]
+    assert entries["json:bridge_probe_skill"]["module_path"] == "bridge_probe_skill"
+
+    # 新进程：注册表为空，但清单直接给出模块路径
+    PythonBridge.clear_registry()
+    monkeypatch.setattr(PythonBridge, "_resolve_uncached", _fail_resolution)
+    entry = _bridge(manifest_path=str(manifest)).resolve("bridge_probe_skill", json_params=True)
+    assert entry.execute({"tool_name": "z"}) == "v1:z"
+
+
+def test_auto_reload_on_mtime_change(skill_module):
+    bridge = _bridge(auto_reload=True)
+    assert bridge.execute_skill_with_json_params("bridge_probe_skill", {})['result'] == 'v1:'
+
+    skill_module.write_text(SKILL_TEMPLATE.format(tag="v2"), encoding="utf-8")
+    future = time.time() + 10
+    os.utime(skill_module, (future, future))
+    assert bridge.execute_skill_with_json_params("bridge_probe_skill", {})['result'] == 'v2:'
+
+    # 未开启自动重载的实例继续使用注册表中的入口
+    assert _bridge().execute_skill_with_json_params("bridge_probe_skill", {})['result'] == 'v2:'
+
+
+def test_missing_skill_reports_error_without_output(skill_module, capsys):
+    bridge = _bridge()
+    result = bridge.execute_skill_with_json_params("no_such_skill_module", {})
+    assert result['success'] is False
+    assert 'Failed to import skill module' in result['error']
+    with pytest.raises(SkillResolutionError):
+        bridge.resolve("no_such_skill_module", json_params=True)
+    assert capsys.readouterr().out == ""
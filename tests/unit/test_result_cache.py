@@ -0,0 +1,260 @@
+"""
+技能结果缓存单元测试
+"""
+import sys
+import os
+import json
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core import result_cache
+from src.dna_spec_kit_integration.core.result_cache import (
+    CacheConfig,
+    TieredResultCache,
+    make_cache_key,
+    read_cache_stats
+)
+from src.dna_spec_kit_integration.skills.dnaspec_init import DNASPECInitSkill
+
+
+@pytest.fixture
+def initialized_project(tmp_path):
+    skill = DNASPECInitSkill(str(tmp_path))
+    skill._create_dnaspec_structure()
+    skill._setup_caching_system()
+    return skill
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(result_cache.time, "time", fake.time)
+    return fake
+
+
+def test_config_written_by_init_is_honored(initialized_project):
+    config = CacheConfig.load(initialized_project.dnaspec_dir)
+    assert config.file_ttl == 3600
+    assert config.memory_ttl == 1800
+    assert config.max_cache_size_mb == 512
+    assert initialized_project.get_result_cache() is not None
+
+
+def test_make_cache_key_is_order_independent():
+    assert make_cache_key({"a": 1, "b": 2}) == make_cache_key({"b": 2, "a": 1})
+    assert make_cache_key("x", 1) != make_cache_key("x", 2)
+
+
+def test_memory_then_disk_tiers(initialized_project):
+    cache = initialized_project.get_result_cache()
+    cache.put("k", {"result": [1, 2]})
+    cache.flush()
+    assert cache.get("k") == {"result": [1, 2]}
+
+    # 新实例只能从磁盘层命中，命中后提升到内存层
+    reopened = TieredResultCache(initialized_project.dnaspec_dir)
+    assert reopened.get("k") == {"result": [1, 2]}
+    assert reopened.get("k") == {"result": [1, 2]}
+    stats = reopened.get_stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert reopened.get("missing", "default") == "default"
+
+
+def test_ttl_expiry(tmp_path, clock):
+    cache = TieredResultCache(str(tmp_path), CacheConfig(memory_ttl=10, file_ttl=100))
+    cache.put("k", "v")
+
+    clock.now += 50
+    assert cache.get("k") == "v"          # 内存过期，磁盘命中
+    assert cache.get_stats()["disk_hits"] == 1
+
+    clock.now += 100
+    assert cache.get("k") is None
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_size_bounded_eviction_is_lru(tmp_path, clock):
+    config = CacheConfig(max_cache_size_mb=600 / (1024 * 1024), memory_enabled=False)
+    cache = TieredResultCache(str(tmp_path), config)
+    for name in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(name, "x" * 150)
+    clock.now += 1
+    cache.get("a")
+    clock.now += 1
+    cache.put("d", "x" * 150)
+
+    stats = cache.get_stats()
+    assert stats["size_bytes"] <= 600
+    assert stats["evictions"] >= 1
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def test_performance_metrics_read_index(initialized_project):
+    cache = initialized_project.get_result_cache()
+    cache.put("k", {"value": "x" * 1000})
+    cache.get("k")
+    cache.get("other")
+    cache.flush()
+
+    stats = read_cache_stats(initialized_project.dnaspec_dir)
+    assert stats["entries"] == 1
+
+    metrics = initialized_project._calculate_performance_metrics()
+    assert metrics["cache_files_count"] == 1
+    assert metrics["cache_hits"] == 1
+    assert metrics["cache_misses"] == 1
+    assert metrics["cache_hit_rate"] == 0.5
+
+
+def test_unserializable_values_stay_in_memory(tmp_path):
+    cache = TieredResultCache(str(tmp_path), CacheConfig())
+    marker = {1, 2}
+    cache.put("k", marker)
+    assert cache.get("k") == marker
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_memory_hits_return_copies(tmp_path):
+    cache = TieredResultCache(str(tmp_path), CacheConfig())
+    value = {"items": [1, 2]}
+    cache.put("k", value)
+    value["items"].append(3)
+
+    hit = cache.get("k")
+    assert hit == {"items": [1, 2]}
+    hit["items"].clear()
+    assert cache.get("k") == {"items": [1, 2]}
+    assert cache.get_stats()["memory_hits"] == 2
+    cache.close()
+
+
+def test_unclosed_caches_are_flushed_at_exit_without_being_kept_alive(tmp_path):
+    import gc
+    import weakref
+
+    cache = TieredResultCache(str(tmp_path), CacheConfig())
+    cache.put("k", "v")
+    assert not os.path.exists(cache.index_file)
+    result_cache._flush_open_caches()
+    assert os.path.exists(cache.index_file)
+
+    ref = weakref.ref(cache)
+    del cache
+    gc.collect()
+    assert ref() is None
+
+
+def test_index_writes_are_batched(tmp_path):
+    cache = TieredResultCache(str(tmp_path), CacheConfig(), index_flush_threshold=3,
+                              index_flush_interval=3600)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert read_cache_stats(str(tmp_path)) is None
+    cache.put("c", 3)
+    assert read_cache_stats(str(tmp_path))["entries"] == 3
+    cache.put("d", 4)
+    cache.close()
+    assert read_cache_stats(str(tmp_path))["entries"] == 4
+
+
+def test_unindexed_result_files_are_adopted(tmp_path):
+    cache = TieredResultCache(str(tmp_path), CacheConfig(), index_flush_interval=3600)
+    cache.put("k", {"value": 1})
+    # 模拟索引写盘前进程退出：新实例的索引中没有该条目
+    reopened = TieredResultCache(str(tmp_path), CacheConfig(memory_enabled=False))
+    assert reopened.get("k") == {"value": 1}
+    assert reopened.get_stats()["entries"] == 1
+    cache.close()
+    reopened.close()
+
+
+class CountingBridge:
+    def __init__(self, version="v1"):
+        self.calls = 0
+        self.version = version
+
+    def execute_skill(self, skill_name, params, original_skill_name=None):
+        self.calls += 1
+        return {'success': True, 'result': f"{original_skill_name}:{params}", 'skill': skill_name}
+
+    def skill_version(self, skill_name):
+        return self.version
+
+
+def _executor(tmp_path, bridge):
+    from src.dna_spec_kit_integration.core.skill_executor import SkillExecutor
+
+    return SkillExecutor(python_bridge=bridge,
+                         result_cache=TieredResultCache(str(tmp_path), CacheConfig()))
+
+
+def test_skill_executor_reuses_cached_results(tmp_path):
+    bridge = CountingBridge()
+    executor = _executor(tmp_path, bridge)
+    first = executor.execute('architect', '电商系统')
+    second = executor.execute('architect', '电商系统')
+
+    assert first['success'] and first == second
+    assert bridge.calls == 1
+    executor.result_cache.close()
+
+
+def test_side_effecting_skills_are_not_cached(tmp_path):
+    bridge = CountingBridge()
+    executor = _executor(tmp_path, bridge)
+    for skill in ('git-operations', 'temp-workspace'):
+        executor.execute(skill, 'status')
+        executor.execute(skill, 'status')
+    assert bridge.calls == 4
+    executor.result_cache.close()
+
+
+def test_skill_version_is_part_of_cache_key(tmp_path):
+    bridge = CountingBridge()
+    executor = _executor(tmp_path, bridge)
+    executor.execute('architect', '电商系统')
+    bridge.version = "v2"
+    executor.execute('architect', '电商系统')
+    assert bridge.calls == 2
+    executor.result_cache.close()
+
+
+def test_editing_wrapped_implementation_misses_cache(tmp_path):
+    from src.dna_spec_kit_integration.core.python_bridge import PythonBridge
+
+    class CountingPythonBridge(PythonBridge):
+        calls = 0
+
+        def execute_skill(self, skill_name, params, original_skill_name=None):
+            self.calls += 1
+            return {'success': True, 'result': params, 'skill': skill_name}
+
+    bridge = CountingPythonBridge()
+    if bridge.skill_version('dnaspec-architect') is None:
+        pytest.skip("claude_skills 不可导入")
+    executor = _executor(tmp_path, bridge)
+    executor.execute('architect', '电商系统')
+
+    # claude_skill.py 只是从 main.py 导入入口，修改 main.py 也必须使缓存失效
+    main_py = os.path.join(os.path.dirname(bridge.resolve('dnaspec-architect').source_file), 'main.py')
+    stat = os.stat(main_py)
+    try:
+        os.utime(main_py, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        executor.execute('architect', '电商系统')
+    finally:
+        os.utime(main_py, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert bridge.calls == 2
+    executor.result_cache.close()
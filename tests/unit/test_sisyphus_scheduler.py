@@ -0,0 +1,132 @@
+"""
+Sisyphus 编排器调度单元测试
+"""
+import sys
+import os
+import asyncio
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.sisyphus import SisyphusOrchestrator, TaskSpec
+
+
+class RecordingAgent:
+    """按参数休眠、记录开始/结束事件的测试代理"""
+
+    def __init__(self, log):
+        self.log = log
+        self.running = 0
+        self.max_running = 0
+
+    async def process(self, params):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        self.log.append(('start', params['name'], time.perf_counter()))
+        try:
+            await asyncio.sleep(params.get('delay', 0))
+            if params.get('fail'):
+                raise RuntimeError(f"{params['name']} failed")
+            if params.get('cancel'):
+                raise asyncio.CancelledError()
+            return params['name'].upper()
+        finally:
+            self.running -= 1
+            self.log.append(('end', params['name'], time.perf_counter()))
+
+
+class FakeAgentManager:
+    def __init__(self, agent):
+        self.agent = agent
+
+    def get_agent(self, agent_type):
+        return self.agent if agent_type == 'worker' else None
+
+
+def _orchestrator(max_concurrency=4):
+    log = []
+    agent = RecordingAgent(log)
+    orchestrator = SisyphusOrchestrator(max_concurrency=max_concurrency)
+    orchestrator.set_agent_manager(FakeAgentManager(agent))
+    return orchestrator, agent, log
+
+
+def _add(orchestrator, name, dependencies=None, priority=0, agent_type='worker', **params):
+    orchestrator.add_task(TaskSpec(name, agent_type, dict(params, name=name), dependencies, priority))
+
+
+def _started(log):
+    return [name for event, name, _ in log if event == 'start']
+
+
+def test_dependent_starts_when_last_dependency_completes():
+    orchestrator, _, log = _orchestrator()
+    _add(orchestrator, 'slow', delay=0.3)
+    _add(orchestrator, 'fast', delay=0.01)
+    _add(orchestrator, 'after-fast', ['fast'])
+
+    results = asyncio.run(orchestrator.execute_tasks())
+    assert results == {'slow': 'SLOW', 'fast': 'FAST', 'after-fast': 'AFTER-FAST'}
+    ends = {name: at for event, name, at in log if event == 'end'}
+    assert ends['after-fast'] < ends['slow']
+    assert orchestrator.task_queue == []
+
+
+def test_ready_heap_orders_by_priority_under_concurrency_limit():
+    orchestrator, agent, log = _orchestrator(max_concurrency=1)
+    _add(orchestrator, 'low', priority=0)
+    _add(orchestrator, 'high', priority=5)
+    _add(orchestrator, 'unblocked', ['high'], priority=10)
+    _add(orchestrator, 'mid', priority=3)
+
+    asyncio.run(orchestrator.execute_tasks())
+    assert _started(log) == ['high', 'unblocked', 'mid', 'low']
+    assert agent.max_running == 1
+
+
+def test_semaphore_caps_concurrency():
+    orchestrator, agent, _ = _orchestrator(max_concurrency=2)
+    for i in range(6):
+        _add(orchestrator, f't{i}', delay=0.02)
+    asyncio.run(orchestrator.execute_tasks())
+    assert agent.max_running == 2
+    assert len(orchestrator.completed_tasks) == 6
+
+
+def test_failures_and_cancellations_propagate_to_dependents():
+    orchestrator, _, log = _orchestrator()
+    _add(orchestrator, 'broken', fail=True)
+    _add(orchestrator, 'child', ['broken'])
+    _add(orchestrator, 'grandchild', ['child'])
+    _add(orchestrator, 'cancelled', cancel=True)
+    _add(orchestrator, 'after-cancel', ['cancelled'])
+    _add(orchestrator, 'orphan', ['missing'])
+    _add(orchestrator, 'no-agent', agent_type='unknown')
+    _add(orchestrator, 'healthy')
+
+    results = asyncio.run(orchestrator.execute_tasks())
+    assert results == {'healthy': 'HEALTHY'}
+    assert set(orchestrator.failed_tasks) == {
+        'broken', 'child', 'grandchild', 'cancelled', 'after-cancel', 'orphan', 'no-agent'
+    }
+    assert orchestrator.failed_tasks['broken'] == 'broken failed'
+    assert orchestrator.failed_tasks['cancelled'] == 'Cancelled'
+    assert orchestrator.failed_tasks['grandchild'] == 'Dependency child did not complete'
+    assert 'child' not in _started(log)
+    assert orchestrator.task_queue == []
+
+
+def test_cyclic_tasks_remain_queued():
+    orchestrator, _, _ = _orchestrator()
+    _add(orchestrator, 'a', ['b'])
+    _add(orchestrator, 'b', ['a'])
+    _add(orchestrator, 'c')
+
+    assert asyncio.run(orchestrator.execute_tasks()) == {'c': 'C'}
+    assert [task.name for task in orchestrator.task_queue] == ['a', 'b']
+
+    # 之前完成的任务可作为后续批次的依赖
+    _add(orchestrator, 'd', ['c'])
+    orchestrator.task_queue = [task for task in orchestrator.task_queue if task.name == 'd']
+    assert asyncio.run(orchestrator.execute_tasks()) == {'d': 'D'}
@@ -0,0 +1,87 @@
+"""
+技能命令映射器扫描缓存单元测试
+"""
+import sys
+import os
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core import skill_command_mapper
+from src.dna_spec_kit_integration.core.skill_command_mapper import SkillCommandMapper
+
+SKILL_MD = """---
+name: {name}
+description: {description}
+version: 1.2.0
+---
+
+# {name}
+
+## Usage
+
+```
+dnaspec {name} --input "text"
+```
+"""
+
+
+def _write_skill(root, name, description="Analyzes context quality"):
+    skill_dir = root / name
+    skill_dir.mkdir(parents=True, exist_ok=True)
+    (skill_dir / "SKILL.md").write_text(SKILL_MD.format(name=name, description=description), encoding="utf-8")
+    return skill_dir / "SKILL.md"
+
+
+@pytest.fixture
+def skills_root(tmp_path):
+    root = tmp_path / "skills"
+    for name in ("context-analyzer", "task-decomposer", "agent-creator"):
+        _write_skill(root, name)
+    return root
+
+
+def _scan(skills_root, tmp_path):
+    mapper = SkillCommandMapper(skills_root, cache_path=tmp_path / "cache.json")
+    return mapper, mapper.scan_skills()
+
+
+def test_warm_scan_reuses_cached_parse(skills_root, tmp_path, monkeypatch):
+    cold_mapper, cold = _scan(skills_root, tmp_path)
+    assert cold_mapper.scan_stats == {'cached': 0, 'parsed': 3}
+
+    def fail(self, skill_file):
+        raise AssertionError(f"不应重新解析 {skill_file}")
+
+    monkeypatch.setattr(SkillCommandMapper, "_parse_skill_file", fail)
+    warm_mapper, warm = _scan(skills_root, tmp_path)
+    assert warm_mapper.scan_stats == {'cached': 3, 'parsed': 0}
+    assert sorted(warm) == sorted(cold)
+    assert warm["task-decomposer"].version == "1.2.0"
+    assert warm["task-decomposer"].examples == cold["task-decomposer"].examples
+    assert warm_mapper.get_command("task_decomposer").name == "task-decomposer"
+
+
+def test_only_changed_skills_are_reparsed(skills_root, tmp_path):
+    _scan(skills_root, tmp_path)
+    _write_skill(skills_root, "task-decomposer", "Breaks work into much smaller tasks")
+    _write_skill(skills_root, "new-skill")
+    (skills_root / "agent-creator" / "SKILL.md").unlink()
+
+    mapper, commands = _scan(skills_root, tmp_path)
+    assert mapper.scan_stats == {'cached': 1, 'parsed': 2}
+    assert commands["task-decomposer"].description == "Breaks work into much smaller tasks"
+    assert "agent-creator" not in commands
+
+
+def test_cold_scan_parses_in_parallel(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_command_mapper, "PARALLEL_PARSE_THRESHOLD", 2)
+    root = tmp_path / "skills"
+    for i in range(6):
+        _write_skill(root, f"skill-{i}")
+
+    mapper = SkillCommandMapper(root, use_cache=False, max_workers=2)
+    commands = mapper.scan_skills()
+    assert sorted(commands) == [f"skill-{i}" for i in range(6)]
+    assert mapper.scan_stats['parsed'] == 6
@@ -0,0 +1,144 @@
+"""
+技能结果记忆化单元测试
+"""
+import sys
+import os
+import json
+import importlib.util
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from skills import dnaspec_skill_framework as framework
+from skills.dnaspec_skill_framework import (
+    DNASpecSkillBase,
+    SkillResultMemo,
+    enable_memoization,
+    disable_memoization
+)
+
+
+class CountingSkill(DNASpecSkillBase):
+    """记录执行次数的测试技能"""
+    memoizable = True
+
+    def __init__(self, version="1.0.0"):
+        super().__init__(name="counting-skill", description="Counts executions", version=version)
+        self.calls = 0
+
+    def validate_input(self, input_data):
+        return {'valid': True}
+
+    def execute_skill(self, input_data):
+        self.calls += 1
+        return {'echo': input_data, 'items': [1, 2]}
+
+
+class ClockSkill(CountingSkill):
+    """非确定性技能，不参与记忆化"""
+    memoizable = False
+
+
+def _event(payload):
+    return {'inputs': [payload], 'tool_name': 'counting-skill'}
+
+
+def _body(response):
+    return json.loads(response['body'])
+
+
+@pytest.fixture(autouse=True)
+def memo():
+    cache = enable_memoization()
+    yield cache
+    disable_memoization()
+
+
+def test_repeated_input_hits_cache(memo):
+    skill = CountingSkill()
+    first = _body(skill.lambda_handler(_event({'input': '电商系统', 'depth': 2})))
+    second = _body(skill.lambda_handler(_event({'depth': 2, 'input': '电商系统'})))
+
+    assert skill.calls == 1
+    assert first['result'] == second['result']
+    assert first['metadata']['cache_hit'] is False
+    assert second['metadata']['cache_hit'] is True
+    assert memo.get_stats()['hits'] == 1
+
+
+def test_key_includes_version_and_input():
+    skill = CountingSkill()
+    skill.lambda_handler(_event({'input': 'a'}))
+    skill.lambda_handler(_event({'input': 'b'}))
+    newer = CountingSkill(version="2.0.0")
+    newer.lambda_handler(_event({'input': 'a'}))
+    assert skill.calls == 2
+    assert newer.calls == 1
+
+
+def test_opt_out_and_disabled():
+    clock = ClockSkill()
+    clock.lambda_handler(_event({'input': 'a'}))
+    clock.lambda_handler(_event({'input': 'a'}))
+    assert clock.calls == 2
+
+    disable_memoization()
+    skill = CountingSkill()
+    skill.lambda_handler(_event({'input': 'a'}))
+    response = _body(skill.lambda_handler(_event({'input': 'a'})))
+    assert skill.calls == 2
+    assert response['metadata']['cache_hit'] is False
+
+
+def test_cached_result_is_not_shared_between_callers():
+    skill = CountingSkill()
+    assert isinstance(framework.get_memo_cache(), SkillResultMemo)
+    skill.lambda_handler(_event({'input': 'a'}))
+    body = _body(skill.lambda_handler(_event({'input': 'a'})))
+    body['result']['items'].append(3)
+    assert _body(skill.lambda_handler(_event({'input': 'a'})))['result']['items'] == [1, 2]
+
+
+def test_memo_lru_bound():
+    memo = SkillResultMemo(max_entries=2)
+    for key in ('a', 'b', 'c'):
+        memo.put(key, '{}')
+    assert memo.get('a') is None
+    assert memo.get_stats()['entries'] == 2
+
+
+def _load_skill(name):
+    path = os.path.join(os.path.dirname(__file__), '..', '..', 'skills', name, 'skill.py')
+    spec = importlib.util.spec_from_file_location(f"{name.replace('-', '_')}_skill_module", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.get_skill()
+
+
+def test_skills_are_not_memoized_by_default():
+    class PlainSkill(ClockSkill):
+        memoizable = DNASpecSkillBase.memoizable
+
+    skill = PlainSkill()
+    skill.lambda_handler(_event({'input': 'a'}))
+    skill.lambda_handler(_event({'input': 'a'}))
+    assert skill.calls == 2
+
+
+def test_real_skill_is_memoized():
+    skill = _load_skill('task-decomposer')
+    event = {'inputs': [{'input': '开发一个电商平台'}], 'tool_name': 'task-decomposer'}
+    first = _body(skill.lambda_handler(event))
+    second = _body(skill.lambda_handler(event))
+    assert first['success'] and second['metadata']['cache_hit'] is True
+    assert first['result'] == second['result']
+
+
+
+def test_only_deterministic_skills_opt_in():
+    # 生成随机ID或时间戳的技能不参与记忆化
+    for name in ('agent-creator', 'constraint-generator'):
+        assert _load_skill(name).memoizable is False
+    for name in ('architect', 'cognitive-templater', 'context-analyzer', 'task-decomposer'):
+        assert _load_skill(name).memoizable is True
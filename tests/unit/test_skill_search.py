@@ -0,0 +1,104 @@
+"""
+技能搜索索引单元测试
+"""
+import sys
+import os
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_spec_kit_integration.core import skill_command_mapper
+from src.dna_spec_kit_integration.core.skill_command_mapper import SkillCommand
+from src.dna_spec_kit_integration.core.skill_search import SkillSearchIndex
+from src.dna_spec_kit_integration.core.slash_command_handler import SlashCommandHandler
+
+
+def _command(name, description, category='general', parameters=None, examples=None):
+    return SkillCommand(
+        name=name,
+        description=description,
+        skill_path=Path('/skills') / name,
+        category=category,
+        aliases=[name, name.replace('-', '_')],
+        parameters=parameters or {},
+        examples=examples or []
+    )
+
+
+COMMANDS = {
+    'context-analyzer': _command('context-analyzer', '分析上下文质量', 'analysis',
+                                 parameters={'dimensions': {'description': 'clarity relevance'}}),
+    'context-optimizer': _command('context-optimizer', 'Optimize context for clarity', 'optimization'),
+    'architect': _command('architect', '系统架构设计', 'architecture',
+                          examples=['dnaspec architect --requirements "电商平台"']),
+    'task-decomposer': _command('task-decomposer', 'Break a project into tasks', 'decomposition'),
+}
+
+
+def _names(hits):
+    return [name for name, _ in hits]
+
+
+def test_exact_name_ranks_first():
+    index = SkillSearchIndex.build(COMMANDS)
+    hits = index.search('context-analyzer')
+    assert hits[0][0] == 'context-analyzer'
+    assert 'context-optimizer' in _names(hits)
+
+
+def test_prefix_and_fuzzy_matching():
+    index = SkillSearchIndex.build(COMMANDS)
+    assert _names(index.search('decomp'))[0] == 'task-decomposer'
+    # 拼写错误（一次替换）
+    assert _names(index.search('architecs'))[0] == 'architect'
+    assert index.search('zzzz') == []
+
+
+def test_chinese_description_parameters_and_examples_are_indexed():
+    index = SkillSearchIndex.build(COMMANDS)
+    assert _names(index.search('架构')) == ['architect']
+    assert _names(index.search('电商')) == ['architect']
+    assert _names(index.search('relevance')) == ['context-analyzer']
+
+
+def test_category_filter_and_limit():
+    index = SkillSearchIndex.build(COMMANDS)
+    assert _names(index.search('context', category='optimization')) == ['context-optimizer']
+    assert len(index.search('context', limit=1)) == 1
+
+
+def test_persisted_index_reused_until_skills_change(tmp_path, monkeypatch):
+    path = tmp_path / 'index.search.json'
+    built = SkillSearchIndex.load_or_build(COMMANDS, path)
+    assert path.exists()
+
+    def fail(cls, commands):
+        raise AssertionError('指纹未变时不应重建索引')
+
+    monkeypatch.setattr(SkillSearchIndex, 'build', classmethod(fail))
+    loaded = SkillSearchIndex.load_or_build(COMMANDS, path)
+    assert loaded.search('decomp') == built.search('decomp')
+
+    monkeypatch.undo()
+    changed = dict(COMMANDS, planner=_command('planner', 'Plan a roadmap'))
+    assert _names(SkillSearchIndex.load_or_build(changed, path).search('roadmap')) == ['planner']
+
+
+def test_handler_search_returns_ranked_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(skill_command_mapper, 'MANIFEST_CACHE_DIR', tmp_path / 'cache')
+    for name, description in (('context-analyzer', 'Analyze context quality'),
+                              ('context-optimizer', 'Optimize context')):
+        skill_dir = tmp_path / 'skills' / name
+        skill_dir.mkdir(parents=True)
+        (skill_dir / 'SKILL.md').write_text(
+            f"---\nname: {name}\ndescription: {description}\n---\n\n# {name}\n", encoding='utf-8'
+        )
+
+    handler = SlashCommandHandler(tmp_path / 'skills')
+    result = handler.handle_command(argparse.Namespace(command='search', query='analyz', category=None, limit=None))
+    assert result['success']
+    assert result['results'][0]['name'] == 'context-analyzer'
+    assert result['results'][0]['score'] > 0
+    assert list((tmp_path / 'cache').glob('*.search.json'))
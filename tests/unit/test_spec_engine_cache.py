@@ -0,0 +1,98 @@
+"""
+规范引擎编译缓存单元测试
+"""
+import sys
+import os
+import json
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+pytest.importorskip('jinja2')
+
+from src.dna_context_engineering import spec_engine
+from src.dna_context_engineering.spec_engine import DNASPECSpecEngine, compiled_spec_cache
+
+
+def _write_spec(path, template='Analyze: {{ context }} ({{ mode }})',
+                processor="result = {'length': len(response), 'mode': context.get('mode')}"):
+    spec = {
+        'name': 'demo-skill',
+        'description': 'Demo skill',
+        'version': '1.0.0',
+        'implementation': {
+            'instruction_template': template,
+            'result_processor': processor
+        }
+    }
+    path.write_text(json.dumps(spec), encoding='utf-8')
+    return path
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(spec_engine, 'SPEC_INDEX_DIR', tmp_path / 'index')
+    compiled_spec_cache.clear()
+    yield
+    compiled_spec_cache.clear()
+
+
+def test_template_and_processor_compiled_once(tmp_path, monkeypatch):
+    built = []
+    original = spec_engine.Template
+
+    def counting_template(source):
+        built.append(source)
+        return original(source)
+
+    monkeypatch.setattr(spec_engine, 'Template', counting_template)
+    spec_file = _write_spec(tmp_path / 'demo.spec.json')
+
+    engine = DNASPECSpecEngine()
+    assert engine.register_skill_from_spec(str(spec_file))
+    # 内容相同的规范在另一个引擎中注册时复用编译结果
+    assert DNASPECSpecEngine().register_skill_from_spec(str(spec_file))
+
+    for _ in range(3):
+        result = engine.execute_skill('demo-skill', 'hello', {'mode': 'fast'})
+        assert result['success']
+        assert result['result']['mode'] == 'fast'
+        assert set(result['timings']) == {'compile_ms', 'render_ms', 'processor_ms'}
+
+    assert len(built) == 1
+    assert compiled_spec_cache.hits == 1
+    stats = engine.get_timing_stats()['demo-skill']
+    assert stats['render_count'] == 3
+    assert set(stats['compile_ms']) == {'template', 'processor'}
+
+
+def test_processor_syntax_error_reported_at_call_time(tmp_path):
+    spec_file = _write_spec(tmp_path / 'demo.spec.json', processor='result = (')
+    engine = DNASPECSpecEngine()
+    assert engine.register_skill_from_spec(str(spec_file))
+
+    result = engine.execute_skill('demo-skill', 'hello', {'mode': 'fast'})
+    assert result['success']
+    assert result['result']['error'].startswith('Processor script failed')
+
+
+def test_directory_reload_skips_unchanged_and_recompiles_changed(tmp_path):
+    spec_file = _write_spec(tmp_path / 'demo.spec.json')
+    engine = DNASPECSpecEngine()
+    assert engine.load_all_specs_from_directory(str(tmp_path)) == 1
+    skill = engine.skill_registry.get_skill('demo-skill')
+    old_hash = skill.spec_hash
+
+    assert engine.load_all_specs_from_directory(str(tmp_path)) == 1
+    assert engine.skill_registry.get_skill('demo-skill') is skill
+
+    _write_spec(spec_file, template='Changed: {{ context }}', processor="result = {'response': response}")
+    assert engine.load_all_specs_from_directory(str(tmp_path)) == 1
+    reloaded = engine.skill_registry.get_skill('demo-skill')
+    assert reloaded is not skill
+    assert compiled_spec_cache.get(old_hash) is None
+    assert len(compiled_spec_cache) == 1
+
+    result = engine.execute_skill('demo-skill', 'hello', {})
+    assert 'Changed: hello' in result['result']['response']
@@ -0,0 +1,99 @@
+"""
+规范增量加载单元测试
+"""
+import sys
+import os
+import json
+import threading
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+pytest.importorskip('jinja2')
+
+from src.dna_context_engineering import spec_engine
+from src.dna_context_engineering.spec_engine import (
+    DNASPECSpecEngine, SpecParser, SpecWatcher, compiled_spec_cache
+)
+
+
+def _write_spec(specs_dir, name, template='Run {{ context }}'):
+    path = specs_dir / f'{name}.spec.json'
+    path.write_text(json.dumps({
+        'name': name,
+        'description': f'{name} skill',
+        'version': '1.0.0',
+        'implementation': {'instruction_template': template}
+    }), encoding='utf-8')
+    return path
+
+
+@pytest.fixture
+def specs_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(spec_engine, 'SPEC_INDEX_DIR', tmp_path / 'index')
+    compiled_spec_cache.clear()
+    directory = tmp_path / 'specs'
+    directory.mkdir()
+    for i in range(3):
+        _write_spec(directory, f'skill-{i}')
+    yield directory
+    compiled_spec_cache.clear()
+
+
+def test_restart_reuses_persisted_index(specs_dir, monkeypatch):
+    first = DNASPECSpecEngine()
+    assert first.load_all_specs_from_directory(str(specs_dir)) == 3
+    assert first.load_stats['parsed'] == 3
+
+    def fail(self, content, spec_path):
+        raise AssertionError('文件哈希未变时不应重新解析')
+
+    monkeypatch.setattr(SpecParser, 'parse_content', fail)
+    restarted = DNASPECSpecEngine()
+    assert restarted.load_all_specs_from_directory(str(specs_dir)) == 3
+    assert restarted.load_stats['indexed'] == 3
+    assert set(restarted.list_available_skills()) == {'skill-0', 'skill-1', 'skill-2'}
+
+
+def test_parallel_parse_reports_invalid_specs(specs_dir, monkeypatch):
+    monkeypatch.setattr(spec_engine, 'PARALLEL_LOAD_THRESHOLD', 2)
+    (specs_dir / 'broken.spec.json').write_text('{"name": "broken"}', encoding='utf-8')
+
+    engine = DNASPECSpecEngine(use_index=False, max_workers=2)
+    assert engine.load_all_specs_from_directory(str(specs_dir)) == 3
+    assert engine.load_stats['parsed'] == 3
+    assert engine.load_stats['failed'] == 1
+
+
+def test_watcher_recompiles_only_changed_specs(specs_dir):
+    engine = DNASPECSpecEngine()
+    watcher = SpecWatcher(engine, str(specs_dir))
+    assert watcher.poll()
+    assert not watcher.poll()
+    untouched = engine.skill_registry.get_skill('skill-0')
+
+    _write_spec(specs_dir, 'skill-1', template='Changed {{ context }} with more text')
+    assert watcher.poll()
+    assert engine.load_stats['parsed'] == 1
+    assert engine.load_stats['unchanged'] == 2
+    assert engine.skill_registry.get_skill('skill-0') is untouched
+    result = engine.execute_skill('skill-1', 'x')
+    assert 'Changed x' in result['result']['raw_response']
+
+    (specs_dir / 'skill-2.spec.json').unlink()
+    assert watcher.poll()
+    assert engine.load_stats['removed'] == 1
+    assert 'skill-2' not in engine.list_available_skills()
+
+
+def test_watch_directory_runs_in_background(specs_dir):
+    engine = DNASPECSpecEngine()
+    reloaded = threading.Event()
+    watcher = engine.watch_directory(str(specs_dir), interval=0.01,
+                                     on_change=lambda stats: reloaded.set())
+    try:
+        assert reloaded.wait(5)
+        assert len(engine.list_available_skills()) == 3
+    finally:
+        watcher.stop()
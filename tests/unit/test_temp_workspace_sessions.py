@@ -0,0 +1,109 @@
+"""
+临时工作区会话单元测试
+"""
+import sys
+import os
+import pytest
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.dna_context_engineering import temp_workspace
+from src.dna_context_engineering.temp_workspace import execute
+
+
+@pytest.fixture
+def sessions_dir(tmp_path, monkeypatch):
+    # 工作区和会话清单都放在测试目录中
+    monkeypatch.setattr(temp_workspace.tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(temp_workspace, "SESSIONS_DIR", tmp_path / "sessions")
+    monkeypatch.setattr(temp_workspace, "_sessions", {})
+    return tmp_path / "sessions"
+
+
+def test_session_survives_process_restart(sessions_dir):
+    execute({"operation": "create-workspace"})
+    execute({"operation": "add-file", "file_path": "a.py", "content": "x = 1"})
+    execute({"operation": "add-file", "file_path": "b.py", "content": "y = 2", "target_dir": "pkg"})
+
+    # 模拟新进程：清空进程内缓存
+    temp_workspace._sessions.clear()
+    session = temp_workspace.get_session()
+    assert session.temp_files == {"a.py", os.path.join("pkg", "b.py")}
+
+    result = execute({"operation": "confirm-all"})
+    assert "已确认所有 2 个" in result
+    assert os.path.exists(session.confirmed_path(os.path.join("pkg", "b.py")))
+
+    temp_workspace._sessions.clear()
+    restored = temp_workspace.get_session(session.session_id)
+    assert restored.temp_files == set()
+    assert len(restored.confirmed_files) == 2
+
+
+def test_concurrent_sessions_are_isolated(sessions_dir):
+    first = temp_workspace.create_session()
+    second = temp_workspace.create_session()
+    first.add_file("one.txt", "1")
+    second.add_file("two.txt", "2")
+
+    assert first.session_id != second.session_id
+    assert "临时文件: 1 个" in execute({"operation": "list-files", "session_id": first.session_id})
+    assert temp_workspace.get_session().session_id == second.session_id
+    assert temp_workspace.list_sessions() == sorted([first.session_id, second.session_id])
+
+
+def test_confirm_file_and_clean(sessions_dir):
+    session = temp_workspace.create_session()
+    session.add_file("keep.py", "keep")
+    session.add_file("drop.py", "drop")
+
+    assert "文件已确认" in execute({"operation": "confirm-file", "confirm_file": "keep.py"})
+    assert "临时文件不存在" in execute({"operation": "confirm-file", "confirm_file": "missing.py"})
+
+    result = execute({"operation": "clean-workspace"})
+    assert "清理临时文件: 1 个" in result
+    assert not os.path.exists(session.temp_path("drop.py"))
+    assert session.confirmed_files == {"keep.py"}
+
+
+def test_operations_without_session(sessions_dir):
+    assert execute({"operation": "list-files"}) == "❌ 错误: 未创建临时工作区"
+
+
+def test_add_file_appends_instead_of_rewriting_manifest(sessions_dir, monkeypatch):
+    session = temp_workspace.create_session()
+    writes = []
+    original = temp_workspace._write_json_atomic
+    monkeypatch.setattr(temp_workspace, "_write_json_atomic",
+                        lambda path, data: (writes.append(path), original(path, data)))
+
+    for i in range(300):
+        session.add_file(f"f{i}.txt", str(i))
+
+    # 300次登记只压缩了一次快照
+    assert len(writes) == 1
+    temp_workspace._sessions.clear()
+    restored = temp_workspace.get_session(session.session_id)
+    assert restored.temp_files == {f"f{i}.txt" for i in range(300)}
+
+
+def test_changes_from_other_process_are_not_lost(sessions_dir):
+    session = temp_workspace.create_session()
+    # 模拟另一个进程持有同一会话
+    other = temp_workspace.TempWorkspaceSession.load(session.session_id, sessions_dir)
+
+    other.add_file("theirs.py", "1")
+    session.add_file("mine.py", "2")
+    assert session.temp_files == {"theirs.py", "mine.py"}
+
+    other.confirm_file("mine.py")
+    cached = temp_workspace.get_session(session.session_id)
+    assert cached is session
+    assert cached.temp_files == {"theirs.py"}
+    assert cached.confirmed_files == {"mine.py"}
+
+    temp_workspace._sessions.clear()
+    restored = temp_workspace.get_session(session.session_id)
+    assert restored.temp_files == {"theirs.py"}
+    assert restored.confirmed_files == {"mine.py"}